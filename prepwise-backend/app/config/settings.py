@@ -9,6 +9,12 @@ class Settings(BaseSettings):
     FIREBASE_CREDENTIALS_PATH: Optional[str] = None
     FIREBASE_PROJECT_ID: Optional[str] = None
     
+    # Persistence (firestore, memory or sqlite; the local backends skip Firebase entirely and
+    # add PERSISTENCE_LATENCY_MS per round trip to mimic Firestore)
+    PERSISTENCE_BACKEND: str = "firestore"
+    PERSISTENCE_SQLITE_PATH: str = "prepwise.db"
+    PERSISTENCE_LATENCY_MS: float = 0.0
+    
     # App Settings
     APP_NAME: str = "PrepWise API"
     VERSION: str = "1.0.0"
@@ -21,6 +27,91 @@ class Settings(BaseSettings):
     MAX_AUDIO_SIZE_MB: int = 10
     MAX_VIDEO_SIZE_MB: int = 50
     
+    # Video Frame Sampling (frames are downscaled to this width on decode)
+    VIDEO_ANALYSIS_WIDTH: int = 320
+    VIDEO_MAX_FRAMES: int = 300
+    
+    # Video Face Analysis (full detection every N frames, tracking in between)
+    VIDEO_DETECT_INTERVAL: int = 5
+    VIDEO_BATCH_SIZE: int = 32
+    VIDEO_WORKERS: int = 0  # 0 = one worker per CPU
+    
+    # Background Analysis Jobs (end_interview waits at most ANALYSIS_DEADLINE_SECONDS for pending jobs)
+    JOB_WORKERS: int = 4
+    JOB_PROCESS_WORKERS: int = 0  # 0 = one worker per CPU
+    ANALYSIS_DEADLINE_SECONDS: float = 30.0
+    
+    # GD Rolling Summary (older turns are folded into a summary every N turns;
+    # persona prompts and the evaluation see the summary plus the last GD_RECENT_WINDOW messages)
+    GD_RECENT_WINDOW: int = 6
+    GD_SUMMARY_EVERY_TURNS: int = 8
+    GD_SUMMARY_MAX_CHARS: int = 1500
+    
+    # GD Room (WebSocket turn-taking; persona reaction delays are multiples of GD_REACTION_SECONDS)
+    GD_REACTION_SECONDS: float = 1.5
+    GD_OPENING_SILENCE_SECONDS: float = 10.0
+    GD_INTERRUPT_AFTER_SECONDS: float = 20.0
+    GD_LEADER_SUMMARY_EVERY: int = 8
+    GD_MAX_AI_STREAK: int = 3
+    GD_WORDS_PER_SECOND: float = 2.5
+    
+    # GD Topic Reservoir (topics kept ready for /gd/start; at most one refill LLM call per interval)
+    GD_TOPIC_RESERVOIR_SIZE: int = 40
+    GD_TOPIC_REFILL_INTERVAL_SECONDS: float = 30.0
+    
+    # Final Evaluation Jobs (max LLM evaluations running at once; callback_url hosts as a
+    # comma-separated list, empty allows any host that resolves only to public addresses)
+    EVALUATION_MAX_CONCURRENCY: int = 4
+    EVALUATION_CALLBACK_ALLOWED_HOSTS: str = ""
+    
+    # Final Feedback (token budget for each voice/video analysis summary in the prompt)
+    FEEDBACK_ANALYSIS_MAX_TOKENS: int = 200
+    
+    # Prompt Budgets (approximate tokens; each section is cut to its budget, oldest history first,
+    # and optional sections shrink further if the whole prompt exceeds PROMPT_MAX_TOKENS)
+    PROMPT_MAX_TOKENS: int = 6000
+    PROMPT_QUESTION_MAX_TOKENS: int = 100
+    PROMPT_ANSWER_MAX_TOKENS: int = 600
+    PROMPT_ANSWERS_MAX_TOKENS: int = 3000
+    PROMPT_RESUME_MAX_TOKENS: int = 300
+    PROMPT_HISTORY_MAX_TOKENS: int = 1500
+    PROMPT_MESSAGE_MAX_TOKENS: int = 150
+    PROMPT_SUMMARY_MAX_TOKENS: int = 500
+    
+    # LLM Structured Output (response_format sent for JSON replies: json_object, json_schema or none)
+    LLM_JSON_MODE: str = "json_object"
+    
+    # LLM Model Routing (LLM_MODELS: JSON list of {"model", "tier": fast|strong, "base_url", "api_key_env", "timeout"};
+    # LLM_CALL_TIERS: JSON map of call site to tier, e.g. {"question": "strong"};
+    # failover stops after LLM_MAX_ATTEMPTS models or LLM_FAILOVER_DEADLINE_SECONDS in total)
+    LLM_BASE_URL: str = "https://openrouter.ai/api/v1/chat/completions"
+    LLM_MODELS: str = ""
+    LLM_CALL_TIERS: str = ""
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    LLM_MAX_ATTEMPTS: int = 3
+    LLM_FAILOVER_DEADLINE_SECONDS: float = 60.0
+    
+    # Speech-to-Text (none, whisper, vosk); TRANSCRIPTION_MODEL is a Whisper size or Vosk model path;
+    # up to TRANSCRIPTION_BATCH_SIZE queued requests share one worker round trip (run one after another)
+    TRANSCRIPTION_BACKEND: str = "none"
+    TRANSCRIPTION_MODEL: Optional[str] = None
+    TRANSCRIPTION_WORKERS: int = 1
+    TRANSCRIPTION_MAX_QUEUE: int = 32
+    TRANSCRIPTION_BATCH_SIZE: int = 4
+    TRANSCRIPTION_BATCH_WINDOW_MS: int = 50
+    TRANSCRIPTION_TIMEOUT_SECONDS: float = 60.0
+    
+    # Resume Parsing (page/character budget; fast mode is used for /interview/start)
+    RESUME_MAX_PAGES: int = 5
+    RESUME_MAX_CHARS: int = 20000
+    RESUME_FAST_MAX_PAGES: int = 1
+    RESUME_FAST_MAX_CHARS: int = 4000
+    
+    # Bulk Resume Ingestion
+    BULK_RESUME_MAX_FILES: int = 500
+    BULK_RESUME_WORKERS: int = 0  # 0 = one worker per CPU
+    BULK_RESUME_WRITE_BATCH_SIZE: int = 100
+    
     @field_validator('CORS_ORIGINS', mode='before')
     @classmethod
     def parse_cors_origins(cls, v):
@@ -1,6 +1,8 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
+from app.services.topic_reservoir import get_topic_reservoir
 
 # #region agent log
 import json
@@ -38,10 +40,20 @@ except Exception as e:
     # #endregion
     raise
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fill the GD topic reservoir in the background from startup, not on the first /gd/start
+    topic_reservoir = get_topic_reservoir()
+    topic_reservoir.start()
+    yield
+    await topic_reservoir.stop()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.VERSION,
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    lifespan=lifespan
 )
 
 # #region agent log
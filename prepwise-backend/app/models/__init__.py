@@ -8,6 +8,15 @@ from .interview import (
     InterviewType,
     InterviewMode
 )
+from .llm_output import (
+    AnswerAnalysis,
+    ScoreBreakdown,
+    FinalFeedback,
+    GDScores,
+    GDEvaluation,
+    GDTopic,
+    GDTopicBatch
+)
 from .alumni import (
     AlumniProfile,
     AlumniCreate,
@@ -24,6 +33,11 @@ __all__ = [
     'InterviewResult',
     'InterviewType',
     'InterviewMode',
+    'AnswerAnalysis',
+    'ScoreBreakdown',
+    'FinalFeedback',
+    'GDScores',
+    'GDEvaluation',
     'AlumniProfile',
     'AlumniCreate',
     'MentorshipRequest',
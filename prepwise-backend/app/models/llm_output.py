@@ -0,0 +1,71 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+import re
+
+
+def _as_list(value):
+    """Models sometimes return a bulleted string instead of an array"""
+    if isinstance(value, str):
+        items = [re.sub(r'^\s*(?:[-*•]|\d+[.)])\s*', '', line).strip() for line in value.splitlines()]
+        return [item for item in items if item]
+    return value
+
+
+class _ListFields(BaseModel):
+    @field_validator('*', mode='before')
+    @classmethod
+    def _split_lists(cls, value, info):
+        annotation = cls.model_fields[info.field_name].annotation
+        return _as_list(value) if annotation == List[str] else value
+
+
+class AnswerAnalysis(_ListFields):
+    score: int = Field(ge=0, le=100)
+    feedback: str
+    strengths: List[str] = Field(default_factory=list)
+    improvements: List[str] = Field(default_factory=list)
+    # Breakdown used to aggregate the final score per dimension
+    content: Optional[int] = Field(None, ge=0, le=100)
+    communication: Optional[int] = Field(None, ge=0, le=100)
+    confidence: Optional[int] = Field(None, ge=0, le=100)
+
+
+class ScoreBreakdown(BaseModel):
+    content: int = Field(ge=0, le=100)
+    communication: int = Field(ge=0, le=100)
+    confidence: int = Field(ge=0, le=100)
+
+
+class FinalFeedback(_ListFields):
+    overall_score: int = Field(ge=0, le=100)
+    scores: ScoreBreakdown
+    strengths: List[str] = Field(default_factory=list)
+    weaknesses: List[str] = Field(default_factory=list)
+    detailed_feedback: str
+
+
+class GDScores(BaseModel):
+    communication: float = Field(ge=0, le=10)
+    content: float = Field(ge=0, le=10)
+    participation: float = Field(ge=0, le=10)
+    team_behavior: float = Field(ge=0, le=10)
+    leadership: float = Field(ge=0, le=10)
+
+
+class GDTopic(BaseModel):
+    category: str = ""
+    topic: str
+
+
+class GDTopicBatch(BaseModel):
+    topics: List[GDTopic]
+
+
+class GDEvaluation(_ListFields):
+    overall_score: float = Field(ge=0, le=10)
+    scores: GDScores
+    strengths: List[str] = Field(default_factory=list)
+    weaknesses: List[str] = Field(default_factory=list)
+    role_suitability: str
+    improvement_suggestions: List[str] = Field(default_factory=list)
+    detailed_feedback: str
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends, Header
 from typing import Optional, Dict, List
 from app.services.firebase_service import FirebaseService, db
+from app.services.model_router import get_model_router
+from app.utils.prompt_builder import token_usage
 import firebase_admin.auth
 from firebase_admin import firestore
 
@@ -30,6 +32,16 @@ def verify_admin(authorization: Optional[str] = Header(None)):
         print(f"Token verification failed: {e}")
         return "admin_123"
 
+@router.get("/llm/usage")
+async def get_llm_usage(user_id: str = Depends(verify_admin)):
+    """LLM prompt/completion tokens per call site since startup"""
+    return token_usage()
+
+@router.get("/llm/models")
+async def get_llm_models(user_id: str = Depends(verify_admin)):
+    """Configured LLM models with rolling latency, error rate and the call-site tiers"""
+    return get_model_router().stats()
+
 @router.get("/statistics")
 async def get_admin_statistics(user_id: str = Depends(verify_admin)):
     """Get platform statistics for admin dashboard"""
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, WebSocket
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Optional, Dict, List, Any
+import asyncio
 import uuid
 from datetime import datetime
 import firebase_admin.auth
@@ -7,15 +9,25 @@ import firebase_admin.auth
 from app.services.firebase_service import FirebaseService
 from app.services.gemini_service import GeminiService
 from app.services.gd_service import GDService
+from app.services.gd_room import GDRoom
+from app.services.topic_reservoir import get_topic_reservoir, CATEGORIES
+from app.services.evaluation_jobs import get_evaluation_jobs
+from app.services.job_queue import get_job_queue, PRIORITY_LOW
+from app.config import settings
 
 router = APIRouter(prefix="/gd", tags=["gd"])
 
 firebase_service = FirebaseService()
 gemini_service = GeminiService()
 gd_service = GDService()
+evaluation_jobs = get_evaluation_jobs()
+job_queue = get_job_queue()
+topic_reservoir = get_topic_reservoir()
 
 # In-memory active GD sessions
 active_gd_sessions = {}
+# Live WebSocket rooms by gd_id
+active_gd_rooms = {}
 
 
 def verify_user(authorization: Optional[str] = Header(None)):
@@ -29,9 +41,20 @@ def verify_user(authorization: Optional[str] = Header(None)):
         return "user_123"
 
 
+def _delta(tracking: Dict, since: int) -> Dict:
+    """Messages after the client's `since` cursor, the new cursor and compact counters"""
+    history = tracking["conversation_history"]
+    return {
+        "messages": history[since:],
+        "last_seq": len(history),
+        "behavior": gd_service.behavior_counters(tracking)
+    }
+
+
 @router.post("/start")
 async def start_gd(
     mode: str = Query(..., description="Interview mode (text/voice/video)"),
+    category: Optional[str] = Query(None, description=f"Preferred topic category ({', '.join(CATEGORIES)})"),
     user_id: str = Depends(verify_user)
 ):
     """Start a new Group Discussion session"""
@@ -39,8 +62,9 @@ async def start_gd(
     try:
         gd_id = str(uuid.uuid4())
         
-        # Generate GD topic dynamically
-        topic = await gd_service.generate_topic()
+        # Take a pre-generated topic (refilled in the background, no LLM call here)
+        picked = topic_reservoir.pop(category)
+        topic = picked["topic"]
         
         # Initialize AI participants with fixed personalities
         ai_participants = gd_service.create_ai_participants()
@@ -61,12 +85,16 @@ async def start_gd(
             "user_id": user_id,
             "mode": mode,
             "topic": topic,
+            "topic_category": picked["category"],
             "ai_participants": ai_participants,
             "behavior_tracking": behavior_tracking,
             "started_at": datetime.utcnow(),
             "status": "active",
             "current_speaker": None,
-            "turn_count": 0
+            "turn_count": 0,
+            "conversation_summary": "",
+            "summarized_upto": 0,
+            "summarizing": False
         }
         
         # Save to Firestore
@@ -82,6 +110,7 @@ async def start_gd(
         return {
             "gd_id": gd_id,
             "topic": topic,
+            "topic_category": picked["category"],
             "ai_participants": ai_participants,
             "first_message": None  # No auto-start, wait for student
         }
@@ -89,15 +118,25 @@ async def start_gd(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/topics/metrics")
+async def topic_metrics():
+    """Topic reservoir size per category and refill counters"""
+    return topic_reservoir.metrics()
+
+
 @router.post("/{gd_id}/speak")
 async def student_speak(
     gd_id: str,
     message: str = Query(..., description="Student's message"),
     interrupted: bool = Query(False, description="Whether student interrupted"),
+    since: Optional[int] = Query(None, ge=0, description="Last message seq the client has; returns a delta response"),
     user_id: str = Depends(verify_user)
 ):
-    """Student speaks in the GD"""
-    """Student speaks in the GD"""
+    """
+    Student speaks in the GD
+    With `since`, the response carries only messages after that seq plus compact counters
+    instead of the full behavior_tracking.
+    """
     try:
         session = active_gd_sessions.get(gd_id)
         if not session:
@@ -106,38 +145,34 @@ async def student_speak(
         if session["user_id"] != user_id:
             raise HTTPException(status_code=403, detail="Unauthorized")
         
-        # Update behavior tracking
+        # Add student message to history and update behavior tracking
         tracking = session["behavior_tracking"]
-        tracking["student_speaks_count"] += 1
-        if interrupted:
-            tracking["student_interruptions"] += 1
-        if tracking["turn_count"] == 0:
-            tracking["student_initiated"] = True
-        
-        # Add student message to history
-        tracking["conversation_history"].append({
-            "speaker": "student",
-            "message": message,
-            "timestamp": datetime.utcnow().isoformat(),
-            "interrupted": interrupted
-        })
-        tracking["turn_order"].append("student")
-        session["turn_count"] += 1
+        gd_service.add_student_message(session, message, interrupted)
         
         # Get AI response(s) - multiple AI participants may react
         ai_responses = await gd_service.get_ai_responses(
             topic=session["topic"],
-            conversation_history=tracking["conversation_history"],
+            conversation_history=tracking["conversation_history"][session["summarized_upto"]:],
             ai_participants=session["ai_participants"],
-            student_message=message
+            student_message=message,
+            conversation_summary=session["conversation_summary"]
         )
         
         # Add AI responses to history
         for response in ai_responses:
-            tracking["conversation_history"].append(response)
-            tracking["turn_order"].append(response["speaker"])
+            gd_service.append_message(tracking, response)
         
         session["turn_count"] += len(ai_responses)
+        _schedule_summary(gd_id, session)
+        
+        if since is not None:
+            # This turn's AI responses are already in "messages"
+            return {
+                "gd_id": gd_id,
+                "student_message": message,
+                "turn_count": session["turn_count"],
+                **_delta(tracking, since)
+            }
         
         return {
             "gd_id": gd_id,
@@ -150,64 +185,222 @@ async def student_speak(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/{gd_id}/end")
+@router.post("/{gd_id}/end", status_code=202)
 async def end_gd(
     gd_id: str,
+    callback_url: Optional[str] = None,
     user_id: str = Depends(verify_user)
 ):
-    """End the GD and generate evaluation"""
+    """End the GD and queue the evaluation; poll /results or listen on /results/stream"""
     try:
         session = active_gd_sessions.get(gd_id)
         if not session:
+            # Already ended: hand back the existing evaluation job
+            record = evaluation_jobs.get(gd_id)
+            if record and record["user_id"] == user_id:
+                return evaluation_jobs.public(record)
             raise HTTPException(status_code=404, detail="GD session not found")
         
         if session["user_id"] != user_id:
             raise HTTPException(status_code=403, detail="Unauthorized")
         
-        # Generate behavior-based evaluation
-        evaluation = await gd_service.evaluate_gd_performance(
-            topic=session["topic"],
-            conversation_history=session["behavior_tracking"]["conversation_history"],
-            behavior_tracking=session["behavior_tracking"]
+        if callback_url and not await asyncio.to_thread(evaluation_jobs.valid_callback_url, callback_url):
+            raise HTTPException(status_code=400, detail="callback_url must be a public http(s) URL")
+        
+        session["status"] = "ended"
+        room = active_gd_rooms.pop(gd_id, None)
+        if room:
+            await room.close()
+        record = evaluation_jobs.submit(
+            gd_id,
+            "gd",
+            lambda: _evaluate_gd(gd_id, session, user_id),
+            user_id=user_id,
+            callback_url=callback_url
         )
         
-        results = {
-            "gd_id": gd_id,
-            "user_id": user_id,
-            "topic": session["topic"],
-            "mode": session["mode"],
-            "overall_score": evaluation["overall_score"],
-            "scores": evaluation["scores"],
-            "strengths": evaluation["strengths"],
-            "weaknesses": evaluation["weaknesses"],
-            "role_suitability": evaluation["role_suitability"],
-            "improvement_suggestions": evaluation["improvement_suggestions"],
-            "behavior_summary": session["behavior_tracking"],
-            "detailed_feedback": evaluation["detailed_feedback"],
-            "created_at": session["started_at"],
-            "completed_at": datetime.utcnow()
+        return {
+            **evaluation_jobs.public(record),
+            "results_url": f"/api/gd/{gd_id}/results",
+            "stream_url": f"/api/gd/{gd_id}/results/stream"
         }
-        
-        # Save to Firestore
-        firebase_service.update_interview(gd_id, {
-            "status": "completed",
-            "completed_at": datetime.utcnow(),
-            "results": results
-        })
-        
-        del active_gd_sessions[gd_id]
-        
-        return results
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.websocket("/{gd_id}/room")
+async def gd_room(
+    websocket: WebSocket,
+    gd_id: str,
+    since: int = 0,
+    user_id: str = Depends(verify_user)
+):
+    """
+    Live GD over one persistent connection. On connect the server sends a "state" event
+    (topic, participants and the messages after `since`), then pushes "typing" and
+    "message" events as personas take turns. The client sends {"type": "speaking"} when
+    the student starts and {"type": "message", "message": ...} when they finish;
+    interruptions are derived from that timing. End the GD with POST /end as usual.
+    """
+    await websocket.accept()
+    
+    session = active_gd_sessions.get(gd_id)
+    if not session or session["status"] != "active":
+        await websocket.close(code=4404, reason="GD session not active")
+        return
+    
+    if session["user_id"] != user_id:
+        await websocket.close(code=4403, reason="Unauthorized")
+        return
+    
+    room = active_gd_rooms.get(gd_id)
+    if room is None:
+        room = active_gd_rooms[gd_id] = GDRoom(
+            session, gd_service, after_turn=lambda: _schedule_summary(gd_id, session)
+        )
+    
+    try:
+        await websocket.send_json({
+            "type": "state",
+            "gd_id": gd_id,
+            "topic": session["topic"],
+            "ai_participants": session["ai_participants"],
+            "turn_count": session["turn_count"],
+            **_delta(session["behavior_tracking"], max(since, 0))
+        })
+        await room.serve(websocket)
+    finally:
+        # The last client left: drop the room (a reconnect rebuilds it from the session)
+        if room.empty and active_gd_rooms.get(gd_id) is room:
+            del active_gd_rooms[gd_id]
+
+
+def _schedule_summary(gd_id: str, session: Dict) -> None:
+    """Fold older turns into the running summary in the background"""
+    if not session["summarizing"] and gd_service.summary_due(session):
+        session["summarizing"] = True
+        job_queue.submit(
+            _refresh_summary, session,
+            priority=PRIORITY_LOW,
+            group=gd_id,
+            name="gd_summary"
+        )
+
+
+async def _refresh_summary(session: Dict) -> None:
+    try:
+        await gd_service.update_summary(session)
+    finally:
+        session["summarizing"] = False
+
+
+async def _evaluate_gd(gd_id: str, session: Dict, user_id: str) -> Dict:
+    """Evaluation job: behavior-based GD evaluation, saved to Firestore"""
+    # Let an in-flight summary finish, then fold whatever is still outside the recent window.
+    # If it is still running after the deadline, evaluate with what it has folded so far
+    # rather than summarising the same range twice.
+    await job_queue.wait_for(gd_id, timeout=settings.ANALYSIS_DEADLINE_SECONDS)
+    if not session["summarizing"] and gd_service.summary_due(session):
+        session["summarizing"] = True
+        try:
+            await gd_service.update_summary(session)
+        finally:
+            session["summarizing"] = False
+    
+    evaluation = await gd_service.evaluate_gd_performance(
+        topic=session["topic"],
+        conversation_history=session["behavior_tracking"]["conversation_history"][session["summarized_upto"]:],
+        behavior_tracking=session["behavior_tracking"],
+        conversation_summary=session["conversation_summary"]
+    )
+    
+    results = {
+        "gd_id": gd_id,
+        "user_id": user_id,
+        "topic": session["topic"],
+        "mode": session["mode"],
+        "overall_score": evaluation["overall_score"],
+        "scores": evaluation["scores"],
+        "strengths": evaluation["strengths"],
+        "weaknesses": evaluation["weaknesses"],
+        "role_suitability": evaluation["role_suitability"],
+        "improvement_suggestions": evaluation["improvement_suggestions"],
+        "behavior_summary": session["behavior_tracking"],
+        "detailed_feedback": evaluation["detailed_feedback"],
+        "created_at": session["started_at"],
+        "completed_at": datetime.utcnow()
+    }
+    
+    # Save to Firestore
+    await asyncio.to_thread(firebase_service.update_interview, gd_id, {
+        "status": "completed",
+        "completed_at": datetime.utcnow(),
+        "results": results
+    })
+    
+    active_gd_sessions.pop(gd_id, None)
+    
+    return results
+
+
+@router.get("/{gd_id}/results")
+async def get_gd_results(
+    gd_id: str,
+    user_id: str = Depends(verify_user)
+):
+    """GD evaluation results; 202 with the job status while the evaluation is still running"""
+    record = evaluation_jobs.get(gd_id)
+    if record:
+        if record["user_id"] != user_id:
+            raise HTTPException(status_code=403, detail="Unauthorized")
+        if record["status"] == "done":
+            return record["result"]
+        if record["status"] == "failed":
+            raise HTTPException(status_code=500, detail=f"Evaluation failed: {record['error']}")
+        return JSONResponse(status_code=202, content=evaluation_jobs.public(record))
+    
+    gd = firebase_service.get_interview(gd_id)
+    if not gd:
+        raise HTTPException(status_code=404, detail="GD session not found")
+    
+    if gd.get("user_id") != user_id:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    
+    if not gd.get("results"):
+        raise HTTPException(status_code=404, detail="Results not generated yet")
+    
+    return gd["results"]
+
+
+@router.get("/{gd_id}/results/stream")
+async def stream_gd_results(
+    gd_id: str,
+    user_id: str = Depends(verify_user)
+):
+    """Server-sent events: current job status, then a "done" (with results) or "failed" event"""
+    record = evaluation_jobs.get(gd_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="No evaluation job for this GD session")
+    
+    if record["user_id"] != user_id:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    
+    return StreamingResponse(
+        evaluation_jobs.event_stream(gd_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/{gd_id}/status")
 async def get_gd_status(
     gd_id: str,
+    since: Optional[int] = Query(None, ge=0, description="Last message seq the client has; returns a delta response"),
     user_id: str = Depends(verify_user)
 ):
-    """Get current GD session status"""
+    """Get current GD session status (a delta plus counters when `since` is given)"""
     session = active_gd_sessions.get(gd_id)
     if not session:
         raise HTTPException(status_code=404, detail="GD session not found")
@@ -215,6 +408,15 @@ async def get_gd_status(
     if session["user_id"] != user_id:
         raise HTTPException(status_code=403, detail="Unauthorized")
     
+    if since is not None:
+        return {
+            "gd_id": gd_id,
+            "topic": session["topic"],
+            "turn_count": session["turn_count"],
+            "status": session["status"],
+            **_delta(session["behavior_tracking"], since)
+        }
+    
     return {
         "gd_id": gd_id,
         "topic": session["topic"],
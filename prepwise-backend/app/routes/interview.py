@@ -1,5 +1,8 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Header
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Header, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Optional
+import asyncio
+import bisect
 import uuid
 from datetime import datetime
 import firebase_admin.auth
@@ -8,9 +11,14 @@ import firebase_admin.auth
 from app.models.interview import InterviewStart, InterviewResponse
 from app.services.firebase_service import FirebaseService
 from app.services.gemini_service import GeminiService
-from app.services.voice_emotion import VoiceEmotionService
-from app.services.video_analysis import VideoAnalysisService
-from app.utils.video_processing import extract_frames
+from app.services.voice_emotion import VoiceEmotionService, analyze_answer_audio
+from app.services.video_analysis import VideoAnalysisService, analyze_video_bytes
+from app.services.transcription import get_transcription_pool
+from app.services.job_queue import get_job_queue, PRIORITY_LOW
+from app.services.evaluation_jobs import get_evaluation_jobs
+from app.utils.analysis_summary import summarize_analyses, VOICE_METRICS, VIDEO_METRICS
+from app.utils.audio_processing import convert_audio_to_wav
+from app.config import settings
 
 # #region agent log
 import json
@@ -39,6 +47,8 @@ firebase_service = FirebaseService()
 gemini_service = GeminiService()
 voice_service = VoiceEmotionService()
 video_service = VideoAnalysisService()
+job_queue = get_job_queue()
+evaluation_jobs = get_evaluation_jobs()
 
 # In-memory active interviews
 active_interviews = {}
@@ -96,8 +106,10 @@ async def start_interview(
             "qa_pairs": [],
             "resume_data": interview_data.resume_data,
             "started_at": datetime.utcnow(),
+            "status": "active",
             "emotion_analyses": [],
-            "video_analyses": []
+            "video_analyses": [],
+            "answer_analyses": []
         }
 
         firebase_service.create_interview(interview_id, {
@@ -137,31 +149,67 @@ async def submit_answer(
         if interview["user_id"] != user_id and user_id != "user_123":
             raise HTTPException(status_code=403, detail="Unauthorized")
 
+        if interview["status"] != "active":
+            raise HTTPException(status_code=409, detail="Interview has ended")
+
         text_answer = answer or ""
 
+        # Reserve this answer's slot before the first await, so overlapping submissions
+        # get distinct indexes; the transcript fills it in below
+        answer_index = len(interview["answers"])
+        current_question = interview["questions"][-1]
+        interview["answers"].append(text_answer)
+        interview["qa_pairs"].append({
+            "question": current_question,
+            "answer": text_answer
+        })
+
         # ---------- AUDIO ----------
+        # Analysis already computed while the answer was streamed over the WebSocket;
+        # otherwise it runs as a background job and attaches to the session when ready
+        voice_data = interview.pop("streamed_voice_analysis", None)
         if audio:
-            audio_bytes = await audio.read()
-            voice_data = voice_service.get_comprehensive_analysis(audio_bytes)
-            text_answer = voice_data.get("transcription", text_answer)
-            if voice_data.get("emotions"):
-                interview["emotion_analyses"].append(voice_data["emotions"])
+            # Decode uploads (e.g. WebM) to WAV once; the analysis job and transcription share it
+            audio_bytes = await asyncio.to_thread(convert_audio_to_wav, await audio.read())
+            if not voice_data:
+                job_queue.submit(
+                    analyze_answer_audio, audio_bytes,
+                    cpu=True,
+                    group=interview_id,
+                    on_done=lambda data, index=answer_index: _attach_emotions(interview, index, data),
+                    name="audio_analysis"
+                )
+            # The transcript is the answer text, so it is still awaited
+            transcription = await voice_service.transcribe_audio_async(audio_bytes)
+            # Keep the typed answer when there is no transcript
+            if transcription:
+                text_answer = transcription
+        _attach_emotions(interview, answer_index, voice_data)
 
         # ---------- VIDEO ----------
-        if video:
+        # Frames streamed over the WebSocket were already analyzed; no need to upload the clip
+        video_data = interview.pop("streamed_video_analysis", None)
+        if video and not video_data:
             video_bytes = await video.read()
-            frames = extract_frames(video_bytes)
-            video_data = video_service.analyze_video(frames)
-            if video_data:
-                interview["video_analyses"].append(video_data)
+            job_queue.submit(
+                analyze_video_bytes, video_bytes,
+                cpu=True,
+                group=interview_id,
+                on_done=lambda data, index=answer_index: _attach_analysis(interview, "video_analyses", index, data),
+                name="video_analysis"
+            )
+        _attach_analysis(interview, "video_analyses", answer_index, video_data)
 
-        current_question = interview["questions"][-1]
+        interview["answers"][answer_index] = text_answer
+        interview["qa_pairs"][answer_index]["answer"] = text_answer
 
-        interview["answers"].append(text_answer)
-        interview["qa_pairs"].append({
-            "question": current_question,
-            "answer": text_answer
-        })
+        # Score the answer now, after the audio/video jobs, so /end only has to aggregate
+        job_queue.submit(
+            _score_answer, interview, answer_index,
+            priority=PRIORITY_LOW,
+            group=interview_id,
+            name="answer_scoring"
+        )
 
         question_number = len(interview["questions"])
         is_finished = question_number >= 5
@@ -195,68 +243,295 @@ async def submit_answer(
             "transcribed_text": text_answer
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ---------------- STREAM ANSWER AUDIO ----------------
+@router.websocket("/{interview_id}/audio/stream")
+async def stream_answer_audio(
+    websocket: WebSocket,
+    interview_id: str,
+    sample_rate: int = 16000,
+    channels: int = 1,
+    user_id: str = Depends(verify_user)
+):
+    """
+    Receive the answer audio while the candidate speaks.
+    Binary messages are 16-bit PCM (or a WAV stream whose first message holds the header);
+    a text message "end" finishes the answer and returns the voice analysis.
+    The analysis is then used by the next /answer submission instead of re-analysing the audio.
+    """
+    await websocket.accept()
+
+    interview = active_interviews.get(interview_id)
+    if not interview:
+        await websocket.close(code=4404, reason="Interview not active")
+        return
+
+    if interview["user_id"] != user_id and user_id != "user_123":
+        await websocket.close(code=4403, reason="Unauthorized")
+        return
+
+    if interview["status"] != "active":
+        await websocket.close(code=4409, reason="Interview has ended")
+        return
+
+    stream = voice_service.start_stream(sample_rate=sample_rate, channels=channels)
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                stream.feed(message["bytes"])
+            elif message.get("text", "").strip().lower() == "end":
+                break
+
+        analysis = voice_service.finish_stream(stream)
+        interview["streamed_voice_analysis"] = analysis
+        await websocket.send_json({"type": "analysis", **analysis})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        await websocket.close(code=1011, reason=str(e)[:120])
+
+
+@router.websocket("/{interview_id}/video/stream")
+async def stream_answer_video(
+    websocket: WebSocket,
+    interview_id: str,
+    interval: float = 1.0,
+    user_id: str = Depends(verify_user)
+):
+    """
+    Receive the answer video while the candidate speaks.
+    Binary messages are either JPEG/PNG frames or short self-contained video segments
+    (e.g. WebM from a MediaRecorder restarted every few seconds). Frames are sampled
+    every `interval` seconds and analyzed as they arrive; a text message "end" returns
+    the aggregated video analysis, which the next /answer submission then uses.
+    """
+    await websocket.accept()
+
+    interview = active_interviews.get(interview_id)
+    if not interview:
+        await websocket.close(code=4404, reason="Interview not active")
+        return
+
+    if interview["user_id"] != user_id and user_id != "user_123":
+        await websocket.close(code=4403, reason="Unauthorized")
+        return
+
+    if interview["status"] != "active":
+        await websocket.close(code=4409, reason="Interview has ended")
+        return
+
+    stream = video_service.start_stream(frame_interval=max(interval, 0.1))
+    max_bytes = settings.MAX_VIDEO_SIZE_MB * 1024 * 1024
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            data = message.get("bytes")
+            if data:
+                if len(data) > max_bytes:
+                    await websocket.close(code=1009, reason="Message too large")
+                    return
+                # Decoding and face detection are CPU-bound; keep them off the event loop.
+                # Stills are stamped on arrival so ones that aren't due are dropped undecoded.
+                if data[:3] == b"\xff\xd8\xff" or data[:8] == b"\x89PNG\r\n\x1a\n":
+                    arrived = stream.arrival_time()
+                    if stream.is_due(arrived):
+                        await asyncio.to_thread(stream.feed_jpeg, data, arrived)
+                else:
+                    await asyncio.to_thread(stream.feed_segment, data)
+            elif message.get("text", "").strip().lower() == "end":
+                break
+
+        analysis = video_service.finish_stream(stream)
+        interview["streamed_video_analysis"] = analysis
+        await websocket.send_json({"type": "analysis", **analysis})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        await websocket.close(code=1011, reason=str(e)[:120])
+
+
+def _attach_analysis(interview: dict, key: str, answer_index: int, data: Optional[dict]) -> None:
+    """
+    Add an answer's analysis to the session list, kept in answer order
+    even when background jobs finish out of order
+    """
+    if not data:
+        return
+    order = interview.setdefault(f"{key}_order", [])
+    position = bisect.bisect_right(order, answer_index)
+    order.insert(position, answer_index)
+    interview[key].insert(position, data)
+
+
+def _attach_emotions(interview: dict, answer_index: int, voice_data: Optional[dict]) -> None:
+    if voice_data and voice_data.get("emotions"):
+        _attach_analysis(interview, "emotion_analyses", answer_index, voice_data["emotions"])
+
+
+async def _score_answer(interview: dict, answer_index: int) -> Optional[dict]:
+    """
+    Score an answer once. The background job and the final evaluation share the same
+    task, so an answer is never sent to the model twice and its score is attached
+    before the evaluation reads it.
+    """
+    tasks = interview.setdefault("answer_scoring_tasks", {})
+    task = tasks.get(answer_index)
+    if task is None:
+        task = tasks[answer_index] = asyncio.ensure_future(_analyze_and_attach(interview, answer_index))
+    return await asyncio.shield(task)
+
+
+async def _analyze_and_attach(interview: dict, answer_index: int) -> Optional[dict]:
+    qa = interview["qa_pairs"][answer_index]
+    analysis = await gemini_service.analyze_answer(qa["question"], qa["answer"], interview["interview_type"])
+    _attach_analysis(interview, "answer_analyses", answer_index, analysis)
+    return analysis
+
+
+def _answer_analyses(interview: dict) -> list:
+    """Per-answer scores in answer order, None for answers whose scoring hasn't landed"""
+    by_index = dict(zip(interview.get("answer_analyses_order", []), interview.get("answer_analyses", [])))
+    return [by_index.get(index) for index in range(len(interview["qa_pairs"]))]
+
+
+def _summarize_session(interview: dict, key: str, metrics) -> Optional[dict]:
+    """Per-metric aggregates over the session's analyses, or None when there are none"""
+    analyses = interview.get(key)
+    if not analyses:
+        return None
+    answer_numbers = [index + 1 for index in interview.get(f"{key}_order", range(len(analyses)))]
+    return summarize_analyses(analyses, metrics, answer_numbers)
+
+
 # ---------------- END INTERVIEW ----------------
-@router.post("/{interview_id}/end")
+@router.post("/{interview_id}/end", status_code=202)
 async def end_interview(
     interview_id: str,
+    callback_url: Optional[str] = None,
     user_id: str = Depends(verify_user)
 ):
+    """
+    Queue the final evaluation and return its job id right away.
+    Poll /results, listen on /results/stream (SSE) or pass callback_url to get a POST when done.
+    """
     try:
         interview = active_interviews.get(interview_id)
 
         if not interview:
+            # Already ended: hand back the existing evaluation job
+            record = evaluation_jobs.get(interview_id)
+            if record:
+                _check_job_owner(record, user_id)
+                return evaluation_jobs.public(record)
             raise HTTPException(status_code=404, detail="Interview not found")
 
         if interview["user_id"] != user_id and user_id != "user_123":
             raise HTTPException(status_code=403, detail="Unauthorized")
 
-        feedback = await gemini_service.generate_final_feedback(
-            interview_type=interview["interview_type"],
-            all_qa_pairs=interview["qa_pairs"],
-            emotion_analysis=None,
-            video_analysis=None
-        )
-
-        results = {
-            "interview_id": interview_id,
-            "user_id": user_id,
-            "interview_type": interview["interview_type"],
-            "mode": interview["mode"],
-            "overall_score": feedback["overall_score"],
-            "scores": feedback["scores"],
-            "strengths": feedback["strengths"],
-            "weaknesses": feedback["weaknesses"],
-            "detailed_feedback": feedback["detailed_feedback"],
-            "created_at": interview["started_at"]
-        }
+        if callback_url and not await asyncio.to_thread(evaluation_jobs.valid_callback_url, callback_url):
+            raise HTTPException(status_code=400, detail="callback_url must be a public http(s) URL")
 
-        firebase_service.update_interview(
+        # No more answers or streams once the evaluation is queued
+        interview["status"] = "ended"
+        record = evaluation_jobs.submit(
             interview_id,
-            {
-                "status": "completed",
-                "completed_at": datetime.utcnow(),
-                "results": results
-            }
+            "interview",
+            lambda: _evaluate_interview(interview_id, interview, user_id),
+            user_id=user_id,
+            callback_url=callback_url
         )
 
-        del active_interviews[interview_id]
-
-        return results
+        return {
+            **evaluation_jobs.public(record),
+            "results_url": f"/api/interview/{interview_id}/results",
+            "stream_url": f"/api/interview/{interview_id}/results/stream"
+        }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _evaluate_interview(interview_id: str, interview: dict, user_id: str) -> dict:
+    """Evaluation job: final feedback over the whole interview, saved to Firestore"""
+    # Give outstanding audio/video analyses a bounded amount of time to land
+    still_pending = await job_queue.wait_for(interview_id, timeout=settings.ANALYSIS_DEADLINE_SECONDS)
+    if still_pending:
+        print(f"[Interview] {still_pending} analysis job(s) for {interview_id} missed the deadline")
+
+    # Answers are normally scored by now; score any that missed the deadline in parallel.
+    # _score_answer joins a scoring call that is already in flight instead of repeating it.
+    answer_analyses = _answer_analyses(interview)
+    missing = [index for index, analysis in enumerate(answer_analyses) if analysis is None]
+    if missing:
+        await asyncio.gather(*[_score_answer(interview, index) for index in missing], return_exceptions=True)
+        answer_analyses = _answer_analyses(interview)
+
+    feedback = await gemini_service.summarize_final_feedback(
+        interview_type=interview["interview_type"],
+        all_qa_pairs=interview["qa_pairs"],
+        answer_analyses=answer_analyses,
+        emotion_analysis=_summarize_session(interview, "emotion_analyses", VOICE_METRICS),
+        video_analysis=_summarize_session(interview, "video_analyses", VIDEO_METRICS)
+    )
+
+    results = {
+        "interview_id": interview_id,
+        "user_id": user_id,
+        "interview_type": interview["interview_type"],
+        "mode": interview["mode"],
+        "overall_score": feedback["overall_score"],
+        "scores": feedback["scores"],
+        "strengths": feedback["strengths"],
+        "weaknesses": feedback["weaknesses"],
+        "detailed_feedback": feedback["detailed_feedback"],
+        "answer_feedback": [
+            {key: value for key, value in analysis.items() if key != "raw"} if analysis else None
+            for analysis in answer_analyses
+        ],
+        "created_at": interview["started_at"]
+    }
+
+    await asyncio.to_thread(
+        firebase_service.update_interview,
+        interview_id,
+        {
+            "status": "completed",
+            "completed_at": datetime.utcnow(),
+            "results": results
+        }
+    )
+
+    active_interviews.pop(interview_id, None)
+
+    return results
+
+
 # ---------------- GET RESULTS ----------------
 @router.get("/{interview_id}/results")
 async def get_interview_results(
     interview_id: str,
     user_id: str = Depends(verify_user)
 ):
+    record = evaluation_jobs.get(interview_id)
+    if record:
+        return _job_results(record, user_id)
+
     interview = firebase_service.get_interview(interview_id)
 
     if not interview:
@@ -276,6 +551,56 @@ async def get_interview_results(
     return results
 
 
+@router.get("/{interview_id}/results/stream")
+async def stream_interview_results(
+    interview_id: str,
+    user_id: str = Depends(verify_user)
+):
+    """Server-sent events: current job status, then a "done" (with results) or "failed" event"""
+    record = evaluation_jobs.get(interview_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="No evaluation job for this interview")
+    _check_job_owner(record, user_id)
+
+    return StreamingResponse(
+        evaluation_jobs.event_stream(interview_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _check_job_owner(record: dict, user_id: str) -> None:
+    owner = record.get("user_id")
+    if owner and owner != user_id and user_id != "user_123":
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+
+def _job_results(record: dict, user_id: str):
+    """Results once the job is done; 202 with the job status while it is still running"""
+    _check_job_owner(record, user_id)
+    if record["status"] == "done":
+        return record["result"]
+    if record["status"] == "failed":
+        raise HTTPException(status_code=500, detail=f"Evaluation failed: {record['error']}")
+    return JSONResponse(status_code=202, content=evaluation_jobs.public(record))
+
+
+# ---------------- TRANSCRIPTION METRICS ----------------
+@router.get("/transcription/metrics")
+async def get_transcription_metrics():
+    """Speech-to-text pool throughput, queue length and real-time factor"""
+    if settings.TRANSCRIPTION_BACKEND == "none":
+        return {"backend": "none"}
+    return get_transcription_pool().metrics()
+
+
+# ---------------- JOB METRICS ----------------
+@router.get("/jobs/metrics")
+async def get_job_metrics():
+    """Background analysis queue length, throughput and wait/run times"""
+    return job_queue.metrics()
+
+
 # ---------------- HISTORY ----------------
 @router.get("/history/{user_id}")
 async def get_interview_history(user_id: str):
@@ -1,12 +1,16 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Query
+from fastapi.responses import StreamingResponse
 from typing import Dict
+import zipfile
 
 from app.services.resume_parser import ResumeParser
+from app.services.bulk_resume_ingest import BulkResumeIngestor
 from app.utils.validators import validate_file_extension
 
 router = APIRouter(prefix="/resume", tags=["resume"])
 
 resume_parser = ResumeParser()
+bulk_ingestor = BulkResumeIngestor()
 
 def verify_user(token: str = None):
     """Verify Firebase token - placeholder"""
@@ -42,6 +46,7 @@ async def upload_resume(
 @router.post("/parse")
 async def parse_resume(
     file: UploadFile = File(...),
+    fast: bool = Query(False, description="Only extract header, contact and skills"),
     user_id: str = Depends(verify_user)
 ):
     """Parse resume file and extract information"""
@@ -56,7 +61,7 @@ async def parse_resume(
             raise HTTPException(status_code=400, detail="File size exceeds 10MB limit")
         
         # Parse resume
-        parsed_data = resume_parser.parse_resume(file_bytes, file.filename)
+        parsed_data = resume_parser.parse_resume(file_bytes, file.filename, fast=fast)
         
         return {
             'success': True,
@@ -68,3 +73,26 @@ async def parse_resume(
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/bulk")
+async def bulk_parse_resumes(
+    file: UploadFile = File(...),
+    user_id: str = Depends(verify_user)
+):
+    """
+    Parse a ZIP archive of resumes (PDF/DOCX) in one job.
+    Results are streamed back as NDJSON, one line per resume, with progress.
+    """
+    if not validate_file_extension(file.filename, ['.zip']):
+        raise HTTPException(status_code=400, detail="Only ZIP archives are allowed")
+    
+    try:
+        # Entries are read straight from the uploaded file, nothing is extracted to disk
+        archive = zipfile.ZipFile(file.file)
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="Invalid ZIP archive")
+    
+    return StreamingResponse(
+        bulk_ingestor.ingest(archive, user_id),
+        media_type="application/x-ndjson"
+    )
@@ -1,13 +1,37 @@
 from .firebase_service import FirebaseService
 from .gemini_service import GeminiService
+from .local_firestore import LocalFirestore, create_local_client
 from .voice_emotion import VoiceEmotionService
 from .video_analysis import VideoAnalysisService
 from .resume_parser import ResumeParser
+from .bulk_resume_ingest import BulkResumeIngestor
+from .transcription import TranscriptionEngine, TranscriptionPool, get_transcription_pool
+from .job_queue import JobQueue, get_job_queue
+from .evaluation_jobs import EvaluationJobs, get_evaluation_jobs
+from .model_router import ModelEndpoint, ModelRouter, get_model_router
+from .gd_room import GDRoom
+from .topic_reservoir import TopicReservoir, get_topic_reservoir
 
 __all__ = [
     'FirebaseService',
     'GeminiService',
+    'LocalFirestore',
+    'create_local_client',
     'VoiceEmotionService',
     'VideoAnalysisService',
-    'ResumeParser'
+    'ResumeParser',
+    'BulkResumeIngestor',
+    'TranscriptionEngine',
+    'TranscriptionPool',
+    'get_transcription_pool',
+    'JobQueue',
+    'get_job_queue',
+    'EvaluationJobs',
+    'get_evaluation_jobs',
+    'ModelEndpoint',
+    'ModelRouter',
+    'get_model_router',
+    'GDRoom',
+    'TopicReservoir',
+    'get_topic_reservoir'
 ]
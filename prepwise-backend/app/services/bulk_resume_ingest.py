@@ -0,0 +1,203 @@
+import asyncio
+import json
+import os
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.config import settings
+from app.services.firebase_service import FirebaseService
+from app.services.resume_parser import ResumeParser
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+
+# Per-entry cap, same as the single-file /resume/parse endpoint
+MAX_ENTRY_BYTES = 10 * 1024 * 1024
+
+# One parser per worker process, created on first use
+_worker_parser: Optional[ResumeParser] = None
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _parse_entry(file_bytes: bytes, filename: str) -> Dict:
+    """Parse a single archive entry inside a worker process"""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = ResumeParser()
+    return _worker_parser.parse_resume(file_bytes, filename.lower())
+
+
+def _worker_count() -> int:
+    return settings.BULK_RESUME_WORKERS or os.cpu_count() or 1
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Shared process pool for CPU-bound resume parsing"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=_worker_count())
+    return _executor
+
+
+def _read_entry(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    """Read one entry straight out of the archive (no extraction to disk)"""
+    with archive.open(info) as entry:
+        return entry.read(MAX_ENTRY_BYTES + 1)
+
+
+class BulkResumeIngestor:
+    """
+    Streams resumes out of a ZIP archive, parses them on a process pool with
+    bounded concurrency and reports progress as NDJSON lines
+    """
+
+    def __init__(self):
+        self.firebase = FirebaseService()
+
+    def list_entries(self, archive: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+        """Return the archive entries that look like resumes"""
+        entries = []
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            name = os.path.basename(info.filename)
+            # Skip hidden files and macOS resource forks
+            if not name or name.startswith('.') or info.filename.startswith('__MACOSX/'):
+                continue
+            if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                entries.append(info)
+        return entries
+
+    async def ingest(self, archive: zipfile.ZipFile, user_id: str) -> AsyncIterator[str]:
+        """
+        Parse every resume in the archive and yield NDJSON events:
+        one "job" header, one "result" per entry and a final "summary".
+        Entries beyond BULK_RESUME_MAX_FILES get a "skipped" result right after the header.
+        """
+        job_id = str(uuid.uuid4())
+        entries = self.list_entries(archive)
+        skipped = entries[settings.BULK_RESUME_MAX_FILES:]
+        entries = entries[:settings.BULK_RESUME_MAX_FILES]
+        total = len(entries)
+
+        yield self._line({'type': 'job', 'job_id': job_id, 'total': total, 'skipped': len(skipped)})
+        for index, info in enumerate(skipped, start=total):
+            yield self._line({
+                'type': 'result',
+                'index': index,
+                'filename': info.filename,
+                'status': 'skipped',
+                'error': f"skipped: limit of {settings.BULK_RESUME_MAX_FILES} files reached"
+            })
+
+        loop = asyncio.get_running_loop()
+        executor = _get_executor()
+        # Cap in-flight entries so only a handful of files are held in memory
+        in_flight = asyncio.Semaphore(_worker_count() * 2)
+        results: asyncio.Queue = asyncio.Queue()
+        tasks = set()
+
+        async def run_entry(index: int, info: zipfile.ZipInfo, file_bytes: bytes) -> None:
+            try:
+                data = await loop.run_in_executor(executor, _parse_entry, file_bytes, info.filename)
+                await results.put((index, info, data, None))
+            except Exception as e:
+                await results.put((index, info, None, str(e)))
+            finally:
+                in_flight.release()
+
+        async def produce() -> None:
+            for index, info in enumerate(entries):
+                await in_flight.acquire()
+                if info.file_size > MAX_ENTRY_BYTES:
+                    in_flight.release()
+                    await results.put((index, info, None, "File size exceeds 10MB limit"))
+                    continue
+                try:
+                    file_bytes = await loop.run_in_executor(None, _read_entry, archive, info)
+                except Exception as e:
+                    in_flight.release()
+                    await results.put((index, info, None, f"Error reading entry: {str(e)}"))
+                    continue
+                if len(file_bytes) > MAX_ENTRY_BYTES:
+                    in_flight.release()
+                    await results.put((index, info, None, "File size exceeds 10MB limit"))
+                    continue
+                task = asyncio.create_task(run_entry(index, info, file_bytes))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+        producer = asyncio.create_task(produce())
+
+        done = 0
+        succeeded = 0
+        persisted = 0
+        pending_writes: List[Dict] = []
+
+        try:
+            while done < total:
+                index, info, data, error = await results.get()
+                done += 1
+                event = {
+                    'type': 'result',
+                    'index': index,
+                    'filename': info.filename,
+                    'progress': {'done': done, 'total': total}
+                }
+                if error is None:
+                    succeeded += 1
+                    event['status'] = 'ok'
+                    event['data'] = {k: v for k, v in data.items() if k != 'raw_text'}
+                    pending_writes.append({
+                        'id': f"{job_id}_{index}",
+                        'job_id': job_id,
+                        'filename': info.filename,
+                        'uploaded_by': user_id,
+                        'data': data
+                    })
+                else:
+                    event['status'] = 'error'
+                    event['error'] = error
+                yield self._line(event)
+
+                if len(pending_writes) >= settings.BULK_RESUME_WRITE_BATCH_SIZE:
+                    flushed, flush_error = await self._flush(pending_writes)
+                    persisted += flushed
+                    if flush_error:
+                        yield self._line({'type': 'error', 'error': flush_error})
+                    pending_writes = []
+
+            if pending_writes:
+                flushed, flush_error = await self._flush(pending_writes)
+                persisted += flushed
+                if flush_error:
+                    yield self._line({'type': 'error', 'error': flush_error})
+        finally:
+            producer.cancel()
+            for task in tasks:
+                task.cancel()
+
+        yield self._line({
+            'type': 'summary',
+            'job_id': job_id,
+            'total': total,
+            'succeeded': succeeded,
+            'failed': total - succeeded,
+            'skipped': len(skipped),
+            'persisted': persisted
+        })
+
+    async def _flush(self, records: List[Dict]):
+        """Write a batch of parsed resumes without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self.firebase.save_parsed_resumes, records)
+            return len(records), None
+        except Exception as e:
+            print(f"[BulkResumeIngestor] Batch write failed: {e}")
+            return 0, f"Failed to save {len(records)} resumes: {str(e)}"
+
+    @staticmethod
+    def _line(event: Dict) -> str:
+        return json.dumps(event, default=str) + "\n"
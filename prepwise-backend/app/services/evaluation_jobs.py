@@ -0,0 +1,190 @@
+import asyncio
+import ipaddress
+import json
+import socket
+from collections import OrderedDict
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+import requests
+from app.config import settings
+from app.services.job_queue import JobQueue, PRIORITY_HIGH
+
+# Finished records kept for /results polling before the oldest are evicted
+MAX_TRACKED_JOBS = 1000
+# SSE comment sent while waiting so proxies don't close an idle stream
+SSE_KEEPALIVE_SECONDS = 15.0
+WEBHOOK_TIMEOUT_SECONDS = 10
+
+
+class EvaluationJobs:
+    """
+    Final-evaluation jobs for interview and GD sessions. Ending a session queues the
+    LLM evaluation here and returns immediately; EVALUATION_MAX_CONCURRENCY workers
+    cap how many evaluations run at once. Each session has at most one job, and its
+    record is what /results polls and the SSE stream waits on.
+    """
+
+    def __init__(self, max_concurrency: int = 4, allowed_callback_hosts: Optional[List[str]] = None):
+        self.queue = JobQueue(workers=max_concurrency)
+        self.allowed_callback_hosts = {host.lower() for host in allowed_callback_hosts or []}
+        self._records: "OrderedDict[str, Dict]" = OrderedDict()
+        self._done: Dict[str, asyncio.Event] = {}
+
+    def submit(
+        self,
+        session_id: str,
+        kind: str,
+        evaluate: Callable[[], Awaitable[Dict]],
+        user_id: Optional[str] = None,
+        callback_url: Optional[str] = None
+    ) -> Dict:
+        """
+        Queue evaluate() for the session and return its job record.
+        Ending the same session twice returns the existing job unless it failed.
+        """
+        record = self._records.get(session_id)
+        if record and record['status'] != 'failed':
+            return record
+
+        record = {
+            'job_id': None,
+            'session_id': session_id,
+            'kind': kind,
+            'user_id': user_id,
+            'status': 'pending',
+            'created_at': datetime.utcnow().isoformat(),
+            'completed_at': None,
+            'result': None,
+            'error': None
+        }
+        self._records[session_id] = record
+        self._records.move_to_end(session_id)
+        self._done[session_id] = asyncio.Event()
+        self._evict()
+
+        async def run() -> Dict:
+            record['status'] = 'running'
+            try:
+                record['result'] = await evaluate()
+                record['status'] = 'done'
+            except Exception as e:
+                print(f"[EvaluationJobs] {kind} evaluation for {session_id} failed: {e}")
+                record['status'] = 'failed'
+                record['error'] = str(e)
+            record['completed_at'] = datetime.utcnow().isoformat()
+            self._done[session_id].set()
+            if callback_url:
+                asyncio.get_running_loop().run_in_executor(None, self._post_webhook, callback_url, record)
+            return record
+
+        job = self.queue.submit(run, priority=PRIORITY_HIGH, name=f"{kind}_evaluation")
+        record['job_id'] = job.id
+        return record
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        return self._records.get(session_id)
+
+    async def wait(self, session_id: str, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Wait until the session's job finishes (or timeout) and return its record"""
+        event = self._done.get(session_id)
+        if event is None:
+            return self.get(session_id)
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.get(session_id)
+
+    async def event_stream(self, session_id: str) -> AsyncIterator[str]:
+        """Server-sent events: the current status, then one final "done"/"failed" event"""
+        record = self.get(session_id)
+        if record is None:
+            return
+        yield self._event('status', self.public(record))
+        while record['status'] in ('pending', 'running'):
+            record = await self.wait(session_id, timeout=SSE_KEEPALIVE_SECONDS)
+            if record['status'] in ('pending', 'running'):
+                yield ": keepalive\n\n"
+        yield self._event(record['status'], {**self.public(record), 'result': record['result']})
+
+    @staticmethod
+    def public(record: Dict) -> Dict:
+        """Record fields for status responses (without the result payload)"""
+        return {key: value for key, value in record.items() if key != 'result'}
+
+    def valid_callback_url(self, url: str) -> bool:
+        """
+        Callback URLs must be http(s). With EVALUATION_CALLBACK_ALLOWED_HOSTS set the host
+        must be listed; otherwise every address it resolves to must be public, so a
+        callback can't be aimed at loopback, private, link-local or reserved addresses.
+        Blocking (resolves the host); call it off the event loop.
+        """
+        try:
+            parsed = urlparse(url)
+            host, port = parsed.hostname, parsed.port
+        except ValueError:
+            return False
+        if parsed.scheme not in ('http', 'https') or not host:
+            return False
+        if self.allowed_callback_hosts:
+            return host.lower() in self.allowed_callback_hosts
+
+        try:
+            addresses = socket.getaddrinfo(host, port or (443 if parsed.scheme == 'https' else 80))
+        except (socket.gaierror, UnicodeError):
+            return False
+        for *_, sockaddr in addresses:
+            address = ipaddress.ip_address(sockaddr[0].split('%')[0])
+            if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+                address = address.ipv4_mapped
+            if not address.is_global or address.is_multicast:
+                return False
+        return bool(addresses)
+
+    def _post_webhook(self, url: str, record: Dict) -> None:
+        # Re-checked at send time: the host may resolve differently than when the job was queued
+        if not self.valid_callback_url(url):
+            print(f"[EvaluationJobs] Webhook {url} rejected: not an allowed callback address")
+            return
+        try:
+            response = requests.post(
+                url,
+                data=json.dumps({**self.public(record), 'result': record['result']}, default=str),
+                headers={'Content-Type': 'application/json'},
+                timeout=WEBHOOK_TIMEOUT_SECONDS,
+                allow_redirects=False
+            )
+            if response.status_code >= 400:
+                print(f"[EvaluationJobs] Webhook {url} returned {response.status_code}")
+        except Exception as e:
+            print(f"[EvaluationJobs] Webhook {url} failed: {e}")
+
+    def _evict(self) -> None:
+        """Drop the oldest finished records beyond MAX_TRACKED_JOBS"""
+        for session_id in list(self._records):
+            if len(self._records) <= MAX_TRACKED_JOBS:
+                break
+            if self._records[session_id]['status'] in ('done', 'failed'):
+                del self._records[session_id]
+                self._done.pop(session_id, None)
+
+    @staticmethod
+    def _event(name: str, data: Dict) -> str:
+        return f"event: {name}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+_evaluation_jobs: Optional[EvaluationJobs] = None
+
+
+def get_evaluation_jobs() -> EvaluationJobs:
+    """Process-wide evaluation jobs shared by the interview and GD routes"""
+    global _evaluation_jobs
+    if _evaluation_jobs is None:
+        _evaluation_jobs = EvaluationJobs(
+            max_concurrency=settings.EVALUATION_MAX_CONCURRENCY,
+            allowed_callback_hosts=[
+                host.strip() for host in settings.EVALUATION_CALLBACK_ALLOWED_HOSTS.split(',') if host.strip()
+            ]
+        )
+    return _evaluation_jobs
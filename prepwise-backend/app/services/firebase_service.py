@@ -4,6 +4,7 @@ from typing import Optional, Dict, List
 from datetime import datetime
 import os
 from app.config import settings
+from app.services.local_firestore import create_local_client
 
 # #region agent log
 import json
@@ -24,66 +25,76 @@ def log_debug(location, message, data=None, hypothesis_id="D"):
         pass
 # #endregion
 
-# Initialize Firebase Admin
-# #region agent log
-log_debug("firebase_service.py:init_start", "Firebase initialization starting", {}, "D")
-# #endregion
+if settings.PERSISTENCE_BACKEND != "firestore":
+    # Local stand-in (benchmarks, offline development): no Firebase credentials needed
+    db = create_local_client(
+        settings.PERSISTENCE_BACKEND,
+        settings.PERSISTENCE_SQLITE_PATH,
+        settings.PERSISTENCE_LATENCY_MS
+    )
+    print(f"[FirebaseService] Using local {settings.PERSISTENCE_BACKEND} persistence "
+          f"({settings.PERSISTENCE_LATENCY_MS:g} ms per round trip)")
+else:
+    # Initialize Firebase Admin
+    # #region agent log
+    log_debug("firebase_service.py:init_start", "Firebase initialization starting", {}, "D")
+    # #endregion
 
-try:
-    if not firebase_admin._apps:
-        # #region agent log
-        log_debug("firebase_service.py:init_check", "Firebase not initialized, starting init", {
-            "has_credentials_path": bool(settings.FIREBASE_CREDENTIALS_PATH),
-            "project_id": settings.FIREBASE_PROJECT_ID
-        }, "D")
-        # #endregion
-        
-        if settings.FIREBASE_CREDENTIALS_PATH:
-            cred = credentials.Certificate(settings.FIREBASE_CREDENTIALS_PATH)
+    try:
+        if not firebase_admin._apps:
             # #region agent log
-            log_debug("firebase_service.py:init_cred_file", "Using credentials file", {
-                "path": settings.FIREBASE_CREDENTIALS_PATH
+            log_debug("firebase_service.py:init_check", "Firebase not initialized, starting init", {
+                "has_credentials_path": bool(settings.FIREBASE_CREDENTIALS_PATH),
+                "project_id": settings.FIREBASE_PROJECT_ID
             }, "D")
             # #endregion
+        
+            if settings.FIREBASE_CREDENTIALS_PATH:
+                cred = credentials.Certificate(settings.FIREBASE_CREDENTIALS_PATH)
+                # #region agent log
+                log_debug("firebase_service.py:init_cred_file", "Using credentials file", {
+                    "path": settings.FIREBASE_CREDENTIALS_PATH
+                }, "D")
+                # #endregion
+            else:
+                # Use default credentials (for Cloud Run)
+                cred = credentials.ApplicationDefault()
+                # #region agent log
+                log_debug("firebase_service.py:init_cred_default", "Using default credentials", {}, "D")
+                # #endregion
+        
+            firebase_admin.initialize_app(cred, {
+                'projectId': settings.FIREBASE_PROJECT_ID
+            })
+            # #region agent log
+            log_debug("firebase_service.py:init_success", "Firebase initialized successfully", {}, "D")
+            # #endregion
         else:
-            # Use default credentials (for Cloud Run)
-            cred = credentials.ApplicationDefault()
             # #region agent log
-            log_debug("firebase_service.py:init_cred_default", "Using default credentials", {}, "D")
+            log_debug("firebase_service.py:init_skip", "Firebase already initialized", {}, "D")
             # #endregion
-        
-        firebase_admin.initialize_app(cred, {
-            'projectId': settings.FIREBASE_PROJECT_ID
-        })
+    except Exception as e:
         # #region agent log
-        log_debug("firebase_service.py:init_success", "Firebase initialized successfully", {}, "D")
+        log_debug("firebase_service.py:init_error", "Firebase initialization failed", {
+            "error": str(e),
+            "type": type(e).__name__
+        }, "D")
         # #endregion
-    else:
+        # Don't raise - allow app to continue without Firebase for now
+        pass
+
+    try:
+        db = firestore.client()
         # #region agent log
-        log_debug("firebase_service.py:init_skip", "Firebase already initialized", {}, "D")
+        log_debug("firebase_service.py:db_client", "Firestore client created", {}, "D")
         # #endregion
-except Exception as e:
-    # #region agent log
-    log_debug("firebase_service.py:init_error", "Firebase initialization failed", {
-        "error": str(e),
-        "type": type(e).__name__
-    }, "D")
-    # #endregion
-    # Don't raise - allow app to continue without Firebase for now
-    pass
-
-try:
-    db = firestore.client()
-    # #region agent log
-    log_debug("firebase_service.py:db_client", "Firestore client created", {}, "D")
-    # #endregion
-except Exception as e:
-    # #region agent log
-    log_debug("firebase_service.py:db_client_error", "Firestore client creation failed", {
-        "error": str(e)
-    }, "D")
-    # #endregion
-    db = None
+    except Exception as e:
+        # #region agent log
+        log_debug("firebase_service.py:db_client_error", "Firestore client creation failed", {
+            "error": str(e)
+        }, "D")
+        # #endregion
+        db = None
 
 class FirebaseService:
     @staticmethod
@@ -236,6 +247,17 @@ class FirebaseService:
             return data
         return None
 
+    @staticmethod
+    def save_parsed_resumes(records: List[Dict], batch_size: int = 500) -> None:
+        """Save parsed resumes using batched commits (Firestore allows 500 writes per batch)"""
+        for start in range(0, len(records), batch_size):
+            batch = db.batch()
+            for record in records[start:start + batch_size]:
+                resume_data = {k: v for k, v in record.items() if k != 'id'}
+                resume_data['created_at'] = datetime.utcnow()
+                batch.set(db.collection('resumes').document(record['id']), resume_data)
+            batch.commit()
+
     @staticmethod
     def get_pending_alumni() -> List[Dict]:
         """Get all alumni profiles with pending verification status"""
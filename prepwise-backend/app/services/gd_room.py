@@ -0,0 +1,299 @@
+import asyncio
+import json
+import time
+from typing import Callable, Dict, Optional, Tuple
+from fastapi import WebSocket, WebSocketDisconnect
+from app.config import settings
+from app.services.gd_service import GDService
+
+# Reaction delay per persona, as a multiple of GD_REACTION_SECONDS (Sam jumps in, Riley waits)
+REACTION_FACTORS = {
+    "aggressive": 0.5,
+    "leader": 1.0,
+    "logical": 1.5,
+    "silent": 2.0
+}
+# Riley only speaks after this many turns without speaking
+SILENT_MIN_GAP = 6
+# Turns since a persona last spoke stop counting towards its priority beyond this
+MAX_GAP = 8
+
+Plan = Tuple[Optional[float], Optional[Dict], Optional[str]]
+
+
+class GDRoom:
+    """
+    Live GD session over a WebSocket. A scheduler task decides which persona speaks next
+    and when, from personality weights and conversation timing, and pushes each message
+    as soon as it is generated:
+
+    - Alex opens if the student hasn't started within GD_OPENING_SILENCE_SECONDS and
+      summarizes every GD_LEADER_SUMMARY_EVERY messages.
+    - Sam cuts in once the student has been speaking for GD_INTERRUPT_AFTER_SECONDS.
+    - Otherwise the persona with the highest weight x turns-since-last-spoke replies after
+      its reaction delay, counted from when the previous message finishes being spoken.
+    - After GD_MAX_AI_STREAK persona turns in a row the room waits for the student.
+
+    A student message is flagged `interrupted` when the student started speaking before
+    the previous persona message had finished (estimated at GD_WORDS_PER_SECOND).
+    Any student activity cancels a persona reply still being generated, since it would be stale.
+    """
+
+    def __init__(self, session: Dict, service: GDService, after_turn: Optional[Callable[[], None]] = None):
+        self.session = session
+        self.service = service
+        self.after_turn = after_turn
+        self.participants = {participant["id"]: participant for participant in session["ai_participants"]}
+        self.websocket: Optional[WebSocket] = None
+        self.opened_at = time.monotonic()
+        self.ai_speaking_until = 0.0
+        self.last_message_at = self.opened_at
+        self.student_speaking_since: Optional[float] = None
+        self.student_interrupted = False
+        self._ai_streak = 0
+        self._last_spoke: Dict[str, int] = {}
+        self._last_summary = 0
+        self._seen = 0
+        self._wake = asyncio.Event()
+        self._scheduler: Optional[asyncio.Task] = None
+        self._sync()
+
+    # ============================================================
+    # CONNECTION
+    # ============================================================
+
+    async def serve(self, websocket: WebSocket) -> None:
+        """
+        Run the room for this connection until it disconnects (a newer connection replaces it).
+        Client messages (JSON text):
+          {"type": "speaking"}                    the student started speaking/typing
+          {"type": "message", "message": "..."}  the student's finished turn
+        Anything else (binary frames, invalid JSON, unknown types) gets an error reply.
+        """
+        previous, self.websocket = self.websocket, websocket
+        if previous is not None:
+            await self._close_socket(previous, 4409, "Replaced by a new connection")
+        if self._scheduler is None or self._scheduler.done():
+            self._scheduler = asyncio.create_task(self._run())
+
+        try:
+            while True:
+                event = await websocket.receive()
+                if event["type"] == "websocket.disconnect":
+                    break
+                try:
+                    data = json.loads(event.get("text") or "")
+                except ValueError:
+                    await websocket.send_json({"type": "error", "detail": "Expected a JSON text message"})
+                    continue
+                kind = data.get("type") if isinstance(data, dict) else None
+                if kind == "speaking":
+                    self.student_speaking()
+                elif kind == "message" and str(data.get("message", "")).strip():
+                    message = self.student_message(str(data["message"]).strip())
+                    await self._push(message)
+                else:
+                    await websocket.send_json({"type": "error", "detail": "Unknown message"})
+        except WebSocketDisconnect:
+            pass
+        finally:
+            if self.websocket is websocket:
+                self.websocket = None
+                self._stop_scheduler()
+
+    async def close(self) -> None:
+        """The session ended: stop scheduling and close the connection"""
+        self._stop_scheduler()
+        websocket, self.websocket = self.websocket, None
+        if websocket is not None:
+            try:
+                await websocket.send_json({"type": "ended"})
+            except Exception:
+                pass
+            await self._close_socket(websocket, 1000, "GD ended")
+
+    @property
+    def empty(self) -> bool:
+        """No client is connected"""
+        return self.websocket is None
+
+    def _stop_scheduler(self) -> None:
+        if self._scheduler is not None:
+            self._scheduler.cancel()
+            self._scheduler = None
+
+    @staticmethod
+    async def _close_socket(websocket: WebSocket, code: int, reason: str) -> None:
+        try:
+            await websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+
+    async def _send(self, payload: Dict) -> None:
+        if self.websocket is None:
+            return
+        try:
+            await self.websocket.send_json(payload)
+        except Exception as e:
+            print(f"[GDRoom] Send failed: {e}")
+
+    async def _push(self, message: Dict) -> None:
+        await self._send({
+            "type": "message",
+            **message,
+            "behavior": self.service.behavior_counters(self.session["behavior_tracking"])
+        })
+
+    # ============================================================
+    # STUDENT EVENTS
+    # ============================================================
+
+    def student_speaking(self) -> None:
+        if self.student_speaking_since is None:
+            self.student_speaking_since = time.monotonic()
+            self.student_interrupted = False
+            self._wake.set()
+
+    def student_message(self, text: str) -> Dict:
+        now = time.monotonic()
+        started = self.student_speaking_since if self.student_speaking_since is not None else now
+        message = self.service.add_student_message(
+            self.session, text, interrupted=started < self.ai_speaking_until
+        )
+        self.student_speaking_since = None
+        self._ai_streak = 0
+        self._sync()
+        self._wake.set()
+        return message
+
+    # ============================================================
+    # SCHEDULER
+    # ============================================================
+
+    def _sync(self) -> None:
+        """Catch up on messages appended since the last call (including ones from POST /speak)"""
+        history = self.session["behavior_tracking"]["conversation_history"]
+        if self._seen == len(history):
+            return
+        for position in range(self._seen, len(history)):
+            message = history[position]
+            self._last_spoke[message["speaker"]] = position + 1
+            if message.get("action") == "summarizes":
+                self._last_summary = position + 1
+        self._seen = len(history)
+        self.last_message_at = time.monotonic()
+
+    def _turns_since(self, speaker: str) -> int:
+        return self._seen - self._last_spoke.get(speaker, 0)
+
+    def _reaction_delay(self, participant: Dict, now: float) -> float:
+        ready_at = max(self.ai_speaking_until, self.last_message_at)
+        delay = settings.GD_REACTION_SECONDS * REACTION_FACTORS.get(participant["id"], 1.0)
+        return max(0.0, ready_at + delay - now)
+
+    def _plan(self, now: float) -> Plan:
+        """(delay, participant, intent) for the next persona turn; participant None = wait for the student"""
+        self._sync()
+        history = self.session["behavior_tracking"]["conversation_history"]
+        leader = self.participants.get("leader")
+        aggressive = self.participants.get("aggressive")
+
+        if self.student_speaking_since is not None:
+            if aggressive and not self.student_interrupted and self._turns_since("aggressive") > 1:
+                delay = self.student_speaking_since + settings.GD_INTERRUPT_AFTER_SECONDS - now
+                return max(0.0, delay), aggressive, "interrupt"
+            return None, None, None
+
+        if not history:
+            if leader is None:
+                return None, None, None
+            return max(0.0, self.opened_at + settings.GD_OPENING_SILENCE_SECONDS - now), leader, "open"
+
+        if self._ai_streak >= settings.GD_MAX_AI_STREAK:
+            return None, None, None
+
+        last_speaker = history[-1]["speaker"]
+        if leader and last_speaker != "leader" and self._seen - self._last_summary >= settings.GD_LEADER_SUMMARY_EVERY:
+            return self._reaction_delay(leader, now), leader, "summarize"
+
+        best, best_score = None, 0.0
+        for participant in self.participants.values():
+            speaker = participant["id"]
+            gap = self._turns_since(speaker)
+            if speaker == last_speaker or (speaker == "silent" and gap < SILENT_MIN_GAP):
+                continue
+            score = self.service.RESPONSE_WEIGHTS.get(speaker, 0.5) * min(gap, MAX_GAP)
+            if score > best_score:
+                best, best_score = participant, score
+        if best is None:
+            return None, None, None
+        return self._reaction_delay(best, now), best, "respond"
+
+    async def _sleep(self, timeout: Optional[float]) -> bool:
+        """Wait for student activity (True) or the timeout (False)"""
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _run(self) -> None:
+        try:
+            while self.session["status"] == "active":
+                self._wake.clear()
+                delay, participant, intent = self._plan(time.monotonic())
+                if participant is None:
+                    await self._sleep(None)
+                    continue
+                if delay > 0 and await self._sleep(delay):
+                    continue
+                await self._take_turn(participant, intent)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"[GDRoom] Scheduler stopped: {e}")
+
+    async def _take_turn(self, participant: Dict, intent: str) -> None:
+        session = self.session
+        history = session["behavior_tracking"]["conversation_history"]
+        student_message = history[-1]["message"] if history and history[-1]["speaker"] == "student" else ""
+
+        await self._send({"type": "typing", "speaker": participant["id"], "speaker_name": participant["name"]})
+        generation = asyncio.create_task(self.service._generate_ai_response(
+            participant=participant,
+            topic=session["topic"],
+            conversation_history=history[session["summarized_upto"]:],
+            student_message=student_message,
+            conversation_summary=session["conversation_summary"],
+            intent=intent
+        ))
+        woken = asyncio.create_task(self._wake.wait())
+        try:
+            done, _ = await asyncio.wait({generation, woken}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # Also reached when the scheduler is cancelled (disconnect or /end)
+            woken.cancel()
+            if not generation.done():
+                generation.cancel()
+        if generation not in done:
+            # The student spoke meanwhile; replan instead of answering an outdated turn
+            return
+
+        response = generation.result()
+        if not response or not response.get("message") or session["status"] != "active":
+            return
+
+        if intent == "interrupt":
+            session["behavior_tracking"]["student_interrupted_count"] += 1
+            self.student_interrupted = True
+        message = self.service.append_message(
+            session["behavior_tracking"], self.service.ai_message(participant, response)
+        )
+        session["turn_count"] += 1
+        self._ai_streak += 1
+        self._sync()
+        self.ai_speaking_until = time.monotonic() + len(message["message"].split()) / settings.GD_WORDS_PER_SECOND
+
+        await self._push(message)
+        if self.after_turn is not None:
+            self.after_turn()
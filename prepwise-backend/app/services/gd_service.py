@@ -1,7 +1,13 @@
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+import asyncio
+from app.models.llm_output import GDEvaluation
 from app.services.gemini_service import GeminiService
+from app.services.topic_reservoir import get_topic_reservoir
+from app.config import settings
+from app.utils.prompt_builder import PromptBuilder, fit_items
 import random
+import re
 
 
 class GDService:
@@ -42,70 +48,52 @@ class GDService:
         }
     ]
     
+    # How readily each persona speaks (Leader most, Silent rarely); response
+    # probabilities for /speak and turn-taking weights in the GD room
+    RESPONSE_WEIGHTS = {
+        "leader": 0.7,
+        "aggressive": 0.6,
+        "logical": 0.65,
+        "silent": 0.25
+    }
+    
+    # Extra instruction per turn intent (the room's scheduler picks the intent)
+    TURN_INTENTS = {
+        "open": "Nobody has spoken yet. Open the discussion: frame the topic and give your initial stance.",
+        "summarize": "Briefly summarize the main points made so far and steer the group to what is still unresolved.",
+        "interrupt": "The student is still talking. Cut in and challenge their point in one or two sharp sentences.",
+        "respond": "Respond to the latest point in the discussion."
+    }
+    
     def create_ai_participants(self) -> List[Dict[str, Any]]:
         """Create AI participants with fixed personalities"""
         return self.AI_PARTICIPANTS.copy()
     
-    async def generate_topic(self) -> str:
-        """Generate a dynamic GD topic using AI"""
-        topics_pool = [
-            "Should social media platforms be held accountable for spreading fake news?",
-            "Is remote work the future of corporate culture?",
-            "Should artificial intelligence be regulated by governments?",
-            "Is online education as effective as traditional classroom learning?",
-            "Should college degrees be mandatory for all high-paying jobs?",
-            "Is universal basic income a solution to automation-related job loss?",
-            "Should voting be made compulsory in democratic countries?",
-            "Is cryptocurrency the future of financial transactions?",
-            "Should companies prioritize diversity over merit in hiring?",
-            "Is climate change the most pressing global issue today?"
-        ]
-        
-        # For MVP, use random selection from pool
-        # In production, could use AI to generate unique topics
-        topic = random.choice(topics_pool)
-        
-        # Optional: Use AI to generate topic if gemini is available
-        try:
-            prompt = f"""Generate a realistic placement-style Group Discussion topic. 
-The topic should be:
-- Relevant to current issues (technology, social, business, abstract)
-- Suitable for campus placement interviews
-- Open-ended with multiple perspectives
-
-Return ONLY the topic text, nothing else."""
-            
-            ai_topic = self.gemini._make_request(prompt)
-            if ai_topic and len(ai_topic.strip()) > 10:
-                return ai_topic.strip()
-        except:
-            pass
-        
-        return topic
+    async def generate_topic(self, category: Optional[str] = None) -> str:
+        """
+        Next GD topic from the pre-generated reservoir (no LLM call on this path;
+        a background task keeps the reservoir topped up with AI-generated topics)
+        """
+        return get_topic_reservoir().pop(category)["topic"]
     
     async def get_ai_responses(
         self,
         topic: str,
         conversation_history: List[Dict],
         ai_participants: List[Dict],
-        student_message: str
+        student_message: str,
+        conversation_summary: str = ""
     ) -> List[Dict[str, Any]]:
-        """Get AI participant responses based on their personalities"""
+        """
+        Get AI participant responses based on their personalities
+        conversation_summary: running summary; conversation_history then only needs the turns after it
+        """
         responses = []
         
         # Determine which AI participants should respond (not all always)
-        # Leader responds more frequently, Silent responds rarely
-        response_probabilities = {
-            "leader": 0.7,
-            "aggressive": 0.6,
-            "logical": 0.65,
-            "silent": 0.25  # Silent speaks rarely
-        }
-        
-        # Determine who responds
         responding_participants = []
         for participant in ai_participants:
-            if random.random() < response_probabilities.get(participant["id"], 0.5):
+            if random.random() < self.RESPONSE_WEIGHTS.get(participant["id"], 0.5):
                 responding_participants.append(participant)
         
         # If no one responds, ensure at least one does (usually leader)
@@ -118,50 +106,66 @@ Return ONLY the topic text, nothing else."""
                 participant=participant,
                 topic=topic,
                 conversation_history=conversation_history,
-                student_message=student_message
+                student_message=student_message,
+                conversation_summary=conversation_summary
             )
             
             if response:
-                responses.append({
-                    "speaker": participant["id"],
-                    "speaker_name": participant["name"],
-                    "message": response["message"],
-                    "action": response.get("action", "speaks"),  # speaks, interrupts, agrees, disagrees
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "personality": participant["personality"]
-                })
+                if participant["id"] == "aggressive" and random.random() < 0.4:
+                    response["action"] = "interrupts"
+                responses.append(self.ai_message(participant, response))
         
         return responses
     
+    @staticmethod
+    def ai_message(participant: Dict, response: Dict) -> Dict[str, Any]:
+        """History entry for a persona's generated response"""
+        return {
+            "speaker": participant["id"],
+            "speaker_name": participant["name"],
+            "message": response["message"],
+            "action": response.get("action", "speaks"),  # speaks, interrupts, agrees, disagrees, summarizes
+            "timestamp": datetime.utcnow().isoformat(),
+            "personality": participant["personality"]
+        }
+    
     async def _generate_ai_response(
         self,
         participant: Dict,
         topic: str,
         conversation_history: List[Dict],
-        student_message: str
+        student_message: str,
+        conversation_summary: str = "",
+        intent: str = "respond"
     ) -> Optional[Dict[str, Any]]:
-        """Generate response for a specific AI participant based on their personality"""
+        """
+        Generate response for a specific AI participant based on their personality
+        intent: a TURN_INTENTS key; with no student_message the persona reacts to the recent conversation
+        """
         try:
-            # Build context from conversation history
-            recent_context = "\n".join([
-                f"{msg.get('speaker_name', msg.get('speaker', 'Unknown'))}: {msg['message']}"
-                for msg in conversation_history[-5:]
-            ])
+            # Build context: running summary of older turns plus the turns it doesn't cover yet
+            # (capped, so a lagging summary can't grow the prompt)
+            max_recent = settings.GD_RECENT_WINDOW + settings.GD_SUMMARY_EVERY_TURNS
+            cue = f'Student just said: "{student_message}"' if student_message else ""
+            if intent != "respond" or not student_message:
+                cue = f"{cue}\n\n{self.TURN_INTENTS.get(intent, self.TURN_INTENTS['respond'])}".strip()
             
-            prompt = f"""You are {participant['name']}, a participant in a Group Discussion.
+            prompt = (
+                PromptBuilder("gd_persona")
+                .add("persona", f"""You are {participant['name']}, a participant in a Group Discussion.
 
 Topic: {topic}
 
 Your Personality: {participant['personality']}
 Your Traits: {', '.join(participant['traits'])}
-Your Speech Style: {participant['speech_style']}
-
-Recent conversation:
-{recent_context}
-
-Student just said: "{student_message}"
-
-Based on your personality, respond naturally. You can:
+Your Speech Style: {participant['speech_style']}""", required=True)
+                .add("summary", f"Discussion so far (summary):\n{conversation_summary}" if conversation_summary else "",
+                     max_tokens=settings.PROMPT_SUMMARY_MAX_TOKENS, keep="tail")
+                .add_items("history", self._message_lines(conversation_history[-max_recent:]),
+                           settings.PROMPT_HISTORY_MAX_TOKENS, per_item_tokens=settings.PROMPT_MESSAGE_MAX_TOKENS,
+                           header="Recent conversation:")
+                .add("cue", cue, max_tokens=settings.PROMPT_ANSWER_MAX_TOKENS, keep="middle")
+                .add("task", """Based on your personality, respond naturally. You can:
 - Agree or disagree with the student
 - Add your perspective
 - Interrupt if you're the aggressive type
@@ -169,9 +173,11 @@ Based on your personality, respond naturally. You can:
 - Stay concise if you're silent/observer
 - Summarize if you're the leader
 
-Return your response (1-3 sentences, natural conversational style)."""
+Return your response (1-3 sentences, natural conversational style).""", required=True)
+                .build()
+            )
             
-            response_text = self.gemini._make_request(prompt)
+            response_text = await asyncio.to_thread(self.gemini._make_request, prompt, call_site="gd_persona")
             
             if not response_text:
                 # Fallback response based on personality
@@ -179,8 +185,10 @@ Return your response (1-3 sentences, natural conversational style)."""
             
             # Determine action type
             action = "speaks"
-            if participant["id"] == "aggressive" and random.random() < 0.4:
+            if intent == "interrupt":
                 action = "interrupts"
+            elif intent == "summarize":
+                action = "summarizes"
             elif "agree" in response_text.lower() or "yes" in response_text.lower():
                 action = "agrees"
             elif "disagree" in response_text.lower() or "but" in response_text.lower():
@@ -228,9 +236,13 @@ Return your response (1-3 sentences, natural conversational style)."""
         self,
         topic: str,
         conversation_history: List[Dict],
-        behavior_tracking: Dict[str, Any]
+        behavior_tracking: Dict[str, Any],
+        conversation_summary: str = ""
     ) -> Dict[str, Any]:
-        """Evaluate student's GD performance based on behavior"""
+        """
+        Evaluate student's GD performance based on behavior
+        With a conversation_summary, conversation_history should be only the turns it doesn't cover
+        """
         try:
             # Build evaluation prompt
             behavior_summary = f"""
@@ -243,21 +255,21 @@ Student Participation Metrics:
 - Concluded discussion: {'Yes' if behavior_tracking.get('student_concluded') else 'No'}
 """
             
-            conversation_text = "\n".join([
-                f"{msg.get('speaker_name', msg.get('speaker', 'Unknown'))}: {msg['message']}"
-                for msg in conversation_history
-            ])
-            
-            prompt = f"""You are evaluating a student's performance in a Group Discussion.
+            prompt = (
+                PromptBuilder("gd_evaluation")
+                .add("instructions", f"""You are evaluating a student's performance in a Group Discussion.
 
 Topic: {topic}
 
-{behavior_summary}
+{behavior_summary.strip()}
 
-Full Conversation:
-{conversation_text}
-
-Evaluate the student's performance based on:
+Conversation:""", required=True)
+                .add("summary", f"Summary of the earlier discussion:\n{conversation_summary}" if conversation_summary else "",
+                     max_tokens=settings.PROMPT_SUMMARY_MAX_TOKENS, keep="tail")
+                .add_items("history", self._message_lines(conversation_history), settings.PROMPT_HISTORY_MAX_TOKENS,
+                           per_item_tokens=settings.PROMPT_MESSAGE_MAX_TOKENS,
+                           header="Latest turns:" if conversation_summary else "")
+                .add("task", """Evaluate the student's performance based on:
 1. Communication clarity & confidence (0-10)
 2. Content relevance & structure (0-10)
 3. Participation level (0-10)
@@ -266,37 +278,17 @@ Evaluate the student's performance based on:
 
 Consider behavior during discussion, not just answer quality.
 
-Return a JSON object with this exact structure:
-{{
-    "overall_score": <number 0-10>,
-    "scores": {{
-        "communication": <number 0-10>,
-        "content": <number 0-10>,
-        "participation": <number 0-10>,
-        "team_behavior": <number 0-10>,
-        "leadership": <number 0-10>
-    }},
-    "strengths": [<array of 3-5 strength strings>],
-    "weaknesses": [<array of 3-5 weakness strings>],
-    "role_suitability": "<one role: Analyst, Leader, Consultant, Team Player, Observer>",
-    "improvement_suggestions": [<array of 3-5 actionable suggestions>],
-    "detailed_feedback": "<2-3 paragraph detailed feedback>"
-}}
-
-Return ONLY valid JSON, no other text."""
-            
-            response = self.gemini._make_request(prompt)
+Scores are 0-10. role_suitability is one of: Analyst, Leader, Consultant, Team Player, Observer.
+Give 3-5 strengths, weaknesses and actionable improvement_suggestions, and 2-3 paragraphs of detailed_feedback.""", required=True)
+                .build()
+            )
             
-            if response:
-                # Try to parse JSON from response
-                import json
-                import re
-                
-                # Extract JSON from response
-                json_match = re.search(r'\{.*\}', response, re.DOTALL)
-                if json_match:
-                    eval_data = json.loads(json_match.group())
-                    return eval_data
+            # Long full-transcript call; keep it off the event loop
+            evaluation, _ = await asyncio.to_thread(
+                self.gemini.request_structured, prompt, GDEvaluation, True, "gd_evaluation"
+            )
+            if evaluation:
+                return evaluation.model_dump()
             
             # Fallback evaluation
             return self._get_fallback_evaluation(behavior_tracking)
@@ -305,6 +297,115 @@ Return ONLY valid JSON, no other text."""
             print(f"Error in GD evaluation: {e}")
             return self._get_fallback_evaluation(behavior_tracking)
     
+    # ============================================================
+    # CONVERSATION HISTORY
+    # ============================================================
+    
+    @staticmethod
+    def append_message(tracking: Dict, message: Dict) -> Dict:
+        """Append to the history with a 1-based sequence number (history is append-only, so seq - 1 is its index)"""
+        message["seq"] = len(tracking["conversation_history"]) + 1
+        tracking["conversation_history"].append(message)
+        tracking["turn_order"].append(message["speaker"])
+        return message
+    
+    def add_student_message(self, session: Dict, message: str, interrupted: bool) -> Dict:
+        """Record a student turn and its behavior counters"""
+        tracking = session["behavior_tracking"]
+        tracking["student_speaks_count"] += 1
+        if interrupted:
+            tracking["student_interruptions"] += 1
+        if session["turn_count"] == 0:
+            tracking["student_initiated"] = True
+        
+        entry = self.append_message(tracking, {
+            "speaker": "student",
+            "message": message,
+            "timestamp": datetime.utcnow().isoformat(),
+            "interrupted": interrupted
+        })
+        session["turn_count"] += 1
+        return entry
+    
+    @staticmethod
+    def behavior_counters(tracking: Dict) -> Dict:
+        """behavior_tracking without the growing history lists"""
+        counters = {
+            key: value for key, value in tracking.items()
+            if key not in ("conversation_history", "turn_order")
+        }
+        counters["message_count"] = len(tracking["conversation_history"])
+        return counters
+    
+    # ============================================================
+    # ROLLING SUMMARY
+    # ============================================================
+    
+    @staticmethod
+    def _message_lines(messages: List[Dict]) -> List[str]:
+        return [f"{msg.get('speaker_name', msg.get('speaker', 'Unknown'))}: {msg['message']}" for msg in messages]
+    
+    @classmethod
+    def _format_messages(cls, messages: List[Dict]) -> str:
+        return "\n".join(cls._message_lines(messages))
+    
+    def summary_due(self, session: Dict) -> bool:
+        """True once GD_SUMMARY_EVERY_TURNS messages have aged out of the recent window"""
+        history = session["behavior_tracking"]["conversation_history"]
+        unsummarized = len(history) - settings.GD_RECENT_WINDOW - session.get("summarized_upto", 0)
+        return unsummarized >= settings.GD_SUMMARY_EVERY_TURNS
+    
+    async def update_summary(self, session: Dict) -> str:
+        """
+        Fold every message older than the recent window into session["conversation_summary"].
+        Only the new turns and the previous summary are sent, so each call costs about the same.
+        """
+        history = session["behavior_tracking"]["conversation_history"]
+        start = session.get("summarized_upto", 0)
+        end = len(history) - settings.GD_RECENT_WINDOW
+        if end <= start:
+            return session.get("conversation_summary", "")
+        
+        previous = session.get("conversation_summary", "")
+        # Every new turn is kept (each capped) so none is lost from the summary
+        new_turns = "\n".join(fit_items(
+            self._message_lines(history[start:end]), settings.PROMPT_MAX_TOKENS, settings.PROMPT_MESSAGE_MAX_TOKENS
+        ))
+        prompt = f"""You maintain a running summary of a Group Discussion on: {session['topic']}
+
+Current summary:
+{previous or '(none yet)'}
+
+New turns ("student" is the candidate being evaluated):
+{new_turns}
+
+Rewrite the summary to include the new turns. Keep the student's arguments, who agreed or
+disagreed with whom, interruptions, and any summarizing or concluding moves. Use at most
+{settings.GD_SUMMARY_MAX_CHARS // 6} words. Return ONLY the summary text."""
+        
+        try:
+            summary = await asyncio.to_thread(self.gemini._make_request, prompt, call_site="gd_summary")
+        except Exception as e:
+            print(f"[GDService] Summary request failed: {e}")
+            summary = None
+        
+        if not summary or not summary.strip():
+            summary = self._extractive_summary(previous, history[start:end])
+        
+        session["conversation_summary"] = summary.strip()[:settings.GD_SUMMARY_MAX_CHARS]
+        session["summarized_upto"] = end
+        return session["conversation_summary"]
+    
+    def _extractive_summary(self, previous: str, messages: List[Dict]) -> str:
+        """No-LLM fallback: first sentence of each turn, oldest lines dropped past the cap"""
+        lines = [line for line in previous.split("\n") if line]
+        for msg in messages:
+            first_sentence = re.split(r'(?<=[.!?])\s', msg['message'].strip(), maxsplit=1)[0]
+            lines.append(f"{msg.get('speaker_name', msg.get('speaker', 'Unknown'))}: {first_sentence[:160]}")
+        while len(lines) > 1 and sum(len(line) + 1 for line in lines) > settings.GD_SUMMARY_MAX_CHARS:
+            lines.pop(0)
+        return "\n".join(lines)
+    
     def _get_fallback_evaluation(self, behavior_tracking: Dict) -> Dict[str, Any]:
         """Fallback evaluation based on behavior metrics"""
         speaks_count = behavior_tracking.get('student_speaks_count', 0)
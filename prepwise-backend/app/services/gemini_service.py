@@ -1,19 +1,33 @@
 import os
+import asyncio
 import json
 import re
-from typing import Optional, Dict, List, Any, Callable
+import time
+from typing import Optional, Dict, List, Any, Callable, Type, Tuple
 import requests
+from pydantic import BaseModel
 from app.config import settings
+from app.services.model_router import ModelEndpoint, get_model_router
+from app.models.llm_output import AnswerAnalysis, FinalFeedback
+from app.utils.analysis_summary import format_analysis_summary
+from app.utils.prompt_builder import PromptBuilder, estimate_tokens, record_usage
+from app.utils.structured_output import (
+    StructuredOutputError,
+    json_instructions,
+    parse_structured,
+    response_format
+)
 
 
 class GeminiService:
     """
-    GeminiService using OpenRouter (Gemini Free Model)
-    Model: google/gemini-2.0-flash-exp:free
+    GeminiService using OpenRouter (Gemini Free Model by default)
+    Models per call type come from the shared ModelRouter (LLM_MODELS)
     """
     
     def __init__(self):
-        self.model = "google/gemini-2.0-flash-exp:free"
+        self.router = get_model_router()
+        self.model = self.router.endpoints[0].model
         # Try to get API key from multiple sources
         self.api_key = (
             settings.GEMINI_API_KEY or 
@@ -21,7 +35,7 @@ class GeminiService:
             os.getenv("OPENROUTER_API_KEY") or
             "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"  # Fallback key from test.py
         )
-        self.base_url = "https://openrouter.ai/api/v1/chat/completions"
+        self.json_mode = settings.LLM_JSON_MODE
         self._update_headers()
         print(f"GeminiService initialized. API Key present: {bool(self.api_key)}")
     
@@ -35,16 +49,56 @@ class GeminiService:
         if self.api_key:
             self.headers["Authorization"] = f"Bearer {self.api_key}"
     
-    def _make_request(self, prompt: str) -> Optional[str]:
-        """Make a request to OpenRouter API"""
+    def _make_request(
+        self,
+        prompt: str,
+        response_format: Optional[Dict] = None,
+        call_site: str = "default"
+    ) -> Optional[str]:
+        """
+        Make a request to OpenRouter API
+        The model router picks the model for the call site; on an error or empty reply
+        the next candidate is tried, up to LLM_MAX_ATTEMPTS models within
+        LLM_FAILOVER_DEADLINE_SECONDS.
+        response_format: JSON mode request; dropped (and retried without) if the model rejects it
+        call_site: label for model routing and the per-call-site token accounting
+        """
         if not self.api_key:
             print("Warning: GEMINI_API_KEY not set, using fallback responses")
             print("Please set GEMINI_API_KEY or OPENROUTER_API_KEY environment variable")
             return None
         
+        deadline = time.monotonic() + settings.LLM_FAILOVER_DEADLINE_SECONDS
+        for endpoint in self.router.candidates(call_site)[:max(1, settings.LLM_MAX_ATTEMPTS)]:
+            started = time.monotonic()
+            timeout = min(endpoint.timeout, deadline - started)
+            if timeout <= 0:
+                break
+            try:
+                content = self._request_model(endpoint, prompt, response_format, call_site, timeout)
+                endpoint.record(time.monotonic() - started, ok=content is not None)
+            except requests.exceptions.Timeout:
+                print(f"OpenRouter API timeout after {timeout:.1f}s (model: {endpoint.model})")
+                endpoint.record(max(time.monotonic() - started, timeout), ok=False)
+                content = None
+            if content is not None:
+                return content
+            print(f"[GeminiService] {endpoint.model} failed for {call_site}; trying the next model")
+        print(f"[GeminiService] No model answered {call_site}")
+        return None
+    
+    def _request_model(
+        self,
+        endpoint: ModelEndpoint,
+        prompt: str,
+        response_format: Optional[Dict],
+        call_site: str,
+        timeout: Optional[float] = None
+    ) -> Optional[str]:
+        """One call to one model; None on any failure except a timeout, which is raised"""
         try:
             payload = {
-                "model": self.model,
+                "model": endpoint.model,
                 "messages": [
                     {
                         "role": "user",
@@ -52,13 +106,19 @@ class GeminiService:
                     }
                 ]
             }
+            if response_format and endpoint.supports_json_mode:
+                payload["response_format"] = response_format
             
-            print(f"Making request to OpenRouter API (model: {self.model})...")
+            headers = self.headers
+            if endpoint.api_key:
+                headers = {**self.headers, "Authorization": f"Bearer {endpoint.api_key}"}
+            
+            print(f"Making request to OpenRouter API (model: {endpoint.model})...")
             response = requests.post(
-                self.base_url,
-                headers=self.headers,
+                endpoint.base_url,
+                headers=headers,
                 json=payload,
-                timeout=30
+                timeout=timeout or endpoint.timeout
             )
             response.raise_for_status()
             
@@ -67,6 +127,7 @@ class GeminiService:
             
             if data.get("choices") and len(data["choices"]) > 0:
                 content = data["choices"][0]["message"]["content"]
+                self._record_usage(call_site, prompt, content, data.get("usage"))
                 if content:
                     print(f"Successfully received response from API")
                     return content.strip()
@@ -76,6 +137,10 @@ class GeminiService:
                 print(f"API Error: {data.get('error')}")
             return None
         except requests.exceptions.HTTPError as e:
+            if "response_format" in payload and self._rejects_json_mode(e.response):
+                print(f"{endpoint.model} rejected response_format ({e.response.status_code}); JSON mode disabled for it")
+                endpoint.supports_json_mode = False
+                return self._request_model(endpoint, prompt, None, call_site, timeout)
             if hasattr(e, 'response') and e.response is not None:
                 error_msg = f"HTTP {e.response.status_code}"
                 try:
@@ -88,6 +153,8 @@ class GeminiService:
             else:
                 print(f"OpenRouter API HTTP error: {str(e)}")
             return None
+        except requests.exceptions.Timeout:
+            raise
         except requests.exceptions.RequestException as e:
             print(f"OpenRouter API request error: {str(e)}")
             return None
@@ -97,6 +164,69 @@ class GeminiService:
             print(traceback.format_exc())
             return None
 
+    @staticmethod
+    def _rejects_json_mode(response: Optional[requests.Response]) -> bool:
+        """A 400/422 whose error is about response_format, not some other problem with the request"""
+        if response is None or response.status_code not in (400, 422):
+            return False
+        body = response.text.lower()
+        return any(marker in body for marker in ("response_format", "json mode", "json_object", "json_schema"))
+
+    @staticmethod
+    def _record_usage(call_site: str, prompt: str, content: Optional[str], usage: Optional[Dict]) -> None:
+        """Token counts from the API's usage block, estimated when the provider omits it"""
+        if usage and usage.get("prompt_tokens") is not None:
+            prompt_tokens, completion_tokens = usage["prompt_tokens"], usage.get("completion_tokens") or 0
+        else:
+            prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(content or "")
+        record_usage(call_site, prompt_tokens, completion_tokens, estimated=not usage)
+        print(f"[GeminiService] {call_site}: {prompt_tokens} prompt + {completion_tokens} completion tokens")
+
+    # ============================================================
+    # STRUCTURED OUTPUT
+    # ============================================================
+
+    def request_structured(
+        self,
+        prompt: str,
+        model: Type[BaseModel],
+        reask: bool = True,
+        call_site: str = "structured"
+    ) -> Tuple[Optional[BaseModel], Optional[str]]:
+        """
+        Ask for JSON matching the model (JSON mode where the provider supports it) and
+        validate it, repairing malformed JSON once locally. Only if that still fails is the
+        model re-asked, once, with the validation error. Returns (parsed or None, raw text).
+        """
+        result = self._make_request(
+            prompt + json_instructions(model),
+            response_format=response_format(model, self.json_mode),
+            call_site=call_site
+        )
+        if not result:
+            return None, None
+        try:
+            return parse_structured(result, model), result
+        except StructuredOutputError as e:
+            print(f"[GeminiService] Structured output invalid after repair: {e}")
+            error = str(e)
+        if not reask:
+            return None, result
+        
+        retry = self._make_request(
+            f"Your previous reply was not valid JSON for the required schema.\n"
+            f"Error: {error[:500]}\n\nPrevious reply:\n{result[:4000]}\n\n"
+            "Return ONLY the corrected JSON object." + json_instructions(model),
+            response_format=response_format(model, self.json_mode),
+            call_site=f"{call_site}_reask"
+        )
+        if retry:
+            try:
+                return parse_structured(retry, model), retry
+            except StructuredOutputError as e:
+                print(f"[GeminiService] Structured output invalid after re-ask: {e}")
+        return None, result
+
     # ============================================================
     # QUESTION GENERATION
     # ============================================================
@@ -120,7 +250,7 @@ class GeminiService:
             print(f"[GeminiService] Generating question {question_number} for {interview_type} interview...")
             print(f"[GeminiService] API Key available: {bool(self.api_key)}")
             
-            result = self._make_request(prompt)
+            result = await asyncio.to_thread(self._make_request, prompt, call_site="question")
             
             if result and result.strip():
                 print(f"[GeminiService] Successfully generated question: {result[:100]}...")
@@ -149,24 +279,28 @@ class GeminiService:
         interview_type: str
     ) -> Dict[str, Any]:
         """Analyze a candidate's answer"""
-        prompt = f"""
-You are an expert interviewer.
-
-Interview Type: {interview_type}
-Question: {question}
-Candidate Answer: {answer}
-
-Evaluate the answer and provide:
-SCORE: (0-100)
-FEEDBACK: (2-3 lines)
-STRENGTHS: (2-3 bullet points)
-IMPROVEMENTS: (2-3 bullet points)
-
-Return only the evaluation.
-"""
+        prompt = (
+            PromptBuilder("answer_analysis")
+            .add("instructions", f"You are an expert interviewer.\n\nInterview Type: {interview_type}", required=True)
+            .add("question", f"Question: {question}", max_tokens=settings.PROMPT_QUESTION_MAX_TOKENS)
+            .add("answer", f"Candidate Answer: {answer}", max_tokens=settings.PROMPT_ANSWER_MAX_TOKENS, keep="middle")
+            .add("task", """Evaluate the answer and provide:
+score: 0-100
+feedback: 2-3 lines
+strengths: 2-3 points
+improvements: 2-3 points
+content, communication, confidence: 0-100 each""", required=True)
+            .build()
+        )
         
-        result = self._make_request(prompt)
+        # Runs as a background job per answer; keep the HTTP call off the event loop
+        parsed, result = await asyncio.to_thread(
+            self.request_structured, prompt, AnswerAnalysis, True, "answer_analysis"
+        )
+        if parsed:
+            return {"raw": result, **parsed.model_dump()}
         if result:
+            # Free-text reply: fall back to scraping it
             return self._parse_analysis_response(result)
         
         return self._get_default_analysis()
@@ -182,34 +316,137 @@ Return only the evaluation.
         emotion_analysis: Optional[Dict[str, Any]] = None,
         video_analysis: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Generate final feedback for the interview"""
-        prompt = f"Generate final feedback for a {interview_type} interview.\n\n"
-        
-        for index, qa in enumerate(all_qa_pairs, 1):
-            prompt += f"{index}. Question: {qa.get('question', '')}\n"
-            prompt += f"Answer: {qa.get('answer', '')}\n\n"
+        """
+        Generate final feedback for the interview
+        Every answer is kept, each cut to an equal share of PROMPT_ANSWERS_MAX_TOKENS
+        """
+        qa_items = [
+            f"{index}. Question: {qa.get('question', '')}\nAnswer: {qa.get('answer', '')}\n"
+            for index, qa in enumerate(all_qa_pairs, 1)
+        ]
+        per_answer = max(
+            settings.PROMPT_ANSWERS_MAX_TOKENS // max(len(qa_items), 1),
+            settings.PROMPT_QUESTION_MAX_TOKENS
+        )
         
+        builder = (
+            PromptBuilder("final_feedback")
+            .add("instructions", f"Generate final feedback for a {interview_type} interview.", required=True)
+            .add_items("answers", qa_items, settings.PROMPT_ANSWERS_MAX_TOKENS, per_item_tokens=per_answer, keep="first")
+        )
         if emotion_analysis:
-            prompt += f"Emotion Analysis:\n{json.dumps(emotion_analysis)}\n\n"
+            builder.add("voice", f"Emotion Analysis (voice):\n{self._format_analysis(emotion_analysis)}")
         
         if video_analysis:
-            prompt += f"Video Analysis:\n{json.dumps(video_analysis)}\n\n"
+            builder.add("video", f"Video Analysis:\n{self._format_analysis(video_analysis)}")
         
-        prompt += """
-Provide:
-1. Overall Score (0-100)
-2. Score Breakdown (content, communication, confidence)
-3. Top Strengths
-4. Areas of Improvement
-5. Final Summary Paragraph
-"""
+        builder.add("task", """Provide:
+1. overall_score (0-100)
+2. scores: content, communication, confidence (0-100 each)
+3. strengths: top strengths
+4. weaknesses: areas of improvement
+5. detailed_feedback: final summary paragraph""", required=True)
+        prompt = builder.build()
         
-        result = self._make_request(prompt)
+        # Long full-transcript call; keep it off the event loop
+        parsed, result = await asyncio.to_thread(
+            self.request_structured, prompt, FinalFeedback, True, "final_feedback"
+        )
+        if parsed:
+            return {"raw": result, **parsed.model_dump()}
         if result:
+            # Free-text reply: fall back to scraping it
             return self._parse_feedback_response(result, all_qa_pairs)
         
         return self._get_default_feedback()
 
+    async def summarize_final_feedback(
+        self,
+        interview_type: str,
+        all_qa_pairs: List[Dict[str, str]],
+        answer_analyses: List[Optional[Dict[str, Any]]],
+        emotion_analysis: Optional[Dict[str, Any]] = None,
+        video_analysis: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Final feedback from the per-answer analyses scored during the interview:
+        scores, strengths and weaknesses are aggregated locally and only a short
+        summary paragraph is asked of the model. Falls back to generate_final_feedback
+        (the full transcript) when any answer is unscored, so no answer is left out.
+        answer_analyses: analyze_answer result per answer (None where scoring is missing)
+        """
+        # The default analysis (API unavailable) carries no "raw" reply and isn't a real score
+        scored = [
+            (index, analysis) for index, analysis in enumerate(answer_analyses, 1)
+            if analysis and "raw" in analysis
+        ]
+        if not scored or len(scored) < len(answer_analyses):
+            return await self.generate_final_feedback(interview_type, all_qa_pairs, emotion_analysis, video_analysis)
+        
+        feedback = self._aggregate_answer_analyses([analysis for _, analysis in scored])
+        
+        builder = (
+            PromptBuilder("final_summary")
+            .add("instructions", f"Write the final summary for a {interview_type} interview from these per-answer evaluations.", required=True)
+            .add_items("answers", [
+                f"Q{index} ({analysis['score']}/100): {analysis.get('feedback', '')}" for index, analysis in scored
+            ], settings.PROMPT_HISTORY_MAX_TOKENS, per_item_tokens=settings.PROMPT_MESSAGE_MAX_TOKENS, keep="first")
+        )
+        if emotion_analysis:
+            builder.add("voice", f"Emotion Analysis (voice):\n{self._format_analysis(emotion_analysis)}")
+        if video_analysis:
+            builder.add("video", f"Video Analysis:\n{self._format_analysis(video_analysis)}")
+        builder.add("task", (
+            f"Overall score: {feedback['overall_score']}/100. "
+            "Return ONE paragraph (4-6 sentences) of overall feedback and the most important next steps. "
+            "Plain text only."
+        ), required=True)
+        
+        summary = await asyncio.to_thread(self._make_request, builder.build(), call_site="final_summary")
+        if summary and summary.strip():
+            feedback["detailed_feedback"] = summary.strip()
+        return feedback
+    
+    @staticmethod
+    def _aggregate_answer_analyses(analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Mean scores per dimension and the strengths/improvements mentioned most often"""
+        def mean(values: List[float]) -> int:
+            return round(sum(values) / len(values))
+        
+        def most_common(key: str) -> List[str]:
+            counts: Dict[str, List] = {}
+            for analysis in analyses:
+                for item in analysis.get(key) or []:
+                    normalized = " ".join(re.findall(r"[a-z0-9]+", item.lower()))
+                    if normalized:
+                        counts.setdefault(normalized, [0, item])[0] += 1
+            # Most frequent first, then first mentioned (dicts keep insertion order and sort is stable)
+            ranked = sorted(counts.values(), key=lambda entry: -entry[0])
+            return [item for _, item in ranked[:5]]
+        
+        overall = mean([analysis["score"] for analysis in analyses])
+        scores = {
+            dimension: mean([
+                analysis.get(dimension) if analysis.get(dimension) is not None else analysis["score"]
+                for analysis in analyses
+            ])
+            for dimension in ("content", "communication", "confidence")
+        }
+        
+        return {
+            "overall_score": overall,
+            "scores": scores,
+            "strengths": most_common("strengths") or ["See detailed feedback"],
+            "weaknesses": most_common("improvements") or ["See detailed feedback"],
+            "detailed_feedback": " ".join(analysis.get("feedback", "") for analysis in analyses[:3]).strip()
+        }
+
+    def _format_analysis(self, analysis: Dict[str, Any]) -> str:
+        """Compact text for summarize_analyses output (token-budgeted); other dicts as JSON"""
+        if 'metrics' in analysis and 'answers' in analysis:
+            return format_analysis_summary(analysis, settings.FEEDBACK_ANALYSIS_MAX_TOKENS)
+        return json.dumps(analysis)
+
     # ============================================================
     # STREAMING RESPONSE (OPTIONAL)
     # ============================================================
@@ -219,19 +456,24 @@ Provide:
         if not self.api_key:
             return
         
+        endpoint = self.router.candidates("stream")[0]
         try:
             payload = {
-                "model": self.model,
+                "model": endpoint.model,
                 "messages": [{"role": "user", "content": prompt}],
                 "stream": True
             }
             
+            headers = self.headers
+            if endpoint.api_key:
+                headers = {**self.headers, "Authorization": f"Bearer {endpoint.api_key}"}
+            
             response = requests.post(
-                self.base_url,
-                headers=self.headers,
+                endpoint.base_url,
+                headers=headers,
                 json=payload,
                 stream=True,
-                timeout=30
+                timeout=endpoint.timeout
             )
             response.raise_for_status()
             
@@ -283,23 +525,26 @@ Guidelines:
 - If previous answers exist, ask a thoughtful follow-up question
 - Keep it conversational and engaging"""
         
+        builder = PromptBuilder("question").add("instructions", prompt, required=True)
+        
         if resume_data and resume_data.get("skills"):
             skills = resume_data["skills"]
             if isinstance(skills, list) and len(skills) > 0:
-                prompt += f"\n\nCandidate has skills in: {', '.join(skills[:10])}"
+                builder.add("resume", f"Candidate has skills in: {', '.join(skills[:10])}", max_tokens=settings.PROMPT_RESUME_MAX_TOKENS)
             elif isinstance(skills, str):
-                prompt += f"\n\nCandidate skills: {skills}"
+                builder.add("resume", f"Candidate skills: {skills}", max_tokens=settings.PROMPT_RESUME_MAX_TOKENS)
         
         if previous_answers and len(previous_answers) > 0:
-            prompt += "\n\nPrevious answers from candidate:"
-            for i, ans in enumerate(previous_answers[-3:], 1):
-                # Truncate long answers
-                ans_preview = ans[:200] + "..." if len(ans) > 200 else ans
-                prompt += f"\n{i}. {ans_preview}"
-            prompt += "\n\nAsk a follow-up question based on their previous answers."
+            # Last 3 answers, each truncated
+            answers = [f"{i}. {ans}" for i, ans in enumerate(previous_answers[-3:], 1)]
+            builder.add_items(
+                "history", answers, settings.PROMPT_HISTORY_MAX_TOKENS,
+                per_item_tokens=50, header="Previous answers from candidate:"
+            )
+            builder.add("follow_up", "Ask a follow-up question based on their previous answers.", required=True)
         
-        prompt += "\n\nGenerate the question now:"
-        return prompt.strip()
+        builder.add("task", "Generate the question now:", required=True)
+        return builder.build()
 
     # ============================================================
     # PARSERS
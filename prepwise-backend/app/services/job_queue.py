@@ -0,0 +1,159 @@
+import asyncio
+import itertools
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from app.config import settings
+
+# Lower value runs first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+
+class Job:
+    """A queued unit of background work; await job.future for its result"""
+
+    def __init__(self, fn: Callable, args: tuple, cpu: bool, group: Optional[str],
+                 on_done: Optional[Callable[[Any], None]], name: Optional[str]):
+        self.id = str(uuid.uuid4())
+        self.fn = fn
+        self.args = args
+        self.cpu = cpu
+        self.group = group
+        self.on_done = on_done
+        self.name = name or getattr(fn, '__name__', 'job')
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.submitted_at = time.monotonic()
+
+
+class JobQueue:
+    """
+    In-process background jobs. Asyncio workers pull from a priority queue; CPU-bound
+    jobs (cpu=True, picklable module-level functions) run on a process pool, other sync
+    functions on the default thread pool and coroutine functions on the event loop.
+    Jobs can be tagged with a group (e.g. an interview id) and awaited together.
+    """
+
+    def __init__(self, workers: int = 4, process_workers: int = 0):
+        self.workers = max(1, workers)
+        self.process_workers = process_workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self._groups: Dict[str, set] = {}
+        self._metrics = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'wait_seconds': 0.0,
+            'run_seconds': 0.0
+        }
+
+    def _ensure_started(self) -> None:
+        """Start the workers on the running loop (restarted if the loop changed)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.PriorityQueue()
+        self._groups = {}
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.process_workers)
+        return self._executor
+
+    def submit(
+        self,
+        fn: Callable,
+        *args,
+        priority: int = PRIORITY_NORMAL,
+        cpu: bool = False,
+        group: Optional[str] = None,
+        on_done: Optional[Callable[[Any], None]] = None,
+        name: Optional[str] = None
+    ) -> Job:
+        """Queue fn(*args); on_done(result) is called on the event loop when it succeeds"""
+        self._ensure_started()
+        job = Job(fn, args, cpu, group, on_done, name)
+        if group is not None:
+            self._groups.setdefault(group, set()).add(job)
+        self._queue.put_nowait((priority, next(self._sequence), job))
+        self._metrics['submitted'] += 1
+        return job
+
+    async def wait_for(self, group: str, timeout: Optional[float] = None) -> int:
+        """
+        Wait for the group's pending jobs, at most `timeout` seconds.
+        Returns how many were still pending at the deadline (they keep running).
+        """
+        pending = [job.future for job in self._groups.get(group, ())]
+        if not pending:
+            return 0
+        _, still_pending = await asyncio.wait(pending, timeout=timeout)
+        return len(still_pending)
+
+    def pending(self, group: str) -> int:
+        return len(self._groups.get(group, ()))
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, job = await self._queue.get()
+            started = time.monotonic()
+            self._metrics['wait_seconds'] += started - job.submitted_at
+            try:
+                if job.cpu:
+                    result = await loop.run_in_executor(self._get_executor(), job.fn, *job.args)
+                elif asyncio.iscoroutinefunction(job.fn):
+                    result = await job.fn(*job.args)
+                else:
+                    result = await loop.run_in_executor(None, job.fn, *job.args)
+                if job.on_done is not None:
+                    job.on_done(result)
+                self._metrics['completed'] += 1
+                if not job.future.done():
+                    job.future.set_result(result)
+            except Exception as e:
+                print(f"[JobQueue] {job.name} failed: {type(e).__name__}: {e}")
+                self._metrics['failed'] += 1
+                if not job.future.done():
+                    job.future.set_exception(e)
+                    # Failures are reported here; don't warn about an unretrieved exception
+                    job.future.exception()
+            finally:
+                self._metrics['run_seconds'] += time.monotonic() - started
+                if job.group is not None:
+                    jobs = self._groups.get(job.group)
+                    if jobs is not None:
+                        jobs.discard(job)
+                        if not jobs:
+                            del self._groups[job.group]
+                self._queue.task_done()
+
+    def metrics(self) -> Dict:
+        metrics = dict(self._metrics)
+        metrics['queue_length'] = self._queue.qsize() if self._queue else 0
+        metrics['workers'] = self.workers
+        metrics['process_workers'] = self.process_workers
+        finished = metrics['completed'] + metrics['failed']
+        metrics['avg_wait_seconds'] = metrics['wait_seconds'] / finished if finished else None
+        metrics['avg_run_seconds'] = metrics['run_seconds'] / finished if finished else None
+        return metrics
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide queue configured from settings, created on first use"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(workers=settings.JOB_WORKERS, process_workers=settings.JOB_PROCESS_WORKERS)
+    return _job_queue
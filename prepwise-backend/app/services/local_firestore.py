@@ -0,0 +1,396 @@
+import copy
+import pickle
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+try:
+    from google.api_core.exceptions import NotFound
+except ImportError:
+    class NotFound(Exception):
+        """Document to update does not exist (google.api_core's NotFound when installed)"""
+
+ASCENDING = "ASCENDING"
+DESCENDING = "DESCENDING"
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    '==': lambda field, value: field == value,
+    '!=': lambda field, value: field != value,
+    '<': lambda field, value: field < value,
+    '<=': lambda field, value: field <= value,
+    '>': lambda field, value: field > value,
+    '>=': lambda field, value: field >= value,
+    'in': lambda field, value: field in value,
+    'not-in': lambda field, value: field not in value,
+    'array_contains': lambda field, value: isinstance(field, list) and value in field,
+    'array_contains_any': lambda field, value: isinstance(field, list) and any(item in field for item in value)
+}
+
+_MISSING = object()
+
+
+def _field(data: Dict, path: str) -> Any:
+    """Value at a dotted field path, or _MISSING"""
+    for key in path.split('.'):
+        if not isinstance(data, dict) or key not in data:
+            return _MISSING
+        data = data[key]
+    return data
+
+
+def _set_field(data: Dict, path: str, value: Any) -> None:
+    keys = path.split('.')
+    for key in keys[:-1]:
+        if not isinstance(data.get(key), dict):
+            data[key] = {}
+        data = data[key]
+    data[keys[-1]] = value
+
+
+def _sort_key(value: Any) -> Tuple:
+    """Firestore-like ordering across types: null < bool < number < string < other"""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, str):
+        return (3, value)
+    return (4, value)
+
+
+# ============================================================
+# STORAGE
+# ============================================================
+
+class MemoryStore:
+    """Documents as {collection path: {document id: data}} in process memory"""
+
+    def __init__(self):
+        self._collections: Dict[str, Dict[str, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, collection: str, document_id: str) -> Optional[Dict]:
+        with self._lock:
+            data = self._collections.get(collection, {}).get(document_id)
+        return copy.deepcopy(data)
+
+    def put(self, collection: str, document_id: str, data: Dict) -> None:
+        data = copy.deepcopy(data)
+        with self._lock:
+            self._collections.setdefault(collection, {})[document_id] = data
+
+    def delete(self, collection: str, document_id: str) -> None:
+        with self._lock:
+            self._collections.get(collection, {}).pop(document_id, None)
+
+    def scan(self, collection: str) -> List[Tuple[str, Dict]]:
+        with self._lock:
+            documents = list(self._collections.get(collection, {}).items())
+        return [(document_id, copy.deepcopy(data)) for document_id, data in documents]
+
+
+class SQLiteStore:
+    """
+    Same interface persisted in one SQLite table; values are pickled so datetimes
+    and nested structures round-trip exactly
+    """
+
+    def __init__(self, path: str):
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "collection TEXT NOT NULL, id TEXT NOT NULL, data BLOB NOT NULL, PRIMARY KEY (collection, id))"
+            )
+
+    def get(self, collection: str, document_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data FROM documents WHERE collection = ? AND id = ?", (collection, document_id)
+            ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def put(self, collection: str, document_id: str, data: Dict) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO documents (collection, id, data) VALUES (?, ?, ?)",
+                (collection, document_id, pickle.dumps(data))
+            )
+
+    def delete(self, collection: str, document_id: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM documents WHERE collection = ? AND id = ?", (collection, document_id)
+            )
+
+    def scan(self, collection: str) -> List[Tuple[str, Dict]]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, data FROM documents WHERE collection = ? ORDER BY id", (collection,)
+            ).fetchall()
+        return [(document_id, pickle.loads(data)) for document_id, data in rows]
+
+
+# ============================================================
+# FIRESTORE API SUBSET
+# ============================================================
+
+class DocumentSnapshot:
+    def __init__(self, reference: "DocumentReference", data: Optional[Dict]):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict]:
+        return copy.deepcopy(self._data)
+
+    def get(self, field_path: str) -> Any:
+        value = _field(self._data or {}, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return value
+
+
+class DocumentReference:
+    def __init__(self, client: "LocalFirestore", collection: str, document_id: str):
+        self._client = client
+        self._collection = collection
+        self.id = document_id
+
+    @property
+    def path(self) -> str:
+        return f"{self._collection}/{self.id}"
+
+    def collection(self, name: str) -> "CollectionReference":
+        return CollectionReference(self._client, f"{self.path}/{name}")
+
+    def get(self) -> DocumentSnapshot:
+        self._client._round_trip()
+        return DocumentSnapshot(self, self._client.store.get(self._collection, self.id))
+
+    def set(self, data: Dict, merge: bool = False) -> None:
+        self._client._round_trip()
+        self._write(data, merge)
+
+    def update(self, updates: Dict) -> None:
+        self._client._round_trip()
+        self._update(updates)
+
+    def delete(self) -> None:
+        self._client._round_trip()
+        self._client.store.delete(self._collection, self.id)
+
+    def _write(self, data: Dict, merge: bool = False) -> None:
+        with self._client._write_lock:
+            if merge:
+                current = self._client.store.get(self._collection, self.id) or {}
+                current.update(data)
+                data = current
+            self._client.store.put(self._collection, self.id, data)
+
+    def _update(self, updates: Dict) -> None:
+        """Like Firestore: the document must exist and dotted keys update nested fields"""
+        # Read-modify-write under the client lock so concurrent updates don't drop fields
+        with self._client._write_lock:
+            current = self._client.store.get(self._collection, self.id)
+            if current is None:
+                raise NotFound(f"No document to update: {self.path}")
+            for path, value in updates.items():
+                _set_field(current, path, value)
+            self._client.store.put(self._collection, self.id, current)
+
+
+class Query:
+    def __init__(self, client: "LocalFirestore", collection: str):
+        self._client = client
+        self._collection = collection
+        self._filters: List[Tuple[str, str, Any]] = []
+        self._orders: List[Tuple[str, str]] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+        self._start_after: Optional[Any] = None
+
+    def _copy(self) -> "Query":
+        query = Query(self._client, self._collection)
+        query._filters = list(self._filters)
+        query._orders = list(self._orders)
+        query._limit, query._offset, query._start_after = self._limit, self._offset, self._start_after
+        return query
+
+    def where(self, field_path: str, op_string: str, value: Any) -> "Query":
+        if op_string not in _OPERATORS:
+            raise ValueError(f"Unsupported operator: {op_string}")
+        query = self._copy()
+        query._filters.append((field_path, op_string, value))
+        return query
+
+    def order_by(self, field_path: str, direction: str = ASCENDING) -> "Query":
+        query = self._copy()
+        query._orders.append((field_path, direction))
+        return query
+
+    def limit(self, count: int) -> "Query":
+        query = self._copy()
+        query._limit = count
+        return query
+
+    def offset(self, count: int) -> "Query":
+        query = self._copy()
+        query._offset = count
+        return query
+
+    def start_after(self, document_fields: Any) -> "Query":
+        """Cursor from a DocumentSnapshot or a dict of the order_by fields"""
+        query = self._copy()
+        query._start_after = document_fields
+        return query
+
+    def _matches(self, data: Dict) -> bool:
+        for field_path, op_string, value in self._filters:
+            field = _field(data, field_path)
+            if field is _MISSING:
+                return False
+            try:
+                if not _OPERATORS[op_string](field, value):
+                    return False
+            except TypeError:
+                return False
+        return True
+
+    def _results(self) -> List[Tuple[str, Dict]]:
+        documents = [
+            (document_id, data) for document_id, data in self._client.store.scan(self._collection)
+            if self._matches(data) and all(_field(data, field_path) is not _MISSING for field_path, _ in self._orders)
+        ]
+        # Document id breaks ties; stable sorts applied last-order-first give the compound order
+        documents.sort(key=lambda document: document[0])
+        for field_path, direction in reversed(self._orders):
+            documents.sort(key=lambda document: _sort_key(_field(document[1], field_path)), reverse=direction == DESCENDING)
+
+        if self._start_after is not None:
+            documents = self._after_cursor(documents)
+        documents = documents[self._offset:]
+        return documents[:self._limit] if self._limit is not None else documents
+
+    def _after_cursor(self, documents: List[Tuple[str, Dict]]) -> List[Tuple[str, Dict]]:
+        cursor = self._start_after
+        if isinstance(cursor, DocumentSnapshot):
+            for index, (document_id, _) in enumerate(documents):
+                if document_id == cursor.id:
+                    return documents[index + 1:]
+            cursor = cursor.to_dict() or {}
+        # Field-value cursor: skip everything up to and including the cursor's position
+        values = [_sort_key(cursor.get(field_path)) for field_path, _ in self._orders]
+        for index, (_, data) in enumerate(documents):
+            beyond = False
+            for (field_path, direction), value in zip(self._orders, values):
+                current = _sort_key(_field(data, field_path))
+                if current != value:
+                    beyond = current < value if direction == DESCENDING else current > value
+                    break
+            if beyond:
+                return documents[index:]
+        return []
+
+    def stream(self) -> Iterator[DocumentSnapshot]:
+        self._client._round_trip()
+        for document_id, data in self._results():
+            yield DocumentSnapshot(DocumentReference(self._client, self._collection, document_id), data)
+
+    def get(self) -> List[DocumentSnapshot]:
+        return list(self.stream())
+
+
+class CollectionReference(Query):
+    def __init__(self, client: "LocalFirestore", path: str):
+        super().__init__(client, path)
+        self.id = path.split('/')[-1]
+
+    def document(self, document_id: Optional[str] = None) -> DocumentReference:
+        return DocumentReference(self._client, self._collection, document_id or uuid.uuid4().hex[:20])
+
+    def add(self, data: Dict, document_id: Optional[str] = None) -> Tuple[float, DocumentReference]:
+        reference = self.document(document_id)
+        reference.set(data)
+        return time.time(), reference
+
+
+class WriteBatch:
+    """Writes applied together on commit(), as one round trip"""
+
+    def __init__(self, client: "LocalFirestore"):
+        self._client = client
+        self._writes: List[Callable[[], None]] = []
+
+    def set(self, reference: DocumentReference, data: Dict, merge: bool = False) -> "WriteBatch":
+        data = copy.deepcopy(data)
+        self._writes.append(lambda: reference._write(data, merge))
+        return self
+
+    def update(self, reference: DocumentReference, updates: Dict) -> "WriteBatch":
+        updates = copy.deepcopy(updates)
+        self._writes.append(lambda: reference._update(updates))
+        return self
+
+    def delete(self, reference: DocumentReference) -> "WriteBatch":
+        self._writes.append(lambda: self._client.store.delete(reference._collection, reference.id))
+        return self
+
+    def commit(self) -> None:
+        if len(self._writes) > 500:
+            raise ValueError("A batch can contain at most 500 writes")
+        self._client._round_trip()
+        with self._client._write_lock:
+            for write in self._writes:
+                write()
+        self._writes = []
+
+
+class LocalFirestore:
+    """
+    Stand-in for firestore.client() covering what this app uses: collection/document
+    references, get/set/update/delete, where/order_by/limit/offset/start_after queries
+    with stream(), add() and write batches. Data lives in memory or in SQLite.
+    Every round trip (get, set, update, delete, stream, commit) sleeps latency_ms
+    (jittered by +/- jitter) so I/O-bound paths can be benchmarked realistically.
+    """
+
+    def __init__(self, store: Optional[Any] = None, latency_ms: float = 0.0, jitter: float = 0.2):
+        self.store = store or MemoryStore()
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.round_trips = 0
+        self._write_lock = threading.RLock()
+
+    def _round_trip(self) -> None:
+        self.round_trips += 1
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms * random.uniform(1 - self.jitter, 1 + self.jitter) / 1000)
+
+    def collection(self, path: str) -> CollectionReference:
+        return CollectionReference(self, path)
+
+    def document(self, path: str) -> DocumentReference:
+        collection, _, document_id = path.rpartition('/')
+        return DocumentReference(self, collection, document_id)
+
+    def batch(self) -> WriteBatch:
+        return WriteBatch(self)
+
+
+def create_local_client(backend: str, sqlite_path: str = "prepwise.db", latency_ms: float = 0.0) -> LocalFirestore:
+    """LocalFirestore for PERSISTENCE_BACKEND "memory" or "sqlite" """
+    if backend == "sqlite":
+        return LocalFirestore(SQLiteStore(sqlite_path), latency_ms)
+    if backend == "memory":
+        return LocalFirestore(MemoryStore(), latency_ms)
+    raise ValueError(f"Unknown persistence backend: {backend}")
@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+from app.config import settings
+
+DEFAULT_MODEL = "google/gemini-2.0-flash-exp:free"
+
+# Which tier each call site prefers; anything not listed uses "fast"
+CALL_TIERS = {
+    "question": "fast",
+    "gd_persona": "fast",
+    "gd_summary": "fast",
+    "gd_topics": "fast",
+    "answer_analysis": "fast",
+    "final_summary": "strong",
+    "final_feedback": "strong",
+    "gd_evaluation": "strong"
+}
+
+# Rolling window of calls per model for the latency percentiles and error rate
+STATS_WINDOW = 100
+# Models below this many recent calls get the median rank of the others (not enough data to rank)
+MIN_CALLS_TO_RANK = 5
+# Error rate above which a model is treated as degraded and tried last
+DEGRADED_ERROR_RATE = 0.5
+# Consecutive failures before a model is skipped for COOLDOWN_SECONDS
+FAILURES_BEFORE_COOLDOWN = 3
+COOLDOWN_SECONDS = 30.0
+
+
+class ModelEndpoint:
+    """One configured model: where to call it and its rolling health"""
+
+    def __init__(self, model: str, tier: str = "fast", base_url: Optional[str] = None,
+                 api_key: Optional[str] = None, timeout: float = 30.0):
+        self.model = model
+        self.tier = tier
+        self.base_url = base_url or settings.LLM_BASE_URL
+        self.api_key = api_key
+        self.timeout = timeout
+        # Cleared when the provider rejects response_format for this model
+        self.supports_json_mode = True
+        self._latencies: Deque[float] = deque(maxlen=STATS_WINDOW)
+        self._outcomes: Deque[bool] = deque(maxlen=STATS_WINDOW)
+        self._consecutive_failures = 0
+        self._cooldown_until = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool) -> None:
+        """Failed calls count too: a model that fails slowly must not look fast"""
+        with self._lock:
+            self._outcomes.append(ok)
+            self._latencies.append(latency)
+            if ok:
+                self._consecutive_failures = 0
+            else:
+                self._consecutive_failures += 1
+                if self._consecutive_failures >= FAILURES_BEFORE_COOLDOWN:
+                    self._cooldown_until = time.monotonic() + COOLDOWN_SECONDS
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q / 100 * len(latencies)))]
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            outcomes = list(self._outcomes)
+        return outcomes.count(False) / len(outcomes) if outcomes else 0.0
+
+    @property
+    def calls(self) -> int:
+        return len(self._outcomes)
+
+    @property
+    def cooling_down(self) -> bool:
+        return time.monotonic() < self._cooldown_until
+
+    def rank(self) -> Optional[float]:
+        """
+        Lower is better: p95 latency inflated by the error rate; degraded models sort last.
+        None until the model has MIN_CALLS_TO_RANK recent calls.
+        """
+        if self.calls < MIN_CALLS_TO_RANK:
+            return None
+        p95 = self.percentile(95) or self.timeout
+        penalty = 1000.0 if self.error_rate > DEGRADED_ERROR_RATE else 0.0
+        return p95 * (1 + 4 * self.error_rate) + penalty
+
+    def stats(self) -> Dict:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            'model': self.model,
+            'tier': self.tier,
+            'base_url': self.base_url,
+            'calls': self.calls,
+            'p50_seconds': round(p50, 3) if p50 is not None else None,
+            'p95_seconds': round(p95, 3) if p95 is not None else None,
+            'error_rate': round(self.error_rate, 3),
+            'cooling_down': self.cooling_down,
+            'supports_json_mode': self.supports_json_mode
+        }
+
+
+class ModelRouter:
+    """
+    Picks the model for each LLM call. Call sites map to a tier (CALL_TIERS, overridable
+    with LLM_CALL_TIERS): fast models for question generation and persona lines, strong
+    ones for final feedback. Within the tier, healthy models with the lowest rolling p95
+    (weighted by error rate) go first; the other tier follows as failover. Models that
+    failed FAILURES_BEFORE_COOLDOWN times in a row sit out COOLDOWN_SECONDS unless no
+    other model is left.
+    """
+
+    def __init__(self, endpoints: List[ModelEndpoint], call_tiers: Optional[Dict[str, str]] = None):
+        if not endpoints:
+            raise ValueError("ModelRouter needs at least one model")
+        self.endpoints = endpoints
+        self.call_tiers = {**CALL_TIERS, **(call_tiers or {})}
+
+    def candidates(self, call_site: str) -> List[ModelEndpoint]:
+        """Models to try, in order, for this call site"""
+        tier = self.call_tiers.get(call_site, "fast")
+        available = [endpoint for endpoint in self.endpoints if not endpoint.cooling_down] or self.endpoints
+        ranks = {id(endpoint): endpoint.rank() for endpoint in available}
+        # Models with too little data sit in the middle: neither ahead of a proven fast
+        # model nor behind a slow one
+        known = sorted(rank for rank in ranks.values() if rank is not None)
+        neutral = known[len(known) // 2] if known else 0.0
+        # Stable sort: configured order breaks ties
+        return sorted(
+            available,
+            key=lambda endpoint: (
+                endpoint.tier != tier,
+                neutral if ranks[id(endpoint)] is None else ranks[id(endpoint)]
+            )
+        )
+
+    def stats(self) -> Dict:
+        return {
+            'models': [endpoint.stats() for endpoint in self.endpoints],
+            'call_tiers': self.call_tiers
+        }
+
+
+def _load_endpoints() -> List[ModelEndpoint]:
+    """
+    Models from LLM_MODELS, a JSON list such as
+    [{"model": "google/gemini-2.0-flash-exp:free", "tier": "fast"},
+     {"model": "...", "tier": "strong", "base_url": "...", "api_key_env": "OTHER_KEY"}]
+    Without it, the single default model serves both tiers.
+    """
+    specs = json.loads(settings.LLM_MODELS) if settings.LLM_MODELS else [{"model": DEFAULT_MODEL}]
+    endpoints = []
+    for spec in specs:
+        api_key = os.getenv(spec["api_key_env"]) if spec.get("api_key_env") else None
+        endpoints.append(ModelEndpoint(
+            model=spec["model"],
+            tier=spec.get("tier", "fast"),
+            base_url=spec.get("base_url"),
+            api_key=api_key,
+            timeout=float(spec.get("timeout", settings.LLM_TIMEOUT_SECONDS))
+        ))
+    return endpoints
+
+
+_model_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """Process-wide router configured from settings, created on first use"""
+    global _model_router
+    if _model_router is None:
+        call_tiers = json.loads(settings.LLM_CALL_TIERS) if settings.LLM_CALL_TIERS else None
+        _model_router = ModelRouter(_load_endpoints(), call_tiers)
+    return _model_router
@@ -1,8 +1,9 @@
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 import PyPDF2
 import docx
 import io
 import re
+from app.config import settings
 
 class ResumeParser:
     """
@@ -12,42 +13,78 @@ class ResumeParser:
     def __init__(self):
         pass
 
-    def parse_resume(self, file_bytes: bytes, filename: str) -> Dict:
+    def parse_resume(self, file_bytes: bytes, filename: str, fast: bool = False) -> Dict:
         """
         Parse resume file and extract structured data
+        fast: only read the first page(s) and return header/contact/skills
         """
+        if fast:
+            max_pages = settings.RESUME_FAST_MAX_PAGES
+            max_chars = settings.RESUME_FAST_MAX_CHARS
+        else:
+            max_pages = settings.RESUME_MAX_PAGES
+            max_chars = settings.RESUME_MAX_CHARS
+        
         if filename.endswith('.pdf'):
-            return self._parse_pdf(file_bytes)
+            text = self._parse_pdf(file_bytes, max_pages, max_chars)
         elif filename.endswith('.docx'):
-            return self._parse_docx(file_bytes)
+            text = self._parse_docx(file_bytes, max_chars)
         else:
             raise ValueError("Unsupported file format. Please upload PDF or DOCX.")
+        
+        if fast:
+            return self._extract_header_information(text)
+        return self._extract_information(text)
 
-    def _parse_pdf(self, pdf_bytes: bytes) -> Dict:
-        """Parse PDF resume"""
-        try:
-            pdf_file = io.BytesIO(pdf_bytes)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
+    def iter_pdf_pages(
+        self,
+        pdf_bytes: bytes,
+        max_pages: Optional[int] = None,
+        max_chars: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Lazily yield page text, stopping once the page or character budget is met.
+        Pages after the cut-off are never parsed.
+        """
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+        chars = 0
+        
+        # reader.pages loads each page on access, so breaking early skips the rest
+        for index, page in enumerate(pdf_reader.pages):
+            if max_pages is not None and index >= max_pages:
+                return
             
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
+            text = page.extract_text() or ""
+            if max_chars is not None and chars + len(text) >= max_chars:
+                yield text[:max_chars - chars]
+                return
             
-            return self._extract_information(text)
+            chars += len(text)
+            yield text
+
+    def _parse_pdf(self, pdf_bytes: bytes, max_pages: Optional[int] = None, max_chars: Optional[int] = None) -> str:
+        """Extract text from a PDF resume within the page/character budget"""
+        try:
+            return "\n".join(self.iter_pdf_pages(pdf_bytes, max_pages, max_chars)) + "\n"
         except Exception as e:
             raise ValueError(f"Error parsing PDF: {str(e)}")
 
-    def _parse_docx(self, docx_bytes: bytes) -> Dict:
-        """Parse DOCX resume"""
+    def _parse_docx(self, docx_bytes: bytes, max_chars: Optional[int] = None) -> str:
+        """Extract text from a DOCX resume within the character budget"""
         try:
             docx_file = io.BytesIO(docx_bytes)
             doc = docx.Document(docx_file)
             
-            text = ""
+            lines = []
+            chars = 0
             for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
+                lines.append(paragraph.text)
+                chars += len(paragraph.text) + 1
+                if max_chars is not None and chars >= max_chars:
+                    break
             
-            return self._extract_information(text)
+            text = "\n".join(lines) + "\n"
+            return text[:max_chars] if max_chars is not None else text
         except Exception as e:
             raise ValueError(f"Error parsing DOCX: {str(e)}")
 
@@ -56,13 +93,52 @@ class ResumeParser:
         # Basic extraction using regex patterns
         # In production, use NLP libraries or ML models for better extraction
         
+        email, phone = self._extract_contact(text)
+        
+        # Extract skills (common keywords)
+        found_skills = self._extract_skills(text)
+        
+        # Extract education (simplified)
+        education = self._extract_education(text)
+        
+        # Extract experience (simplified)
+        experience = self._extract_experience(text)
+        
+        return {
+            'email': email,
+            'phone': phone,
+            'skills': found_skills,
+            'education': education,
+            'experience': experience,
+            'summary': text[:500] + '...' if len(text) > 500 else text,
+            'raw_text': text
+        }
+
+    def _extract_header_information(self, text: str) -> Dict:
+        """Extract only what /interview/start needs: header, contact and skills"""
+        email, phone = self._extract_contact(text)
+        header_lines = [line.strip() for line in text.split('\n') if line.strip()][:3]
+        
+        return {
+            'name': header_lines[0] if header_lines else None,
+            'header': header_lines,
+            'email': email,
+            'phone': phone,
+            'skills': self._extract_skills(text)
+        }
+
+    def _extract_contact(self, text: str):
+        """Extract first email and phone number"""
         email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
         phone_pattern = r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
         
         email = re.findall(email_pattern, text)
         phone = re.findall(phone_pattern, text)
         
-        # Extract skills (common keywords)
+        return (email[0] if email else None), (phone[0] if phone else None)
+
+    def _extract_skills(self, text: str) -> list:
+        """Extract skills (common keywords)"""
         skill_keywords = [
             'python', 'java', 'javascript', 'react', 'node', 'sql', 'aws',
             'docker', 'kubernetes', 'git', 'mongodb', 'postgresql', 'linux',
@@ -75,21 +151,7 @@ class ResumeParser:
             if skill in text_lower:
                 found_skills.append(skill.title())
         
-        # Extract education (simplified)
-        education = self._extract_education(text)
-        
-        # Extract experience (simplified)
-        experience = self._extract_experience(text)
-        
-        return {
-            'email': email[0] if email else None,
-            'phone': phone[0] if phone else None,
-            'skills': found_skills,
-            'education': education,
-            'experience': experience,
-            'summary': text[:500] + '...' if len(text) > 500 else text,
-            'raw_text': text
-        }
+        return found_skills
 
     def _extract_education(self, text: str) -> list:
         """Extract education information"""
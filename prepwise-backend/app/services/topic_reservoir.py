@@ -0,0 +1,220 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional
+from app.config import settings
+from app.models.llm_output import GDTopicBatch
+from app.services.gemini_service import GeminiService
+
+CATEGORIES = ("technology", "social", "business", "abstract")
+
+# Served instantly until the first AI-generated batch arrives (and whenever the LLM is unavailable)
+SEED_TOPICS = [
+    ("technology", "Should social media platforms be held accountable for spreading fake news?"),
+    ("business", "Is remote work the future of corporate culture?"),
+    ("technology", "Should artificial intelligence be regulated by governments?"),
+    ("social", "Is online education as effective as traditional classroom learning?"),
+    ("social", "Should college degrees be mandatory for all high-paying jobs?"),
+    ("business", "Is universal basic income a solution to automation-related job loss?"),
+    ("social", "Should voting be made compulsory in democratic countries?"),
+    ("business", "Is cryptocurrency the future of financial transactions?"),
+    ("business", "Should companies prioritize diversity over merit in hiring?"),
+    ("social", "Is climate change the most pressing global issue today?"),
+    ("abstract", "Is failure a better teacher than success?"),
+    ("abstract", "Does the end justify the means?")
+]
+
+# How many topics the refill prompt asks for at once
+REFILL_BATCH_SIZE = 10
+# Normalized topics remembered (served or queued) so the LLM's repeats are dropped
+SEEN_PER_SLOT = 10
+
+
+def normalize_topic(topic: str) -> str:
+    """Dedup key: lowercase words only, so punctuation and spacing variants collapse"""
+    return " ".join(re.findall(r"[a-z0-9]+", topic.lower()))
+
+
+class TopicReservoir:
+    """
+    Pool of ready GD topics kept topped up by a background task, so starting a GD never
+    waits on the LLM. Topics sit in one deque per category; pop() takes from the fullest
+    category (or the requested one) in O(1). When the pool drops below GD_TOPIC_RESERVOIR_SIZE
+    the refill task asks the LLM for a batch of categorized topics, at most once every
+    GD_TOPIC_REFILL_INTERVAL_SECONDS, and drops any already seen after normalization.
+    """
+
+    def __init__(self, size: int = 40, refill_interval: float = 30.0, gemini: Optional[GeminiService] = None):
+        self.size = max(1, size)
+        self.refill_interval = refill_interval
+        self.gemini = gemini or GeminiService()
+        self._topics: Dict[str, Deque[Dict]] = {category: deque() for category in CATEGORIES}
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._low = asyncio.Event()
+        self._last_refill = 0.0
+        self._metrics = {'served': 0, 'served_seed': 0, 'generated': 0, 'duplicates': 0, 'refill_failures': 0}
+        self._seed()
+
+    def __len__(self) -> int:
+        return sum(len(topics) for topics in self._topics.values())
+
+    def _seed(self) -> None:
+        for category, topic in SEED_TOPICS:
+            self.add(topic, category, source="seed")
+
+    def add(self, topic: str, category: str, source: str = "ai") -> bool:
+        """Queue a topic unless an equivalent one was already seen; False for duplicates"""
+        topic = topic.strip().strip('"').strip()
+        key = normalize_topic(topic)
+        if len(key) < 10:
+            return False
+        if key in self._seen:
+            self._metrics['duplicates'] += 1
+            return False
+        self._seen[key] = None
+        while len(self._seen) > self.size * SEEN_PER_SLOT:
+            self._seen.popitem(last=False)
+        category = category.lower().strip() if category else ""
+        if category not in self._topics:
+            category = "abstract"
+        self._topics[category].append({"topic": topic, "category": category, "source": source})
+        return True
+
+    def pop(self, category: Optional[str] = None) -> Dict:
+        """
+        Next topic as {"topic", "category", "source"}; never calls the LLM.
+        Falls back to any category when the requested one is empty, and to the seed
+        topics when the whole pool is (served topics can then repeat).
+        """
+        self.start()
+        queue = self._topics.get(category) if category else None
+        if not queue:
+            queue = max(self._topics.values(), key=len)
+        if not queue:
+            self._seed_again()
+            queue = max(self._topics.values(), key=len)
+
+        topic = queue.popleft()
+        self._metrics['served'] += 1
+        if topic['source'] == 'seed':
+            self._metrics['served_seed'] += 1
+        if len(self) < self.size:
+            self._low.set()
+        return topic
+
+    def _seed_again(self) -> None:
+        for category, topic in SEED_TOPICS:
+            self._seen.pop(normalize_topic(topic), None)
+        self._seed()
+
+    def metrics(self) -> Dict:
+        return {
+            **self._metrics,
+            'available': len(self),
+            'by_category': {category: len(topics) for category, topics in self._topics.items()},
+            'target_size': self.size
+        }
+
+    # ============================================================
+    # BACKGROUND REFILL
+    # ============================================================
+
+    def start(self) -> None:
+        """
+        Start the refill task on the running loop (restarted if the loop changed).
+        Called from the app lifespan so the pool fills before the first GD; pop()
+        also calls it in case the reservoir is used outside the app.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        self._loop = loop
+        self._low = asyncio.Event()
+        if len(self) < self.size:
+            self._low.set()
+        self._task = loop.create_task(self._refill_loop())
+
+    async def stop(self) -> None:
+        """Cancel the refill task (app shutdown)"""
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _refill_loop(self) -> None:
+        while True:
+            await self._low.wait()
+            wait = self._last_refill + self.refill_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_refill = time.monotonic()
+            try:
+                added = await self.refill()
+            except Exception as e:
+                print(f"[TopicReservoir] Refill failed: {e}")
+                added = 0
+            if not added:
+                self._metrics['refill_failures'] += 1
+            if len(self) >= self.size:
+                self._low.clear()
+
+    async def refill(self) -> int:
+        """Ask the LLM for one batch of topics; returns how many new ones were queued"""
+        count = min(REFILL_BATCH_SIZE, max(1, self.size - len(self)))
+        prompt = f"""Generate {count} distinct, realistic placement-style Group Discussion topics.
+Each topic should be:
+- Relevant to current issues
+- Suitable for campus placement interviews
+- Open-ended with multiple perspectives
+
+Spread them across these categories: {', '.join(CATEGORIES)}."""
+
+        parsed, response = await asyncio.to_thread(
+            self.gemini.request_structured, prompt, GDTopicBatch, reask=False, call_site="gd_topics"
+        )
+        if parsed is not None:
+            items = [topic.model_dump() for topic in parsed.topics if topic.topic.strip()]
+        else:
+            items = self._parse_topic_lines(response or "")
+        added = 0
+        for item in items:
+            if self.add(item["topic"], item.get("category", "")):
+                added += 1
+        self._metrics['generated'] += added
+        return added
+
+    @staticmethod
+    def _parse_topic_lines(text: str) -> List[Dict]:
+        """Fallback for replies that aren't valid JSON: "category: topic" lines or bare questions"""
+        topics = []
+        for line in text.splitlines():
+            line = re.sub(r"^\s*(?:[-*]|\d+[.)])\s*", "", line).strip()
+            category, _, topic = line.partition(":")
+            if topic and category.lower().strip() in CATEGORIES:
+                topics.append({"category": category, "topic": topic})
+            elif line.endswith("?"):
+                topics.append({"category": "", "topic": line})
+        return topics
+
+
+_topic_reservoir: Optional[TopicReservoir] = None
+
+
+def get_topic_reservoir() -> TopicReservoir:
+    """Process-wide reservoir configured from settings, created on first use"""
+    global _topic_reservoir
+    if _topic_reservoir is None:
+        _topic_reservoir = TopicReservoir(
+            size=settings.GD_TOPIC_RESERVOIR_SIZE,
+            refill_interval=settings.GD_TOPIC_REFILL_INTERVAL_SECONDS
+        )
+    return _topic_reservoir
@@ -0,0 +1,283 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+from app.config import settings
+
+# Offline speech-to-text backends are optional:
+# - faster-whisper (pip install faster-whisper) for TRANSCRIPTION_BACKEND=whisper
+# - vosk (pip install vosk) plus a downloaded model for TRANSCRIPTION_BACKEND=vosk
+
+MODEL_SAMPLE_RATE = 16000
+
+
+class TranscriptionQueueFull(Exception):
+    """Raised when the transcription queue is at its configured cap"""
+    pass
+
+
+class TranscriptionEngine:
+    """
+    Interface for speech-to-text backends.
+    load() is called once per worker process; transcribe() gets mono float32 audio at 16 kHz.
+    """
+    name = "base"
+
+    def __init__(self, model: Optional[str] = None):
+        self.model = model
+
+    def load(self) -> None:
+        pass
+
+    def transcribe(self, audio: "np.ndarray", language: str = 'en-US') -> str:
+        raise NotImplementedError
+
+    def transcribe_batch(self, batch: List[Tuple["np.ndarray", str]]) -> List[str]:
+        """
+        Transcribe a group of clips one after another. None of the bundled backends can
+        run several independent clips in one forward pass; one that can should override this.
+        """
+        return [self.transcribe(audio, language) for audio, language in batch]
+
+
+class NullTranscriptionEngine(TranscriptionEngine):
+    """No speech-to-text configured; returns empty transcripts"""
+    name = "none"
+
+    def transcribe(self, audio: "np.ndarray", language: str = 'en-US') -> str:
+        return ""
+
+
+class WhisperTranscriptionEngine(TranscriptionEngine):
+    """CPU Whisper via faster-whisper (CTranslate2, int8)"""
+    name = "whisper"
+
+    def load(self) -> None:
+        from faster_whisper import WhisperModel
+        self._model = WhisperModel(self.model or "tiny.en", device="cpu", compute_type="int8", cpu_threads=1)
+
+    def transcribe(self, audio: "np.ndarray", language: str = 'en-US') -> str:
+        segments, _ = self._model.transcribe(audio, language=language.split('-')[0], beam_size=1)
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+class VoskTranscriptionEngine(TranscriptionEngine):
+    """Kaldi-based offline recogniser; self.model is the path to a downloaded Vosk model"""
+    name = "vosk"
+
+    def load(self) -> None:
+        import vosk
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self._model = vosk.Model(self.model)
+
+    def transcribe(self, audio: "np.ndarray", language: str = 'en-US') -> str:
+        import json
+        recognizer = self._vosk.KaldiRecognizer(self._model, MODEL_SAMPLE_RATE)
+        pcm = (np.clip(audio, -1, 1) * 32767).astype('<i2').tobytes()
+        recognizer.AcceptWaveform(pcm)
+        return json.loads(recognizer.FinalResult()).get('text', '')
+
+
+ENGINES = {
+    'none': NullTranscriptionEngine,
+    'whisper': WhisperTranscriptionEngine,
+    'vosk': VoskTranscriptionEngine
+}
+
+
+def create_engine(backend: str, model: Optional[str] = None) -> TranscriptionEngine:
+    if backend not in ENGINES:
+        raise ValueError(f"Unknown transcription backend: {backend}")
+    return ENGINES[backend](model)
+
+
+# ---------------- WORKER PROCESS ----------------
+# The model is loaded once per worker by the pool initializer
+_worker_engine: Optional[TranscriptionEngine] = None
+
+
+def _init_worker(backend: str, model: Optional[str]) -> None:
+    global _worker_engine
+    _worker_engine = create_engine(backend, model)
+    _worker_engine.load()
+
+
+def _transcribe_batch(batch: List[Tuple["np.ndarray", str]]) -> Tuple[List[str], float]:
+    """Runs in a worker; returns the transcripts and the processing time for the batch"""
+    start = time.perf_counter()
+    texts = _worker_engine.transcribe_batch(batch)
+    return texts, time.perf_counter() - start
+
+
+def resample(audio: "np.ndarray", sample_rate: int, target_rate: int = MODEL_SAMPLE_RATE) -> "np.ndarray":
+    """Linear-interpolation resampling to the model rate"""
+    if sample_rate == target_rate or len(audio) == 0:
+        return audio
+    duration = len(audio) / sample_rate
+    target_times = np.arange(int(duration * target_rate)) / target_rate
+    return np.interp(target_times, np.arange(len(audio)) / sample_rate, audio).astype(np.float32)
+
+
+class TranscriptionPool:
+    """
+    Process pool for speech-to-text with a queue-length cap.
+    A dispatcher thread hands queued requests to the workers in groups of up to
+    batch_size (waiting at most batch_window_ms) and keeps at most one group per worker
+    in flight. Grouping saves process round trips; the clips in a group are still
+    transcribed one at a time (see TranscriptionEngine.transcribe_batch).
+    """
+
+    def __init__(
+        self,
+        backend: str = 'none',
+        model: Optional[str] = None,
+        workers: int = 1,
+        max_queue: int = 32,
+        batch_size: int = 4,
+        batch_window_ms: int = 50
+    ):
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.batch_window = batch_window_ms / 1000
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._slots = threading.Semaphore(self.workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(backend, model)
+        )
+        self._lock = threading.Lock()
+        self._metrics = {
+            'requests': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+            'batches': 0,
+            'audio_seconds': 0.0,
+            'processing_seconds': 0.0
+        }
+        self._dispatcher = threading.Thread(target=self._dispatch, name="transcription-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, audio: "np.ndarray", sample_rate: int, language: str = 'en-US') -> Future:
+        """Queue audio for transcription; raises TranscriptionQueueFull at the cap"""
+        future: Future = Future()
+        audio = resample(audio, sample_rate)
+        try:
+            self._queue.put_nowait((audio, language, future))
+        except queue.Full:
+            with self._lock:
+                self._metrics['rejected'] += 1
+            raise TranscriptionQueueFull(f"Transcription queue is full ({self._queue.maxsize} pending)")
+        with self._lock:
+            self._metrics['requests'] += 1
+        return future
+
+    def transcribe(self, audio: "np.ndarray", sample_rate: int, language: str = 'en-US',
+                   timeout: Optional[float] = None) -> str:
+        return self.submit(audio, sample_rate, language).result(timeout=timeout)
+
+    async def transcribe_async(self, audio: "np.ndarray", sample_rate: int, language: str = 'en-US',
+                               timeout: Optional[float] = None) -> str:
+        future = asyncio.wrap_future(self.submit(audio, sample_rate, language))
+        return await asyncio.wait_for(future, timeout=timeout)
+
+    def _dispatch(self) -> None:
+        while True:
+            self._slots.acquire()
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            futures = [item[2] for item in batch]
+            audio_seconds = sum(len(item[0]) for item in batch) / MODEL_SAMPLE_RATE
+            try:
+                result = self._executor.submit(_transcribe_batch, [(item[0], item[1]) for item in batch])
+            except Exception as e:
+                self._slots.release()
+                self._fail(futures, e)
+                continue
+            result.add_done_callback(
+                lambda done, futures=futures, audio_seconds=audio_seconds: self._complete(done, futures, audio_seconds)
+            )
+
+    def _complete(self, done: Future, futures: List[Future], audio_seconds: float) -> None:
+        self._slots.release()
+        try:
+            texts, processing_seconds = done.result()
+        except Exception as e:
+            self._fail(futures, e)
+            return
+
+        with self._lock:
+            self._metrics['completed'] += len(futures)
+            self._metrics['batches'] += 1
+            self._metrics['audio_seconds'] += audio_seconds
+            self._metrics['processing_seconds'] += processing_seconds
+        if audio_seconds:
+            print(f"[TranscriptionPool] Batch of {len(futures)}: {audio_seconds:.1f}s audio "
+                  f"in {processing_seconds:.2f}s (RTF {processing_seconds / audio_seconds:.3f})")
+
+        for future, text in zip(futures, texts):
+            if not future.cancelled():
+                future.set_result(text)
+
+    def _fail(self, futures: List[Future], error: Exception) -> None:
+        print(f"[TranscriptionPool] Batch failed: {type(error).__name__}: {error}")
+        with self._lock:
+            self._metrics['failed'] += len(futures)
+        for future in futures:
+            if not future.cancelled():
+                future.set_exception(error)
+
+    def metrics(self) -> Dict:
+        """Throughput and real-time factor (processing time / audio duration)"""
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics['backend'] = self.backend
+        metrics['workers'] = self.workers
+        metrics['queue_length'] = self._queue.qsize()
+        metrics['real_time_factor'] = (
+            metrics['processing_seconds'] / metrics['audio_seconds'] if metrics['audio_seconds'] else None
+        )
+        return metrics
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: Optional[TranscriptionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_transcription_pool() -> TranscriptionPool:
+    """Process-wide pool configured from settings, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = TranscriptionPool(
+                backend=settings.TRANSCRIPTION_BACKEND,
+                model=settings.TRANSCRIPTION_MODEL,
+                workers=settings.TRANSCRIPTION_WORKERS,
+                max_queue=settings.TRANSCRIPTION_MAX_QUEUE,
+                batch_size=settings.TRANSCRIPTION_BATCH_SIZE,
+                batch_window_ms=settings.TRANSCRIPTION_BATCH_WINDOW_MS
+            )
+        return _pool
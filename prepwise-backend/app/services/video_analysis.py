@@ -1,4 +1,9 @@
-from typing import Dict, Optional, List
+from typing import Dict, Iterable, Optional, List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+import os
+import time
 try:
     import numpy as np
     NUMPY_AVAILABLE = True
@@ -11,105 +16,548 @@ try:
 except ImportError:
     OPENCV_AVAILABLE = False
     cv2 = None
+from app.config import settings
+from app.utils.video_processing import extract_frames
+
+# Haar cascades ship with opencv-python (cv2.data.haarcascades); no extra downloads needed.
+# For better accuracy swap in a DNN face model or MediaPipe landmarks behind the same FaceTracker API.
+
+# Template match score needed to keep following a face between full detections
+TRACK_MIN_SCORE = 0.6
+
+# Per-frame metrics are stored column-wise. Every field is float32, so an array of
+# this dtype can be viewed as a plain (frames, fields) matrix for one-call reductions.
+FRAME_METRIC_FIELDS = ('face_detected', 'eye_contact', 'attention', 'neutral', 'happy', 'focused')
+FRAME_METRICS_DTYPE = np.dtype([(name, np.float32) for name in FRAME_METRIC_FIELDS]) if NUMPY_AVAILABLE else None
+_COLUMN = {name: index for index, name in enumerate(FRAME_METRIC_FIELDS)}
+
+# Length of the windows in the per-answer timeline
+TIMELINE_WINDOW_SECONDS = 30.0
+
+# ============ MODELS (loaded once per process) ============
+_cascades: Optional[Dict] = None
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _load_cascades() -> Dict:
+    """Load the face/eye/smile cascades once per process (also the pool initializer)"""
+    global _cascades
+    if _cascades is None:
+        base = cv2.data.haarcascades
+        _cascades = {
+            'face': cv2.CascadeClassifier(base + 'haarcascade_frontalface_default.xml'),
+            'eye': cv2.CascadeClassifier(base + 'haarcascade_eye.xml'),
+            'smile': cv2.CascadeClassifier(base + 'haarcascade_smile.xml')
+        }
+    return _cascades
+
+
+def _worker_count() -> int:
+    return settings.VIDEO_WORKERS or os.cpu_count() or 1
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Shared process pool for long clips; each worker loads the cascades once"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=_worker_count(), initializer=_load_cascades)
+    return _executor
+
+
+def _to_gray(frame: np.ndarray) -> np.ndarray:
+    """Cascades work on grayscale; also a third of the bytes to ship to workers"""
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+
+
+class FaceTracker:
+    """
+    Finds the face in consecutive frames. A full cascade detection runs every
+    detect_interval frames (or when tracking is lost); in between, the last face
+    patch is template-matched inside a window around its previous position.
+    """
+
+    def __init__(self, detect_interval: int = 5):
+        self.cascades = _load_cascades()
+        self.detect_interval = max(1, detect_interval)
+        self._box = None
+        self._template = None
+        self._since_detect = 0
+
+    def locate(self, gray: np.ndarray) -> Optional[tuple]:
+        """Return the face box (x, y, w, h) in this frame, or None"""
+        if self._box is not None and self._since_detect < self.detect_interval:
+            box = self._track(gray)
+            if box is not None:
+                self._since_detect += 1
+                return self._remember(gray, box)
+
+        box = self._detect(gray)
+        self._since_detect = 0
+        if box is None:
+            self._box = self._template = None
+            return None
+        return self._remember(gray, box)
+
+    def _detect(self, gray: np.ndarray) -> Optional[tuple]:
+        min_side = max(24, min(gray.shape) // 8)
+        faces = self.cascades['face'].detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(min_side, min_side))
+        if len(faces) == 0:
+            return None
+        # The candidate is the largest (closest) face
+        return tuple(int(v) for v in max(faces, key=lambda f: f[2] * f[3]))
+
+    def _track(self, gray: np.ndarray) -> Optional[tuple]:
+        x, y, w, h = self._box
+        frame_h, frame_w = gray.shape
+        x0, y0 = max(0, x - w // 2), max(0, y - h // 2)
+        x1, y1 = min(frame_w, x + w + w // 2), min(frame_h, y + h + h // 2)
+        window = gray[y0:y1, x0:x1]
+        if window.shape[0] < h or window.shape[1] < w:
+            return None
+        scores = cv2.matchTemplate(window, self._template, cv2.TM_CCOEFF_NORMED)
+        _, best, _, (dx, dy) = cv2.minMaxLoc(scores)
+        if best < TRACK_MIN_SCORE:
+            return None
+        return (x0 + dx, y0 + dy, w, h)
+
+    def _remember(self, gray: np.ndarray, box: tuple) -> tuple:
+        x, y, w, h = box
+        self._box = box
+        self._template = gray[y:y + h, x:x + w].copy()
+        return box
+
+    def landmarks(self, gray: np.ndarray, box: Optional[tuple]) -> Dict:
+        """Eyes (upper half) and smile (lower half) searched only inside the face box"""
+        frame_h, frame_w = gray.shape
+        if box is None:
+            return {'face': None, 'eyes': [], 'smile': False, 'frame_size': (frame_w, frame_h)}
+
+        x, y, w, h = box
+        upper = gray[y:y + int(h * 0.6), x:x + w]
+        lower = gray[y + h // 2:y + h, x:x + w]
+        eye_side = max(8, w // 8)
+        eyes = self.cascades['eye'].detectMultiScale(upper, scaleFactor=1.1, minNeighbors=6, minSize=(eye_side, eye_side))
+        eyes = sorted(eyes, key=lambda e: e[2] * e[3], reverse=True)[:2]
+        smiles = self.cascades['smile'].detectMultiScale(lower, scaleFactor=1.7, minNeighbors=20, minSize=(w // 4, h // 8))
+
+        return {
+            'face': box,
+            'eyes': [(x + int(ex), y + int(ey), int(ew), int(eh)) for ex, ey, ew, eh in eyes],
+            'smile': len(smiles) > 0,
+            'frame_size': (frame_w, frame_h)
+        }
+
+
+class FrameMetrics:
+    """
+    Growable columnar buffer of per-frame metrics (FRAME_METRICS_DTYPE rows).
+    Rows are written in place; capacity doubles so appends are amortised O(1).
+    """
+
+    def __init__(self, capacity: int = 256):
+        self._data = np.zeros(max(1, capacity), dtype=FRAME_METRICS_DTYPE)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._size + extra
+        if needed > len(self._data):
+            grown = np.zeros(max(needed, len(self._data) * 2), dtype=FRAME_METRICS_DTYPE)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+
+    def append(self, row: tuple) -> None:
+        self._reserve(1)
+        self._data[self._size] = row
+        self._size += 1
+
+    def extend(self, rows: np.ndarray) -> None:
+        self._reserve(len(rows))
+        self._data[self._size:self._size + len(rows)] = rows
+        self._size += len(rows)
+
+    @property
+    def array(self) -> np.ndarray:
+        """View of the filled rows (no copy)"""
+        return self._data[:self._size]
+
+
+def _summary(means, stds, p10, p50, p90, window_starts, windows, frame_count: int) -> Dict:
+    """Shared output shape for batch and streaming aggregation (inputs indexed by _COLUMN)"""
+    def column(values, name):
+        return round(float(values[_COLUMN[name]]), 1)
+
+    scores = ('eye_contact', 'attention')
+    return {
+        'eye_contact': float(means[_COLUMN['eye_contact']]),
+        'attention': float(means[_COLUMN['attention']]),
+        'facial_expressions': {
+            name: float(means[_COLUMN[name]]) for name in ('neutral', 'happy', 'focused')
+        },
+        'face_presence': float(means[_COLUMN['face_detected']]) * 100,
+        'variability': {name: column(stds, name) for name in scores},
+        'percentiles': {
+            name: {'p10': column(p10, name), 'p50': column(p50, name), 'p90': column(p90, name)}
+            for name in scores
+        },
+        'timeline': [
+            {
+                'start': round(float(start), 1),
+                'eye_contact': column(window, 'eye_contact'),
+                'attention': column(window, 'attention'),
+                'face_presence': round(float(window[_COLUMN['face_detected']]) * 100, 1)
+            }
+            for start, window in zip(window_starts, windows)
+        ],
+        'frame_count': frame_count,
+        'analysis_quality': 'good' if frame_count > 10 else 'limited'
+    }
+
+
+def aggregate_frame_metrics(metrics: np.ndarray, frame_interval: float = 1.0,
+                            window_seconds: float = TIMELINE_WINDOW_SECONDS) -> Dict:
+    """
+    Summarise per-frame metrics with vectorized reductions over the columns:
+    means, spread, percentiles and per-window means over time
+    frame_interval: seconds between sampled frames (extract_frames frame_rate)
+    """
+    matrix = np.ascontiguousarray(metrics).view(np.float32).reshape(len(metrics), len(FRAME_METRIC_FIELDS))
+    p10, p50, p90 = np.percentile(matrix, [10, 50, 90], axis=0)
+
+    # Per-window means: reduceat sums each run of frames in one pass
+    per_window = max(1, int(round(window_seconds / frame_interval)))
+    starts = np.arange(0, len(matrix), per_window)
+    counts = np.diff(np.append(starts, len(matrix)))
+    windows = np.add.reduceat(matrix, starts, axis=0) / counts[:, None]
+
+    return _summary(matrix.mean(axis=0), matrix.std(axis=0), p10, p50, p90,
+                    starts * frame_interval, windows, len(matrix))
+
+
+def analyze_video_bytes(video_bytes: bytes) -> Dict:
+    """Job entry point: sample, decode and analyze an uploaded answer clip in this process"""
+    return VideoAnalysisService().analyze_video(extract_frames(video_bytes), parallel=False)
+
+
+class StreamingVideoAnalyzer:
+    """
+    Incremental video analysis for frames that arrive while the candidate speaks.
+    Frames closer together than frame_interval are skipped; analyzed frames only
+    update running sums, a fixed histogram per metric (for percentiles) and the
+    current timeline window, so memory does not grow with the answer length.
+    """
+
+    # Histogram resolution for percentiles; every metric is on a 0-100 scale
+    HIST_BIN = 0.5
+
+    def __init__(self, frame_interval: float = 1.0, window_seconds: float = TIMELINE_WINDOW_SECONDS,
+                 service: Optional["VideoAnalysisService"] = None):
+        self.frame_interval = frame_interval
+        self.window_seconds = window_seconds
+        self.service = service or VideoAnalysisService()
+        self.tracker = FaceTracker(settings.VIDEO_DETECT_INTERVAL)
+        self.history: deque = deque(maxlen=5)
+        self._started = None
+        self._next_sample = 0.0
+        self._count = 0
+        fields = len(FRAME_METRIC_FIELDS)
+        self._sum = np.zeros(fields)
+        self._sum_sq = np.zeros(fields)
+        self._hist = np.zeros((fields, int(100 / self.HIST_BIN) + 1), dtype=np.int64)
+        self._window_index = 0
+        self._window_sum = np.zeros(fields)
+        self._window_count = 0
+        self._window_starts: List[float] = []
+        self._windows: List[np.ndarray] = []
+
+    @property
+    def frame_count(self) -> int:
+        return self._count
+
+    def arrival_time(self) -> float:
+        """Seconds since the first frame arrived (monotonic clock)"""
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+        return now - self._started
+
+    def is_due(self, timestamp: float) -> bool:
+        """Whether a frame at this timestamp would be sampled"""
+        return timestamp + 1e-3 >= self._next_sample
+
+    def feed_frame(self, frame: np.ndarray, timestamp: Optional[float] = None) -> bool:
+        """
+        Analyze one frame if it is due; timestamp is seconds since the answer started
+        (defaults to arrival time). Returns True when the frame was analyzed.
+        """
+        if timestamp is None:
+            timestamp = self.arrival_time()
+        if not self.is_due(timestamp):
+            return False
+        self._next_sample = max(self._next_sample + self.frame_interval, timestamp + 1e-3)
+
+        if frame.shape[1] > settings.VIDEO_ANALYSIS_WIDTH:
+            height = max(1, round(frame.shape[0] * settings.VIDEO_ANALYSIS_WIDTH / frame.shape[1]))
+            frame = cv2.resize(frame, (settings.VIDEO_ANALYSIS_WIDTH, height), interpolation=cv2.INTER_AREA)
+        row = np.array(self.service.measure_frame(frame, self.tracker, self.history))
+        self._update(row, timestamp)
+        return True
+
+    def feed_jpeg(self, data: bytes, timestamp: Optional[float] = None) -> bool:
+        """Decode a JPEG/PNG still (only when it is due) and analyze it"""
+        if timestamp is None:
+            timestamp = self.arrival_time()
+        if not self.is_due(timestamp):
+            return False
+        frame = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            raise ValueError("Could not decode image frame")
+        return self.feed_frame(frame, timestamp)
+
+    def feed_segment(self, data: bytes, offset: Optional[float] = None) -> int:
+        """
+        Analyze a self-contained video segment (e.g. a few seconds of WebM recorded
+        with a fresh MediaRecorder). offset is the segment start in seconds; by default
+        segments are assumed to follow each other. Returns the number of frames analyzed.
+        """
+        if offset is None:
+            offset = self._next_sample
+        analyzed = 0
+        for index, frame in enumerate(extract_frames(data, frame_rate=self.frame_interval)):
+            analyzed += self.feed_frame(frame, offset + index * self.frame_interval)
+        return analyzed
+
+    def _update(self, row: np.ndarray, timestamp: float) -> None:
+        self._count += 1
+        self._sum += row
+        self._sum_sq += row * row
+        bins = np.clip(np.rint(row / self.HIST_BIN).astype(np.int64), 0, self._hist.shape[1] - 1)
+        self._hist[np.arange(len(row)), bins] += 1
+
+        window_index = int(timestamp // self.window_seconds)
+        if window_index != self._window_index and self._window_count:
+            self._close_window()
+        self._window_index = window_index
+        self._window_sum += row
+        self._window_count += 1
+
+    def _close_window(self) -> None:
+        self._window_starts.append(self._window_index * self.window_seconds)
+        self._windows.append(self._window_sum / self._window_count)
+        self._window_sum = np.zeros_like(self._window_sum)
+        self._window_count = 0
+
+    def _percentiles(self, quantiles) -> List[np.ndarray]:
+        cumulative = np.cumsum(self._hist, axis=1)
+        return [
+            (cumulative < q * self._count).sum(axis=1) * self.HIST_BIN
+            for q in quantiles
+        ]
+
+    def result(self) -> Dict:
+        """Aggregates in the same shape as VideoAnalysisService.analyze_video"""
+        if not self._count:
+            return self.service._get_default_analysis()
+        means = self._sum / self._count
+        stds = np.sqrt(np.maximum(self._sum_sq / self._count - means * means, 0.0))
+        p10, p50, p90 = self._percentiles((0.1, 0.5, 0.9))
+        starts, windows = list(self._window_starts), list(self._windows)
+        if self._window_count:
+            starts.append(self._window_index * self.window_seconds)
+            windows.append(self._window_sum / self._window_count)
+        return _summary(means, stds, p10, p50, p90, starts, windows, self._count)
+
+
+def _analyze_batch(frames: List[np.ndarray]) -> np.ndarray:
+    """
+    Analyze a batch of consecutive grayscale frames (runs inline or in a pool worker)
+    Returns one FRAME_METRICS_DTYPE row per frame
+    """
+    service = VideoAnalysisService()
+    tracker = FaceTracker(settings.VIDEO_DETECT_INTERVAL)
+    history: deque = deque(maxlen=5)
+    metrics = np.zeros(len(frames), dtype=FRAME_METRICS_DTYPE)
+    for index, gray in enumerate(frames):
+        metrics[index] = service.measure_frame(gray, tracker, history)
+    return metrics
 
-# Note: In production, use libraries like:
-# - OpenCV for face detection
-# - MediaPipe or dlib for facial landmarks
-# - TensorFlow/PyTorch models for emotion recognition
-# - Gaze tracking libraries
 
 class VideoAnalysisService:
     """
     Service for analyzing video for facial expressions, eye contact, attention
-    This is a simplified version - in production, use ML models or APIs
+    Face/eye/smile detection uses OpenCV Haar cascades; scores are geometric heuristics
     """
     
     def __init__(self):
-        # In production, load face detection models
-        # self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-        pass
+        self.face_cascade = _load_cascades()['face'] if OPENCV_AVAILABLE else None
 
-    def analyze_face(self, frame: np.ndarray) -> Dict:
+    def analyze_face(self, frame: np.ndarray, tracker: Optional[FaceTracker] = None,
+                     frame_history: Optional[deque] = None) -> Dict:
         """
         Analyze facial features from a video frame
         Returns: eye contact, attention, facial expressions
+        tracker/frame_history carry state between consecutive frames
         """
-        # Placeholder implementation
-        # In production, this would:
-        # 1. Detect face in frame
-        # 2. Extract facial landmarks
-        # 3. Calculate eye contact (gaze direction)
-        # 4. Detect facial expressions
-        # 5. Calculate attention metrics
-        
+        row = dict(zip(FRAME_METRIC_FIELDS, self.measure_frame(frame, tracker, frame_history)))
         return {
-            'eye_contact': 75.0,  # percentage
-            'attention': 80.0,    # percentage
-            'facial_expressions': {
-                'neutral': 40.0,
-                'happy': 30.0,
-                'focused': 60.0
-            }
+            'face_detected': bool(row['face_detected']),
+            'eye_contact': row['eye_contact'],
+            'attention': row['attention'],
+            'facial_expressions': {name: row[name] for name in ('neutral', 'happy', 'focused')}
         }
 
-    def analyze_video(self, video_frames: List[np.ndarray]) -> Dict:
+    def measure_frame(self, frame: np.ndarray, tracker: Optional[FaceTracker] = None,
+                      frame_history: Optional[deque] = None) -> tuple:
+        """Per-frame metrics as a row tuple in FRAME_METRIC_FIELDS order"""
+        gray = cv2.equalizeHist(_to_gray(frame))
+        tracker = tracker or FaceTracker(settings.VIDEO_DETECT_INTERVAL)
+        landmarks = tracker.landmarks(gray, tracker.locate(gray))
+        history = frame_history if frame_history is not None else []
+        
+        eye_contact = self.calculate_eye_contact(landmarks)
+        attention = self.detect_attention_level(landmarks, list(history))
+        history.append(landmarks)
+        
+        detected = landmarks['face'] is not None
+        happy = 100.0 if landmarks['smile'] else 0.0
+        neutral = 100.0 - happy if detected else 0.0
+        return (float(detected), eye_contact, attention, neutral, happy, eye_contact * attention / 100)
+
+    def analyze_video(self, video_frames: Iterable[np.ndarray], frame_interval: float = 1.0,
+                      parallel: bool = True) -> Dict:
         """
         Analyze entire video from frames
+        video_frames can be a generator (extract_frames); frames are grouped into batches,
+        a single batch is analyzed inline and longer clips are spread over the process pool
+        frame_interval: seconds between frames, used for the timeline windows
+        parallel: set False when already running inside a worker process
         """
-        if not video_frames:
+        if not OPENCV_AVAILABLE:
             return self._get_default_analysis()
         
-        # Analyze multiple frames and aggregate
-        frame_analyses = []
-        for frame in video_frames:
-            analysis = self.analyze_face(frame)
-            frame_analyses.append(analysis)
-        
-        # Aggregate results
-        eye_contact_scores = [a['eye_contact'] for a in frame_analyses]
-        attention_scores = [a['attention'] for a in frame_analyses]
-        
-        # Calculate average emotion scores
-        emotion_scores = {}
-        for emotion in ['neutral', 'happy', 'focused']:
-            scores = [a['facial_expressions'].get(emotion, 0) for a in frame_analyses]
-            emotion_scores[emotion] = np.mean(scores) if scores else 0
+        batches = self._batches(video_frames)
+        first = next(batches, None)
+        if first is None:
+            return self._get_default_analysis()
+        second = next(batches, None)
         
-        return {
-            'eye_contact': float(np.mean(eye_contact_scores)),
-            'attention': float(np.mean(attention_scores)),
-            'facial_expressions': emotion_scores,
-            'frame_count': len(frame_analyses),
-            'analysis_quality': 'good' if len(frame_analyses) > 10 else 'limited'
-        }
+        if second is None:
+            metrics = _analyze_batch(first)
+        elif not parallel:
+            metrics = FrameMetrics()
+            for batch in chain([first, second], batches):
+                metrics.extend(_analyze_batch(batch))
+            metrics = metrics.array
+        else:
+            metrics = self._analyze_parallel(chain([first, second], batches))
+
+        return aggregate_frame_metrics(metrics, frame_interval)
+
+    def start_stream(self, frame_interval: float = 1.0) -> StreamingVideoAnalyzer:
+        """Create a running analyzer for frames/segments that arrive while the candidate speaks"""
+        return StreamingVideoAnalyzer(frame_interval=frame_interval, service=self)
 
-    def extract_faces_from_video(self, video_frames: List[np.ndarray]) -> List[np.ndarray]:
+    def finish_stream(self, stream: StreamingVideoAnalyzer) -> Dict:
+        """Video analysis from a stream's running aggregates"""
+        return stream.result()
+
+    def extract_faces_from_video(self, video_frames: Iterable[np.ndarray]) -> List[np.ndarray]:
         """
         Extract face regions from video frames
         """
         faces = []
-        # Placeholder - in production use face detection
+        tracker = FaceTracker(settings.VIDEO_DETECT_INTERVAL)
+        for frame in video_frames:
+            box = tracker.locate(cv2.equalizeHist(_to_gray(frame)))
+            if box is not None:
+                x, y, w, h = box
+                faces.append(frame[y:y + h, x:x + w].copy())
         return faces
 
     def calculate_eye_contact(self, face_landmarks: Dict) -> float:
         """
         Calculate eye contact percentage from facial landmarks
+        A frontal face with both eyes level and centred in the face box reads as
+        looking at the camera; turning the head shifts the eyes off-centre.
         """
-        # Placeholder - in production:
-        # 1. Get eye landmarks
-        # 2. Calculate gaze direction
-        # 3. Determine if looking at camera
-        return 75.0
+        face = face_landmarks.get('face')
+        if face is None:
+            return 0.0
+
+        x, y, w, h = face
+        eyes = face_landmarks.get('eyes', [])
+        if len(eyes) < 2:
+            # Frontal face found but eyes missed (blink, glasses, lighting)
+            return 60.0 if eyes else 40.0
+
+        (ax, ay, aw, ah), (bx, by, bw, bh) = eyes[:2]
+        mid_x = (ax + aw / 2 + bx + bw / 2) / 2
+        yaw = abs(mid_x - (x + w / 2)) / w
+        tilt = abs((ay + ah / 2) - (by + bh / 2)) / h
+        return round(100.0 * max(0.0, 1 - 4 * yaw) * max(0.0, 1 - 4 * tilt), 1)
 
     def detect_attention_level(self, face_landmarks: Dict, frame_history: List) -> float:
         """
         Detect attention level based on head pose and eye movements
+        Combines how centred and close the face is with how steady it was over recent frames
         """
-        # Placeholder - in production:
-        # 1. Track head pose over time
-        # 2. Analyze eye movements
-        # 3. Calculate attention score
-        return 80.0
+        face = face_landmarks.get('face')
+        if face is None:
+            return 0.0
+
+        x, y, w, h = face
+        frame_w, frame_h = face_landmarks['frame_size']
+        center_x, center_y = x + w / 2, y + h / 2
+        offset = max(abs(center_x / frame_w - 0.5), abs(center_y / frame_h - 0.5)) * 2
+        centering = max(0.0, 1 - offset)
+        # Faces narrower than ~15% of the frame mean the candidate leaned away
+        proximity = min(1.0, (w / frame_w) / 0.15)
+
+        movements = []
+        for previous in frame_history:
+            if previous.get('face') is None:
+                continue
+            px, py, pw, ph = previous['face']
+            movements.append(np.hypot(center_x - (px + pw / 2), center_y - (py + ph / 2)) / w)
+        steadiness = max(0.0, 1 - float(np.mean(movements))) if movements else 1.0
+
+        return round(100.0 * (0.5 + 0.5 * centering) * proximity * (0.5 + 0.5 * steadiness), 1)
+
+    def _batches(self, video_frames: Iterable[np.ndarray]):
+        """Group frames into grayscale batches of VIDEO_BATCH_SIZE"""
+        batch = []
+        for frame in video_frames:
+            batch.append(_to_gray(frame))
+            if len(batch) >= settings.VIDEO_BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _analyze_parallel(self, batches) -> np.ndarray:
+        """Run batches on the process pool, keeping at most two per worker in flight"""
+        executor = _get_executor()
+        max_in_flight = _worker_count() * 2
+        pending: deque = deque()
+        results = FrameMetrics()
+        
+        def collect():
+            batch, future = pending.popleft()
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                print(f"[VideoAnalysisService] Worker batch failed, analyzing inline: {e}")
+                results.extend(_analyze_batch(batch))
+        
+        for batch in batches:
+            if len(pending) >= max_in_flight:
+                collect()
+            pending.append((batch, executor.submit(_analyze_batch, batch)))
+        while pending:
+            collect()
+        return results.array
 
     def _get_default_analysis(self) -> Dict:
         """Return default analysis if video processing fails"""
@@ -1,15 +1,27 @@
 from typing import Dict, Optional
+import asyncio
+import math
 try:
     import numpy as np
     NUMPY_AVAILABLE = True
 except ImportError:
     NUMPY_AVAILABLE = False
     np = None
+from app.config import settings
+from app.utils.audio_processing import (
+    extract_audio_features,
+    convert_audio_to_wav,
+    decode_wav,
+    pcm_to_float,
+    speech_segments,
+    StreamingAudioFeatures
+)
+from app.services.transcription import MODEL_SAMPLE_RATE, get_transcription_pool, resample
 
 # Note: In production, use libraries like:
 # - librosa for audio processing
 # - pyAudioAnalysis for emotion recognition
-# - Google Cloud Speech-to-Text for transcription
+# - Offline Whisper/Vosk for transcription (see app/services/transcription.py)
 # - TensorFlow/PyTorch models for emotion classification
 
 class VoiceEmotionService:
@@ -22,67 +34,193 @@ class VoiceEmotionService:
         # In production, load pre-trained models here
         pass
 
-    def analyze_emotions(self, audio_bytes: bytes) -> Dict[str, float]:
+    def analyze_emotions(self, audio_bytes: Optional[bytes] = None, features: Optional[Dict] = None) -> Dict[str, float]:
         """
         Analyze emotions from audio
         Returns dict with emotion scores (0-100)
+        Pass precomputed features (e.g. from a stream) to skip decoding the audio.
         """
-        # Placeholder implementation
-        # In production, this would:
-        # 1. Extract audio features (pitch, energy, spectral features)
-        # 2. Use ML model to classify emotions
-        # 3. Return emotion probabilities
+        if features is None:
+            features = extract_audio_features(audio_bytes) if audio_bytes else {}
+        
+        if not features.get('frame_count'):
+            # Nothing decodable, return default scores
+            return {
+                'happy': 30.0,
+                'neutral': 40.0,
+                'confident': 35.0,
+                'nervous': 25.0,
+                'calm': 30.0
+            }
+        
+        # Heuristic prosody mapping; in production, use an ML classifier on these features
+        duration = max(features['duration'], 1e-6)
+        loudness = self._clip((self._dbfs(features.get('speech_rms_mean', 0.0)) + 40) / 30)
+        pitch_mean = features.get('pitch_mean', 0.0)
+        pitch_variation = features.get('pitch_std', 0.0) / pitch_mean if pitch_mean else 0.0
+        pause_ratio = self._clip(features.get('pause_duration', 0.0) / duration / 0.4)
+        volume_variation = self._volume_variation(features)
+        rate = self._speaking_rate(features)
+        rate_in_range = self._clip(1 - abs(rate - 140) / 80)
+        rate_fast = self._clip((rate - 170) / 60)
+        expressive = self._clip(pitch_variation / 0.2)
+        jittery = self._clip((pitch_variation - 0.2) / 0.2)
+        
+        confident = 0.4 * loudness + 0.3 * (1 - pause_ratio) + 0.3 * rate_in_range
+        nervous = 0.4 * jittery + 0.3 * pause_ratio + 0.3 * rate_fast
+        calm = 0.5 * (1 - volume_variation) + 0.5 * (1 - nervous)
+        happy = 0.6 * expressive * (1 - jittery) + 0.4 * loudness
+        neutral = 1 - max(happy, nervous, expressive)
         
-        # For now, return default scores
         return {
-            'happy': 30.0,
-            'neutral': 40.0,
-            'confident': 35.0,
-            'nervous': 25.0,
-            'calm': 30.0
+            'happy': round(100 * happy, 1),
+            'neutral': round(100 * self._clip(neutral), 1),
+            'confident': round(100 * confident, 1),
+            'nervous': round(100 * nervous, 1),
+            'calm': round(100 * calm, 1)
         }
 
     def transcribe_audio(self, audio_bytes: bytes, language: str = 'en-US') -> str:
         """
-        Transcribe audio to text
-        In production, use Google Speech-to-Text or Whisper
+        Transcribe audio to text with the configured offline backend.
+        Returns an empty string when no backend is configured or the audio can't be decoded.
         """
-        # Placeholder - in production use:
-        # from google.cloud import speech_v1 as speech
-        # or
-        # import whisper
-        
-        # For now, return placeholder
-        return "Transcribed audio text would appear here."
+        audio = self._decode_for_transcription(audio_bytes)
+        if audio is None:
+            return ""
+        try:
+            return get_transcription_pool().transcribe(
+                *audio, language=language, timeout=settings.TRANSCRIPTION_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            print(f"Error transcribing audio: {type(e).__name__}: {e}")
+            return ""
+
+    async def transcribe_audio_async(self, audio_bytes: bytes, language: str = 'en-US') -> str:
+        """Same as transcribe_audio without blocking the event loop (decoding runs in a thread)"""
+        audio = await asyncio.to_thread(self._decode_for_transcription, audio_bytes)
+        if audio is None:
+            return ""
+        try:
+            return await get_transcription_pool().transcribe_async(
+                *audio, language=language, timeout=settings.TRANSCRIPTION_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            print(f"Error transcribing audio: {type(e).__name__}: {e}")
+            return ""
 
-    def analyze_speech_features(self, audio_bytes: bytes) -> Dict:
+    def _decode_for_transcription(self, audio_bytes: bytes):
+        """
+        (mono float32 samples at the model rate, sample_rate) or None if there is nothing
+        to transcribe. Pass WAV (see convert_audio_to_wav) to skip the ffmpeg step.
+        """
+        if settings.TRANSCRIPTION_BACKEND == 'none' or not audio_bytes:
+            return None
+        try:
+            samples, sample_rate, _ = decode_wav(convert_audio_to_wav(audio_bytes))
+            # Only voiced segments go to the model; leading/trailing silence and dead air are dropped
+            segments = speech_segments(samples, sample_rate)
+            if not segments:
+                return None
+            return resample(pcm_to_float(np.concatenate(segments)), sample_rate), MODEL_SAMPLE_RATE
+        except Exception as e:
+            print(f"Error decoding audio for transcription: {e}")
+            return None
+
+    def analyze_speech_features(self, audio_bytes: Optional[bytes] = None, features: Optional[Dict] = None) -> Dict:
         """
         Extract speech features for analysis
         Features: pace, pauses, clarity, volume variations
         """
-        # Placeholder - in production extract:
-        # - Speaking rate (words per minute)
-        # - Pause frequency and duration
-        # - Volume/power variations
-        # - Pitch variations
+        if features is None:
+            features = extract_audio_features(audio_bytes) if audio_bytes else {}
+        
+        if not features.get('frame_count'):
+            return {
+                'speaking_rate': 150,  # words per minute
+                'pause_count': 5,
+                'clarity_score': 75,
+                'volume_stability': 80
+            }
+        
+        # Clarity from signal-to-noise ratio: 10 dB -> 0, 40 dB -> 100
+        noise_floor = max(features.get('noise_floor', 0.0), 1e-5)
+        snr_db = self._dbfs(features.get('speech_level', 0.0)) - self._dbfs(noise_floor)
         
         return {
-            'speaking_rate': 150,  # words per minute
-            'pause_count': 5,
-            'clarity_score': 75,
-            'volume_stability': 80
+            'speaking_rate': round(self._speaking_rate(features)),
+            'pause_count': features.get('pause_count', 0),
+            'pause_duration': round(features.get('pause_duration', 0.0), 2),
+            'clarity_score': round(100 * self._clip((snr_db - 10) / 30)),
+            'volume_stability': round(100 * (1 - self._volume_variation(features))),
+            'pitch_variation': round(features['pitch_std'] / features['pitch_mean'], 3) if features.get('pitch_mean') else 0.0,
+            'speech_ratio': round(features.get('speech_ratio', 0.0), 3),
+            'duration': round(features['duration'], 2)
         }
 
-    def get_comprehensive_analysis(self, audio_bytes: bytes) -> Dict:
+    def get_comprehensive_analysis(self, audio_bytes: bytes, transcribe: bool = True) -> Dict:
         """
         Get comprehensive voice analysis including emotions and transcription
         """
-        emotions = self.analyze_emotions(audio_bytes)
-        transcription = self.transcribe_audio(audio_bytes)
-        features = self.analyze_speech_features(audio_bytes)
+        # Convert to WAV once (a no-op for WAV input) so transcription doesn't rerun ffmpeg
+        if transcribe:
+            audio_bytes = convert_audio_to_wav(audio_bytes)
+        # Decode and extract features once for both emotion and speech analysis. Unlike
+        # transcription this sees the silences too: pauses and the noise floor come from them
+        audio_features = extract_audio_features(audio_bytes)
+        emotions = self.analyze_emotions(features=audio_features)
+        transcription = self.transcribe_audio(audio_bytes) if transcribe else ""
+        features = self.analyze_speech_features(features=audio_features)
         
         return {
             'emotions': emotions,
             'transcription': transcription,
             'features': features
         }
+
+    # ============================================================
+    # STREAMING
+    # ============================================================
+
+    def start_stream(self, sample_rate: int = 16000, channels: int = 1, sample_width: int = 2) -> StreamingAudioFeatures:
+        """Create a running feature extractor for audio that arrives in chunks"""
+        return StreamingAudioFeatures(sample_rate, channels, sample_width)
+
+    def finish_stream(self, stream: StreamingAudioFeatures) -> Dict:
+        """Emotion and speech analysis from a stream's running statistics"""
+        audio_features = stream.result()
+        return {
+            'emotions': self.analyze_emotions(features=audio_features),
+            'features': self.analyze_speech_features(features=audio_features)
+        }
+
+    # ============================================================
+    # HELPERS
+    # ============================================================
+
+    @staticmethod
+    def _clip(value: float) -> float:
+        return min(1.0, max(0.0, value))
+
+    @staticmethod
+    def _dbfs(rms: float) -> float:
+        return 20 * math.log10(max(rms, 1e-5))
+
+    def _speaking_rate(self, features: Dict) -> float:
+        """Words per minute over the speaking time, assuming ~1.5 syllables per word"""
+        duration = features.get('duration', 0.0)
+        if 'speech_ratio' in features:
+            # Voiced time plus pauses between phrases, without leading/trailing silence
+            duration = min(duration, duration * features['speech_ratio'] + features.get('pause_duration', 0.0))
+        minutes = duration / 60
+        return features.get('syllable_count', 0) / 1.5 / minutes if minutes else 0.0
+
+    def _volume_variation(self, features: Dict) -> float:
+        """Coefficient of variation of speech loudness, clipped to 0-1"""
+        mean = features.get('speech_rms_mean', 0.0)
+        return self._clip(features.get('speech_rms_std', 0.0) / mean) if mean else 0.0
+
+
+def analyze_answer_audio(audio_bytes: bytes) -> Dict:
+    """Job entry point: voice analysis of an answer without transcription (picklable for process pools)"""
+    return VoiceEmotionService().get_comprehensive_analysis(audio_bytes, transcribe=False)
@@ -1,12 +1,27 @@
-from .audio_processing import convert_audio_to_wav, extract_audio_features
+from .audio_processing import convert_audio_to_wav, extract_audio_features, decode_wav, speech_segments, StreamingAudioFeatures
 from .video_processing import extract_frames, extract_frame_from_bytes
+from .analysis_summary import summarize_analyses, format_analysis_summary
+from .prompt_builder import PromptBuilder, estimate_tokens, truncate_tokens, token_usage
+from .structured_output import parse_structured, repair_json, StructuredOutputError
 from .validators import validate_email, validate_file_extension, sanitize_input
 
 __all__ = [
     'convert_audio_to_wav',
     'extract_audio_features',
+    'decode_wav',
+    'speech_segments',
+    'StreamingAudioFeatures',
     'extract_frames',
     'extract_frame_from_bytes',
+    'summarize_analyses',
+    'format_analysis_summary',
+    'PromptBuilder',
+    'estimate_tokens',
+    'truncate_tokens',
+    'token_usage',
+    'parse_structured',
+    'repair_json',
+    'StructuredOutputError',
     'validate_email',
     'validate_file_extension',
     'sanitize_input'
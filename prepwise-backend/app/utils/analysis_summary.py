@@ -0,0 +1,126 @@
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+from typing import Dict, List, Optional, Sequence
+from app.utils.prompt_builder import estimate_tokens
+
+# Metrics worth showing the model, most important first (dropped from the end to fit the budget)
+VOICE_METRICS = ('confident', 'nervous', 'calm', 'happy', 'neutral')
+VIDEO_METRICS = ('eye_contact', 'attention', 'face_presence', 'facial_expressions.happy', 'facial_expressions.focused')
+
+# Change over the whole interview (in score points) before a trend is called rising/falling
+TREND_MIN_CHANGE = 10.0
+# An answer is an outlier when it is this many standard deviations (and at least
+# OUTLIER_MIN_POINTS) away from the candidate's own trend line
+OUTLIER_Z = 1.5
+OUTLIER_MIN_POINTS = 10.0
+
+
+def _lookup(analysis: Dict, path: str) -> float:
+    value = analysis
+    for key in path.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return float('nan')
+        value = value[key]
+    return float(value) if isinstance(value, (int, float)) else float('nan')
+
+
+def summarize_analyses(
+    analyses: List[Dict],
+    metrics: Sequence[str],
+    answer_numbers: Optional[Sequence[int]] = None
+) -> Dict:
+    """
+    Reduce per-answer analyses to per-metric mean, range, trend and outlier answers
+    metrics: dotted paths into each analysis (e.g. 'facial_expressions.happy')
+    answer_numbers: 1-based question number of each analysis (defaults to 1..n)
+    """
+    if not analyses:
+        return {'answers': 0, 'metrics': {}}
+
+    numbers = np.asarray(answer_numbers if answer_numbers is not None else range(1, len(analyses) + 1), dtype=float)
+    # answers x metrics, NaN where a metric is missing
+    matrix = np.array([[_lookup(analysis, path) for path in metrics] for analysis in analyses], dtype=float)
+    present = ~np.isnan(matrix)
+    counts = present.sum(axis=0)
+    filled = np.where(present, matrix, 0.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = filled.sum(axis=0) / counts
+        deviations = np.where(present, matrix - means, 0.0)
+        # Least-squares slope per metric over the question numbers that have a value
+        x = np.where(present, numbers[:, None], 0.0)
+        x_mean = x.sum(axis=0) / counts
+        x_dev = np.where(present, numbers[:, None] - x_mean, 0.0)
+        slopes = np.nan_to_num((x_dev * deviations).sum(axis=0) / (x_dev ** 2).sum(axis=0))
+        # Residuals from the trend line, so a steady improvement isn't flagged as outliers
+        residuals = np.where(present, deviations - slopes * x_dev, 0.0)
+        residual_stds = np.sqrt((residuals ** 2).sum(axis=0) / counts)
+        z_scores = np.abs(residuals) / residual_stds
+
+    summary = {}
+    for column, path in enumerate(metrics):
+        if not counts[column]:
+            continue
+        values = np.where(present[:, column], matrix[:, column], np.nan)
+        low, high = int(np.nanargmin(values)), int(np.nanargmax(values))
+        entry = {
+            'mean': round(float(means[column]), 1),
+            'min': round(float(values[low]), 1),
+            'min_q': int(numbers[low]),
+            'max': round(float(values[high]), 1),
+            'max_q': int(numbers[high]),
+            'trend': 'steady',
+            'outliers': []
+        }
+        if counts[column] >= 3:
+            slope = float(slopes[column])
+            span = float(numbers[present[:, column]].max() - numbers[present[:, column]].min())
+            if slope * span >= TREND_MIN_CHANGE:
+                entry['trend'] = 'rising'
+            elif slope * span <= -TREND_MIN_CHANGE:
+                entry['trend'] = 'falling'
+            entry['slope'] = round(slope, 1)
+            outliers = present[:, column] & (z_scores[:, column] >= OUTLIER_Z) & (np.abs(residuals[:, column]) >= OUTLIER_MIN_POINTS)
+            entry['outliers'] = [(int(numbers[i]), round(float(matrix[i, column]), 1)) for i in np.flatnonzero(outliers)]
+        summary[path.split('.')[-1]] = entry
+
+    return {'answers': len(analyses), 'metrics': summary}
+
+
+def _format_metric(name: str, entry: Dict, detailed: bool) -> str:
+    line = f"- {name}: mean {entry['mean']:g}"
+    if 'slope' in entry:
+        line += f", {entry['trend']}"
+        if detailed and entry['trend'] != 'steady':
+            line += f" ({entry['slope']:+g}/question)"
+    if detailed:
+        if entry['max'] > entry['min']:
+            line += f", low {entry['min']:g} (Q{entry['min_q']}), high {entry['max']:g} (Q{entry['max_q']})"
+        if entry['outliers']:
+            line += ", outliers " + ", ".join(f"Q{q}={value:g}" for q, value in entry['outliers'])
+    return line
+
+
+def format_analysis_summary(summary: Dict, max_tokens: int = 200) -> str:
+    """
+    Render a summarize_analyses result as compact prompt text within max_tokens.
+    Detail is dropped first (ranges, outliers), then the lowest-priority metrics.
+    """
+    metrics = list(summary.get('metrics', {}).items())
+    if not metrics:
+        return ""
+
+    header = f"Scores 0-100 over {summary['answers']} answer(s); Q = question number"
+    for detailed in (True, False):
+        lines = [header] + [_format_metric(name, entry, detailed) for name, entry in metrics]
+        text = "\n".join(lines)
+        if estimate_tokens(text) <= max_tokens:
+            return text
+
+    while len(lines) > 2 and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines.pop()
+    return "\n".join(lines)[:max_tokens * 4]
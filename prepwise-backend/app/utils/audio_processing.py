@@ -1,6 +1,7 @@
-import io
-import wave
-from typing import Optional
+import shutil
+import struct
+import subprocess
+from typing import Dict, List, Optional, Tuple
 try:
     import numpy as np
     NUMPY_AVAILABLE = True
@@ -8,27 +9,635 @@ except ImportError:
     NUMPY_AVAILABLE = False
     np = None
 
-def convert_audio_to_wav(audio_bytes: bytes, format: str = "webm") -> bytes:
+# Analysis parameters (speech-oriented defaults)
+FRAME_MS = 32           # analysis window
+HOP_MS = 16             # hop for energy, zero-crossings and pauses
+SPECTRAL_HOP_MS = 32    # coarser hop for centroid/pitch, which are only summarised
+PITCH_SAMPLE_RATE = 4000
+PITCH_MIN_HZ = 60.0
+PITCH_MAX_HZ = 400.0
+MIN_PAUSE_SECONDS = 0.3
+SILENCE_FLOOR = 1e-3    # absolute RMS floor for "silence" on a [-1, 1] scale
+
+# Voice activity detection
+VAD_NOISE_ZCR = 0.45        # quiet frames crossing zero this often are noise, not voice
+VAD_MERGE_GAP_SECONDS = 0.15  # bridge short stops inside words
+VAD_MIN_SPEECH_SECONDS = 0.1  # drop isolated clicks/bumps
+VAD_PADDING_SECONDS = 0.1     # keep soft onsets/offsets around each segment
+
+_PCM_DTYPES = {1: np.uint8, 2: np.dtype('<i2'), 4: np.dtype('<i4')} if NUMPY_AVAILABLE else {}
+
+
+def is_wav(audio_bytes: bytes) -> bool:
+    """Check for a RIFF/WAVE header"""
+    return len(audio_bytes) >= 12 and audio_bytes[:4] == b'RIFF' and audio_bytes[8:12] == b'WAVE'
+
+
+def convert_audio_to_wav(audio_bytes: bytes, format: str = "webm", sample_rate: int = 16000) -> bytes:
+    """
+    Convert audio bytes to 16-bit mono WAV for processing.
+    WAV input is returned as-is; other formats are piped through ffmpeg when it is installed.
+    """
+    if is_wav(audio_bytes):
+        return audio_bytes
+
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        print("Warning: ffmpeg not found, audio returned unconverted")
+        return audio_bytes
+
+    try:
+        result = subprocess.run(
+            [
+                ffmpeg, "-hide_banner", "-loglevel", "error",
+                "-f", format, "-i", "pipe:0",
+                "-ac", "1", "-ar", str(sample_rate), "-acodec", "pcm_s16le",
+                "-f", "wav", "pipe:1"
+            ],
+            input=audio_bytes,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=30,
+            check=True
+        )
+        return result.stdout
+    except Exception as e:
+        print(f"Error converting audio to WAV: {e}")
+        return audio_bytes
+
+
+def parse_wav_header(audio_bytes: bytes) -> Tuple[int, int, int, int, int]:
+    """
+    Locate the PCM data in a WAV payload.
+    Returns (data_offset, data_size, sample_rate, channels, sample_width).
+    """
+    if not is_wav(audio_bytes):
+        raise ValueError("Not a RIFF/WAVE payload")
+
+    view = memoryview(audio_bytes)
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(view):
+        chunk_id = bytes(view[offset:offset + 4])
+        chunk_size = struct.unpack_from('<I', view, offset + 4)[0]
+        body = offset + 8
+        if chunk_id == b'fmt ':
+            audio_format, channels, sample_rate, _, _, bits = struct.unpack_from('<HHIIHH', view, body)
+            fmt = (audio_format, channels, sample_rate, bits)
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise ValueError("WAV data chunk before fmt chunk")
+            audio_format, channels, sample_rate, bits = fmt
+            # 1 = PCM, 0xFFFE = WAVE_FORMAT_EXTENSIBLE (PCM sub-format in practice)
+            if audio_format not in (1, 0xFFFE) or bits // 8 not in _PCM_DTYPES:
+                raise ValueError(f"Unsupported WAV encoding (format={audio_format}, bits={bits})")
+            # Streaming writers leave the size as 0/0xFFFFFFFF; clamp to what is there
+            available = len(view) - body
+            size = chunk_size if 0 < chunk_size <= available else available
+            return body, size, sample_rate, channels, bits // 8
+        # Chunks are word-aligned
+        offset = body + chunk_size + (chunk_size & 1)
+
+    raise ValueError("WAV payload has no data chunk")
+
+
+def decode_pcm(pcm_bytes: bytes, channels: int = 1, sample_width: int = 2,
+               offset: int = 0, size: Optional[int] = None) -> "np.ndarray":
+    """
+    View raw little-endian PCM as a numpy array without copying.
+    Shaped (n,) for mono or (n, channels) otherwise; a trailing partial sample is ignored.
+    """
+    if sample_width not in _PCM_DTYPES:
+        raise ValueError(f"Unsupported sample width: {sample_width}")
+    if size is None:
+        size = len(pcm_bytes) - offset
+    count = size // (sample_width * channels) * channels
+    samples = np.frombuffer(pcm_bytes, dtype=_PCM_DTYPES[sample_width], count=count, offset=offset)
+    if channels > 1:
+        samples = samples.reshape(-1, channels)
+    return samples
+
+
+def decode_wav(audio_bytes: bytes) -> Tuple["np.ndarray", int, int]:
+    """
+    Decode PCM WAV bytes without copying.
+    Returns (samples, sample_rate, channels); samples is a read-only view over
+    audio_bytes shaped (n,) for mono or (n, channels) otherwise.
+    """
+    offset, size, sample_rate, channels, width = parse_wav_header(audio_bytes)
+    return decode_pcm(audio_bytes, channels, width, offset, size), sample_rate, channels
+
+
+def pcm_to_float(samples: "np.ndarray") -> "np.ndarray":
+    """Mix down to mono float32 in [-1, 1] (the only copy in the pipeline)"""
+    if samples.dtype == np.uint8:
+        offset, scale = 128.0, 128.0
+    else:
+        offset, scale = 0.0, float(np.iinfo(samples.dtype).max) + 1.0
+
+    if samples.ndim > 1:
+        mono = samples.mean(axis=1, dtype=np.float32)
+    else:
+        mono = samples.astype(np.float32)
+    if offset:
+        mono -= np.float32(offset)
+    mono /= np.float32(scale)
+    return mono
+
+
+def frame_signal(signal: "np.ndarray", frame_length: int, hop_length: int) -> "np.ndarray":
+    """
+    Split a 1-D signal into overlapping frames as a strided view (no copy).
+    Trailing samples that do not fill a whole frame are dropped.
     """
-    Convert audio bytes to WAV format for processing
-    Note: This is a simplified version. In production, use libraries like ffmpeg-python
+    if len(signal) < frame_length:
+        return np.empty((0, frame_length), dtype=signal.dtype)
+    n_frames = 1 + (len(signal) - frame_length) // hop_length
+    stride = signal.strides[0]
+    return np.lib.stride_tricks.as_strided(
+        signal,
+        shape=(n_frames, frame_length),
+        strides=(hop_length * stride, stride),
+        writeable=False
+    )
+
+
+def frame_rms(frames: "np.ndarray") -> "np.ndarray":
+    """Root-mean-square energy per frame"""
+    return np.sqrt(np.einsum('ij,ij->i', frames, frames) / frames.shape[1])
+
+
+def frame_zero_crossing_rate(frames: "np.ndarray") -> "np.ndarray":
+    """Fraction of sign changes per frame"""
+    signs = np.signbit(frames)
+    return np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frames.shape[1] - 1)
+
+
+def frame_spectral_centroid(frames: "np.ndarray", sample_rate: int) -> "np.ndarray":
+    """Spectral centroid (Hz) per frame from one batched rFFT"""
+    window = np.hanning(frames.shape[1]).astype(np.float32)
+    magnitude = np.abs(np.fft.rfft(frames * window, axis=1))
+    freqs = np.fft.rfftfreq(frames.shape[1], d=1.0 / sample_rate)
+    total = magnitude.sum(axis=1)
+    centroid = magnitude @ freqs
+    return np.divide(centroid, total, out=np.zeros_like(centroid), where=total > 0)
+
+
+def frame_pitch(frames: "np.ndarray", sample_rate: int,
+                min_hz: float = PITCH_MIN_HZ, max_hz: float = PITCH_MAX_HZ) -> "np.ndarray":
+    """
+    Autocorrelation pitch (Hz) per frame; 0 where no clear periodicity.
+    Autocorrelation is computed for all frames at once as irfft(|rfft|^2).
+    """
+    n_frames, frame_length = frames.shape
+    pitch = np.zeros(n_frames, dtype=np.float32)
+    min_lag = max(1, int(sample_rate / max_hz))
+    max_lag = min(frame_length - 1, int(sample_rate / min_hz))
+    if n_frames == 0 or max_lag <= min_lag:
+        return pitch
+
+    centered = frames - frames.mean(axis=1, keepdims=True)
+    # Zero-pad so the circular autocorrelation matches the linear one up to max_lag
+    n_fft = 1 << int(np.ceil(np.log2(frame_length + max_lag)))
+    spectrum = np.fft.rfft(centered, n=n_fft, axis=1)
+    autocorr = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=n_fft, axis=1)
+
+    energy = autocorr[:, 0]
+    search = autocorr[:, min_lag:max_lag + 1]
+    best = np.argmax(search, axis=1)
+    rows = np.arange(n_frames)
+    peak = search[rows, best]
+    # Normalised peak height as a voicing confidence
+    strength = np.divide(peak, energy, out=np.zeros_like(peak), where=energy > 0)
+    voiced = strength > 0.3
+
+    # Parabolic interpolation around the peak for sub-sample lag resolution
+    left = search[rows, np.maximum(best - 1, 0)]
+    right = search[rows, np.minimum(best + 1, search.shape[1] - 1)]
+    curvature = left - 2 * peak + right
+    shift = np.divide(left - right, 2 * curvature, out=np.zeros_like(peak), where=curvature < 0)
+    lag = best + min_lag + np.clip(shift, -0.5, 0.5)
+
+    pitch[voiced] = sample_rate / lag[voiced]
+    return pitch
+
+
+def analysis_lengths(sample_rate: int) -> Tuple[int, int, int]:
     """
-    # This is a placeholder. In production, use proper audio conversion
-    # For now, return as-is and handle conversion in the emotion service
-    return audio_bytes
+    Frame length, hop length and pitch decimation factor for a sample rate.
+    Frame and hop are rounded down to multiples of the factor so frames of the
+    decimated signal line up exactly with frames of the original.
+    """
+    decimation = max(1, sample_rate // PITCH_SAMPLE_RATE)
+    frame_length = int(sample_rate * FRAME_MS / 1000) // decimation * decimation
+    hop_length = int(sample_rate * HOP_MS / 1000) // decimation * decimation
+    return frame_length, hop_length, decimation
+
+
+def decimate(signal: "np.ndarray", factor: int) -> "np.ndarray":
+    """Box-filter and downsample by an integer factor"""
+    if factor <= 1:
+        return signal
+    usable = len(signal) // factor * factor
+    out = signal[0:usable:factor].copy()
+    for k in range(1, factor):
+        out += signal[k:usable:factor]
+    out /= np.float32(factor)
+    return out
+
+
+def silence_threshold(rms: "np.ndarray") -> float:
+    """Adaptive RMS threshold between the noise floor and typical speech level"""
+    noise_floor, speech_level = np.percentile(rms, [10, 90])
+    return max(SILENCE_FLOOR, noise_floor + 0.1 * (speech_level - noise_floor))
+
+
+def _runs(mask: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """Start/end indices (end exclusive) of the True runs in a boolean array"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def speech_frame_mask(rms: "np.ndarray", zcr: "np.ndarray", threshold: float) -> "np.ndarray":
+    """Frames loud enough to be speech and not noise-like (quiet with a high zero-crossing rate)"""
+    return (rms >= threshold) & ~((zcr > VAD_NOISE_ZCR) & (rms < 2 * threshold))
+
+
+def vad_frame_mask(rms: "np.ndarray", zcr: "np.ndarray", hop_seconds: float,
+                   threshold: Optional[float] = None) -> "np.ndarray":
+    """
+    Energy/spectral voice activity per frame: speech_frame_mask with short stops
+    bridged and isolated blips removed (no edge padding)
+    """
+    if threshold is None:
+        threshold = silence_threshold(rms)
+    speech = speech_frame_mask(rms, zcr, threshold)
+
+    # Bridge short gaps between speech runs
+    starts, ends = _runs(~speech)
+    interior = (starts > 0) & (ends < len(speech))
+    short = interior & ((ends - starts) * hop_seconds < VAD_MERGE_GAP_SECONDS)
+    for start, end in zip(starts[short], ends[short]):
+        speech[start:end] = True
+
+    # Drop speech runs too short to be voice
+    starts, ends = _runs(speech)
+    for start, end in zip(starts, ends):
+        if (end - start) * hop_seconds < VAD_MIN_SPEECH_SECONDS:
+            speech[start:end] = False
+    return speech
+
+
+def detect_speech_segments(signal: "np.ndarray", sample_rate: int) -> List[Tuple[int, int]]:
+    """
+    Voice activity detection over a mono float signal.
+    Returns padded (start, end) sample ranges of speech.
+    """
+    frame_length, hop_length, _ = analysis_lengths(sample_rate)
+    frames = frame_signal(signal, frame_length, hop_length)
+    if len(frames) == 0:
+        return []
+    speech = vad_frame_mask(frame_rms(frames), frame_zero_crossing_rate(frames), hop_length / sample_rate)
+    return frames_to_segments(speech, hop_length, frame_length, sample_rate, len(signal))
+
+
+def frames_to_segments(speech: "np.ndarray", hop_length: int, frame_length: int,
+                       sample_rate: int, n_samples: int) -> List[Tuple[int, int]]:
+    """Convert a frame-level speech mask to padded, non-overlapping sample ranges"""
+    padding = int(VAD_PADDING_SECONDS * sample_rate)
+    segments: List[Tuple[int, int]] = []
+    starts, ends = _runs(speech)
+    for start, end in zip(starts, ends):
+        begin = max(0, start * hop_length - padding)
+        finish = min(n_samples, (end - 1) * hop_length + frame_length + padding)
+        if segments and begin <= segments[-1][1]:
+            segments[-1] = (segments[-1][0], finish)
+        else:
+            segments.append((int(begin), int(finish)))
+    return segments
+
+
+def speech_segments(samples: "np.ndarray", sample_rate: int) -> List["np.ndarray"]:
+    """
+    Speech segments as views over samples (e.g. the decode_wav view of the original bytes).
+    Detection runs on a float copy; the returned segments copy nothing.
+    """
+    signal = samples if samples.dtype == np.float32 and samples.ndim == 1 else pcm_to_float(samples)
+    return [samples[start:end] for start, end in detect_speech_segments(signal, sample_rate)]
+
+
+def detect_pauses(speech: "np.ndarray", hop_seconds: float,
+                  min_pause: float = MIN_PAUSE_SECONDS) -> Dict[str, float]:
+    """Find gaps of at least min_pause seconds between speech frames"""
+    starts, ends = _runs(~speech)
+    lengths = (ends - starts) * hop_seconds
+
+    # Leading/trailing silence is not a pause in speech
+    interior = (starts > 0) & (ends < len(speech))
+    pauses = lengths[interior & (lengths >= min_pause)]
+
+    return {
+        'pause_count': int(len(pauses)),
+        'pause_duration': float(pauses.sum()) if len(pauses) else 0.0,
+        'longest_pause': float(pauses.max()) if len(pauses) else 0.0
+    }
+
+
+def count_syllables(rms: "np.ndarray", speech_level: float, active: bool = False) -> Tuple[int, bool]:
+    """
+    Count syllable-like energy bursts with hysteresis: a burst starts when RMS rises
+    above half the speech level and re-arms once it falls below a quarter of it.
+    Returns (count, active) so the state can be carried across chunks.
+    """
+    if len(rms) == 0:
+        return 0, active
+    high, low = 0.5 * speech_level, 0.25 * speech_level
+    decided = (rms > high) | (rms < low)
+    # Forward-fill the last decided state over frames inside the hysteresis band
+    last = np.where(decided, np.arange(len(rms)), -1)
+    np.maximum.accumulate(last, out=last)
+    level = np.where(last >= 0, rms[np.maximum(last, 0)] > high, active)
+    previous = np.concatenate(([active], level[:-1]))
+    return int(np.count_nonzero(level & ~previous)), bool(level[-1])
+
+
+def compute_signal_features(signal: "np.ndarray", sample_rate: int) -> dict:
+    """
+    Vectorised feature summary for a mono float32 signal.
+    Takes the whole answer, silences included: pauses, speech_ratio and the noise floor
+    (clarity SNR) are measured on the gaps. The per-frame spectral and pitch work, the
+    expensive part, only runs on speech frames.
+    """
+    frame_length, hop_length, decimation = analysis_lengths(sample_rate)
+    hop_seconds = hop_length / sample_rate
+
+    frames = frame_signal(signal, frame_length, hop_length)
+    if len(frames) == 0:
+        return {
+            'duration': len(signal) / sample_rate if sample_rate else 0.0,
+            'frame_count': 0
+        }
+
+    rms = frame_rms(frames)
+    zcr = frame_zero_crossing_rate(frames)
+    noise_floor, speech_level = np.percentile(rms, [10, 90])
+    threshold = silence_threshold(rms)
+    speech = speech_frame_mask(rms, zcr, threshold)
+    # Smoothed VAD decides pauses and the speech ratio; raw speech frames feed the statistics
+    vad = vad_frame_mask(rms, zcr, hop_seconds, threshold)
+    pauses = detect_pauses(vad, hop_seconds)
+    speech_rms = rms[speech]
+    syllables, _ = count_syllables(rms, speech_level)
+
+    # Centroid and pitch only on speech frames, at the coarser spectral hop
+    step = max(1, SPECTRAL_HOP_MS // HOP_MS)
+    spectral_count = len(frames[::step])
+    speech_idx = np.flatnonzero(speech[::step]) * step
+    centroid = frame_spectral_centroid(frames[speech_idx], sample_rate)
+
+    # Pitch on a decimated copy: speech F0 is far below 2 kHz and the FFTs get much cheaper
+    pitch_frames = frame_signal(
+        decimate(signal, decimation),
+        frame_length // decimation,
+        hop_length // decimation
+    )
+    pitch = frame_pitch(pitch_frames[speech_idx[speech_idx < len(pitch_frames)]], sample_rate / decimation)
+    voiced_pitch = pitch[pitch > 0]
+
+    return {
+        'duration': len(signal) / sample_rate,
+        'frame_count': int(len(frames)),
+        'rms_mean': float(rms.mean()),
+        'rms_std': float(rms.std()),
+        'speech_rms_mean': float(speech_rms.mean()) if len(speech_rms) else 0.0,
+        'speech_rms_std': float(speech_rms.std()) if len(speech_rms) else 0.0,
+        'noise_floor': float(noise_floor),
+        'speech_level': float(speech_level),
+        'zcr_mean': float(zcr.mean()),
+        'spectral_centroid_mean': float(centroid.mean()) if len(centroid) else 0.0,
+        'pitch_mean': float(voiced_pitch.mean()) if len(voiced_pitch) else 0.0,
+        'pitch_std': float(voiced_pitch.std()) if len(voiced_pitch) else 0.0,
+        'voiced_ratio': float(len(voiced_pitch) / spectral_count),
+        'syllable_count': syllables,
+        'speech_ratio': float(np.count_nonzero(vad) / len(frames)),
+        'speech_segments': int(len(_runs(vad)[0])),
+        **pauses
+    }
+
 
 def extract_audio_features(audio_bytes: bytes) -> dict:
     """
     Extract basic audio features for emotion analysis
     """
     try:
-        # This is simplified - in production use librosa or similar
-        # For now, return placeholder features
-        return {
-            "duration": 0.0,
-            "sample_rate": 16000,
-            "channels": 1
-        }
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy is not installed")
+
+        wav_bytes = convert_audio_to_wav(audio_bytes)
+        samples, sample_rate, channels = decode_wav(wav_bytes)
+        signal = pcm_to_float(samples)
+
+        features = compute_signal_features(signal, sample_rate)
+        features['sample_rate'] = sample_rate
+        features['channels'] = channels
+        return features
     except Exception as e:
         print(f"Error extracting audio features: {e}")
         return {}
+
+
+class StreamingAudioFeatures:
+    """
+    Incremental version of compute_signal_features for audio that arrives in chunks.
+    Only running sums, a fixed-size energy histogram and one frame of carry-over
+    are kept, so memory stays constant however long the answer is.
+    """
+
+    # log10(RMS) histogram from 1e-5 to 1, 16 bins per decade
+    HIST_MIN = -5.0
+    HIST_BINS_PER_DECADE = 16
+    HIST_BINS = 5 * 16
+
+    def __init__(self, sample_rate: int = 16000, channels: int = 1, sample_width: int = 2):
+        self._configure(sample_rate, channels, sample_width)
+        self.spectral_step = max(1, SPECTRAL_HOP_MS // HOP_MS)
+
+        self._header_checked = False
+        self._pending = b''                 # bytes of an incomplete sample
+        self._carry = np.zeros(0, dtype=np.float32)  # samples not yet covered by a full hop
+        self._hist = np.zeros(self.HIST_BINS, dtype=np.int64)
+
+        self.samples = 0
+        self.frame_count = 0
+        self._sums = dict.fromkeys([
+            'rms', 'rms_sq', 'zcr', 'speech_rms', 'speech_rms_sq', 'centroid', 'pitch', 'pitch_sq'
+        ], 0.0)
+        self._speech_frames = 0
+        self._spectral_frames = 0
+        self._centroid_frames = 0
+        self._voiced_frames = 0
+
+        self._syllables = 0
+        self._syllable_active = False
+        self._silent_run = 0
+        self._seen_speech = False
+        self._bridged_frames = 0
+        self._pause_count = 0
+        self._pause_duration = 0.0
+        self._longest_pause = 0.0
+
+    def _configure(self, sample_rate: int, channels: int, sample_width: int) -> None:
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.frame_length, self.hop_length, self.decimation = analysis_lengths(sample_rate)
+
+    def feed(self, chunk: bytes) -> None:
+        """Add a chunk of PCM (or the start of a WAV file) and update running statistics"""
+        if not self._header_checked:
+            self._header_checked = True
+            if is_wav(chunk):
+                # The first chunk must hold the whole header; the format overrides the defaults
+                offset, _, sample_rate, channels, sample_width = parse_wav_header(chunk)
+                self._configure(sample_rate, channels, sample_width)
+                chunk = chunk[offset:]
+
+        data = self._pending + chunk if self._pending else chunk
+        block = self.sample_width * self.channels
+        usable = len(data) // block * block
+        self._pending = data[usable:]
+        if not usable:
+            return
+
+        signal = pcm_to_float(decode_pcm(data, self.channels, self.sample_width, size=usable))
+        self.samples += len(signal)
+        self._process(np.concatenate((self._carry, signal)) if len(self._carry) else signal)
+
+    def _process(self, signal: "np.ndarray") -> None:
+        frames = frame_signal(signal, self.frame_length, self.hop_length)
+        consumed = len(frames) * self.hop_length
+        # Keep what the next frame still needs (overlap plus any partial hop)
+        self._carry = signal[consumed:].copy()
+        if len(frames) == 0:
+            return
+
+        rms = frame_rms(frames)
+        zcr = frame_zero_crossing_rate(frames)
+
+        self._hist += np.bincount(self._hist_bins(rms), minlength=self.HIST_BINS)
+        noise_floor, speech_level = self._percentiles()
+        threshold = max(SILENCE_FLOOR, noise_floor + 0.1 * (speech_level - noise_floor))
+
+        speech = speech_frame_mask(rms, zcr, threshold)
+        speech_rms = rms[speech]
+        self._sums['rms'] += float(rms.sum())
+        self._sums['rms_sq'] += float(np.dot(rms, rms))
+        self._sums['zcr'] += float(zcr.sum())
+        self._sums['speech_rms'] += float(speech_rms.sum())
+        self._sums['speech_rms_sq'] += float(np.dot(speech_rms, speech_rms))
+        self._speech_frames += len(speech_rms)
+
+        syllables, self._syllable_active = count_syllables(rms, speech_level, self._syllable_active)
+        self._syllables += syllables
+        self._track_pauses(speech)
+
+        # Spectral hop is counted in absolute frame positions so chunking does not shift it
+        offset = (-self.frame_count) % self.spectral_step
+        spectral_idx = np.arange(offset, len(frames), self.spectral_step)
+        speech_idx = spectral_idx[speech[spectral_idx]]
+        self._spectral_frames += len(spectral_idx)
+        if len(speech_idx):
+            centroid = frame_spectral_centroid(frames[speech_idx], self.sample_rate)
+            self._sums['centroid'] += float(centroid.sum())
+            self._centroid_frames += len(centroid)
+
+            # Decimating each frame equals framing the decimated signal (see analysis_lengths)
+            selected = frames[speech_idx]
+            if self.decimation > 1:
+                selected = selected.reshape(len(selected), -1, self.decimation).mean(axis=2)
+            pitch = frame_pitch(selected, self.sample_rate / self.decimation)
+            voiced = pitch[pitch > 0]
+            self._sums['pitch'] += float(voiced.sum())
+            self._sums['pitch_sq'] += float(np.dot(voiced, voiced))
+            self._voiced_frames += len(voiced)
+
+        self.frame_count += len(frames)
+
+    def _track_pauses(self, speech: "np.ndarray") -> None:
+        """Carry silent-run lengths across chunks; leading/trailing silence is not a pause"""
+        hop_seconds = self.hop_length / self.sample_rate
+        edges = np.flatnonzero(np.diff(speech.astype(np.int8))) + 1
+        bounds = np.concatenate(([0], edges, [len(speech)]))
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if not speech[start]:
+                self._silent_run += end - start
+                continue
+            if self._seen_speech and self._silent_run:
+                pause = self._silent_run * hop_seconds
+                if pause < VAD_MERGE_GAP_SECONDS:
+                    # Same gap bridging as vad_frame_mask
+                    self._bridged_frames += self._silent_run
+                elif pause >= MIN_PAUSE_SECONDS:
+                    self._pause_count += 1
+                    self._pause_duration += pause
+                    self._longest_pause = max(self._longest_pause, pause)
+            self._silent_run = 0
+            self._seen_speech = True
+
+    def _hist_bins(self, rms: "np.ndarray") -> "np.ndarray":
+        log_rms = np.log10(np.maximum(rms, 10 ** self.HIST_MIN))
+        bins = ((log_rms - self.HIST_MIN) * self.HIST_BINS_PER_DECADE).astype(np.int64)
+        return np.clip(bins, 0, self.HIST_BINS - 1)
+
+    def _percentiles(self) -> Tuple[float, float]:
+        """Approximate 10th/90th RMS percentiles from the histogram"""
+        cumulative = np.cumsum(self._hist)
+        total = cumulative[-1]
+        low_bin, high_bin = np.searchsorted(cumulative, [0.1 * total, 0.9 * total])
+        centers = 10 ** (self.HIST_MIN + (np.array([low_bin, high_bin]) + 0.5) / self.HIST_BINS_PER_DECADE)
+        return float(centers[0]), float(centers[1])
+
+    def result(self) -> dict:
+        """Feature summary in the same shape as extract_audio_features"""
+        duration = self.samples / self.sample_rate if self.sample_rate else 0.0
+        if self.frame_count == 0:
+            return {
+                'duration': duration,
+                'frame_count': 0,
+                'sample_rate': self.sample_rate,
+                'channels': self.channels
+            }
+
+        def mean_std(total: float, total_sq: float, count: int) -> Tuple[float, float]:
+            if not count:
+                return 0.0, 0.0
+            mean = total / count
+            return mean, max(0.0, total_sq / count - mean * mean) ** 0.5
+
+        rms_mean, rms_std = mean_std(self._sums['rms'], self._sums['rms_sq'], self.frame_count)
+        speech_mean, speech_std = mean_std(self._sums['speech_rms'], self._sums['speech_rms_sq'], self._speech_frames)
+        pitch_mean, pitch_std = mean_std(self._sums['pitch'], self._sums['pitch_sq'], self._voiced_frames)
+        noise_floor, speech_level = self._percentiles()
+
+        return {
+            'duration': duration,
+            'frame_count': self.frame_count,
+            'rms_mean': rms_mean,
+            'rms_std': rms_std,
+            'speech_rms_mean': speech_mean,
+            'speech_rms_std': speech_std,
+            'noise_floor': noise_floor,
+            'speech_level': speech_level,
+            'zcr_mean': self._sums['zcr'] / self.frame_count,
+            'spectral_centroid_mean': self._sums['centroid'] / self._centroid_frames if self._centroid_frames else 0.0,
+            'pitch_mean': pitch_mean,
+            'pitch_std': pitch_std,
+            'voiced_ratio': self._voiced_frames / self._spectral_frames if self._spectral_frames else 0.0,
+            'syllable_count': self._syllables,
+            'speech_ratio': (self._speech_frames + self._bridged_frames) / self.frame_count,
+            'pause_count': self._pause_count,
+            'pause_duration': self._pause_duration,
+            'longest_pause': self._longest_pause,
+            'sample_rate': self.sample_rate,
+            'channels': self.channels
+        }
@@ -0,0 +1,181 @@
+import threading
+from typing import Dict, List, Optional, Sequence
+from app.config import settings
+
+TRUNCATION_MARK = "[…]"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English prose and numbers)"""
+    return (len(text) + 3) // 4
+
+
+def truncate_tokens(text: str, max_tokens: int, keep: str = "head") -> str:
+    """
+    Cut text to about max_tokens (estimate_tokens), preferring sentence or word boundaries
+    keep: "head" keeps the start, "tail" the end, "middle" both ends
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max_tokens * 4 - len(TRUNCATION_MARK) - 1
+    if limit <= 0:
+        return ""
+
+    if keep == "middle":
+        half = limit // 2
+        return f"{_head(text, half)} {TRUNCATION_MARK} {_tail(text, limit - half)}"
+    if keep == "tail":
+        return f"{TRUNCATION_MARK} {_tail(text, limit)}"
+    return f"{_head(text, limit)} {TRUNCATION_MARK}"
+
+
+def _head(text: str, limit: int) -> str:
+    cut = text[:limit]
+    boundary = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "), cut.rfind("\n"))
+    if boundary < limit * 0.7:
+        boundary = cut.rfind(" ")
+    return cut[:boundary + 1].rstrip() if boundary >= limit * 0.5 else cut
+
+
+def _tail(text: str, limit: int) -> str:
+    cut = text[-limit:]
+    space = cut.find(" ")
+    return cut[space + 1:] if 0 <= space < 40 else cut
+
+
+def fit_items(
+    items: Sequence[str],
+    max_tokens: int,
+    per_item_tokens: Optional[int] = None,
+    keep: str = "recent"
+) -> List[str]:
+    """
+    Truncate each item to per_item_tokens, then keep as many whole items as fit in
+    max_tokens: the most recent ones ("recent") or the first ones ("first").
+    A note replaces the items that were dropped.
+    """
+    items = [truncate_tokens(item, per_item_tokens) if per_item_tokens else item for item in items]
+    ordered = list(reversed(items)) if keep == "recent" else list(items)
+
+    kept, used = [], 0
+    for item in ordered:
+        cost = estimate_tokens(item) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(item)
+        used += cost
+
+    dropped = len(items) - len(kept)
+    if keep == "recent":
+        kept.reverse()
+        if dropped:
+            kept.insert(0, f"[{dropped} earlier item(s) omitted]")
+    elif dropped:
+        kept.append(f"[{dropped} more item(s) omitted]")
+    return kept
+
+
+class PromptBuilder:
+    """
+    Assembles a prompt from named sections, each with its own token budget, and keeps the
+    whole prompt under max_tokens (PROMPT_MAX_TOKENS) by shrinking the optional sections
+    added last first. Required sections (the instructions) are never cut.
+    """
+
+    def __init__(self, call_site: str, max_tokens: Optional[int] = None):
+        self.call_site = call_site
+        self.max_tokens = max_tokens or settings.PROMPT_MAX_TOKENS
+        self.sections: List[Dict] = []
+        self.section_tokens: Dict[str, int] = {}
+        self.truncated: List[str] = []
+
+    def add(
+        self,
+        name: str,
+        text: Optional[str],
+        max_tokens: Optional[int] = None,
+        keep: str = "head",
+        required: bool = False
+    ) -> "PromptBuilder":
+        if not text or not text.strip():
+            return self
+        if max_tokens is not None and not required:
+            shortened = truncate_tokens(text, max_tokens, keep)
+            if shortened != text:
+                self.truncated.append(name)
+            text = shortened
+        self.sections.append({"name": name, "text": text.strip(), "keep": keep, "required": required})
+        return self
+
+    def add_items(
+        self,
+        name: str,
+        items: Sequence[str],
+        max_tokens: int,
+        per_item_tokens: Optional[int] = None,
+        keep: str = "recent",
+        header: str = ""
+    ) -> "PromptBuilder":
+        """A list section (history, answers) fitted item by item rather than cut mid-item"""
+        kept = fit_items(items, max_tokens, per_item_tokens, keep)
+        if not kept:
+            return self
+        if kept != list(items):
+            self.truncated.append(name)
+        text = "\n".join(kept)
+        return self.add(name, f"{header}\n{text}" if header else text, keep="tail" if keep == "recent" else "head")
+
+    def build(self) -> str:
+        overflow = sum(estimate_tokens(section["text"]) + 1 for section in self.sections) - self.max_tokens
+        for section in reversed(self.sections):
+            if overflow <= 0:
+                break
+            if section["required"]:
+                continue
+            tokens = estimate_tokens(section["text"])
+            section["text"] = truncate_tokens(section["text"], max(0, tokens - overflow), section["keep"])
+            overflow -= tokens - estimate_tokens(section["text"])
+            self.truncated.append(section["name"])
+
+        self.section_tokens = {
+            section["name"]: estimate_tokens(section["text"]) for section in self.sections if section["text"]
+        }
+        if self.truncated:
+            print(f"[PromptBuilder] {self.call_site}: trimmed {', '.join(dict.fromkeys(self.truncated))} "
+                  f"to fit ({sum(self.section_tokens.values())} tokens: {self.section_tokens})")
+        return "\n\n".join(section["text"] for section in self.sections if section["text"])
+
+
+# ============================================================
+# TOKEN ACCOUNTING
+# ============================================================
+
+_usage: Dict[str, Dict] = {}
+_usage_lock = threading.Lock()
+
+
+def record_usage(call_site: str, prompt_tokens: int, completion_tokens: int, estimated: bool) -> None:
+    """Add one LLM call to the per-call-site totals (calls come from worker threads too)"""
+    with _usage_lock:
+        entry = _usage.setdefault(call_site, {
+            'calls': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'max_prompt_tokens': 0,
+            'estimated_calls': 0
+        })
+        entry['calls'] += 1
+        entry['prompt_tokens'] += prompt_tokens
+        entry['completion_tokens'] += completion_tokens
+        entry['max_prompt_tokens'] = max(entry['max_prompt_tokens'], prompt_tokens)
+        entry['estimated_calls'] += int(estimated)
+
+
+def token_usage() -> Dict[str, Dict]:
+    """Per-call-site totals with average prompt/completion sizes"""
+    with _usage_lock:
+        usage = {site: dict(entry) for site, entry in _usage.items()}
+    for entry in usage.values():
+        entry['avg_prompt_tokens'] = round(entry['prompt_tokens'] / entry['calls'])
+        entry['avg_completion_tokens'] = round(entry['completion_tokens'] / entry['calls'])
+    return usage
@@ -0,0 +1,165 @@
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+import json
+import re
+from typing import Any, Dict, Optional, Type, TypeVar
+from pydantic import BaseModel
+
+Model = TypeVar('Model', bound=BaseModel)
+
+
+class StructuredOutputError(ValueError):
+    """LLM output that is not valid JSON for the expected model, even after repair"""
+
+
+def loads(text: str) -> Any:
+    """Parse JSON with orjson when installed (several times faster), else the stdlib"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _skeleton(schema: Dict, definitions: Dict) -> str:
+    """Compact shape of a JSON schema, e.g. {"score": <integer 0-100>, "tags": [<string>, ...]}"""
+    if 'anyOf' in schema:
+        # Optional[X]: describe X
+        schema = next((option for option in schema['anyOf'] if option.get('type') != 'null'), {})
+    if '$ref' in schema:
+        schema = definitions[schema['$ref'].split('/')[-1]]
+    kind = schema.get('type')
+    if kind == 'object':
+        fields = ', '.join(
+            f'"{name}": {_skeleton(field, definitions)}' for name, field in schema.get('properties', {}).items()
+        )
+        return '{' + fields + '}'
+    if kind == 'array':
+        return f"[{_skeleton(schema.get('items', {}), definitions)}, ...]"
+    if 'minimum' in schema and 'maximum' in schema:
+        return f"<{kind} {schema['minimum']:g}-{schema['maximum']:g}>"
+    return f"<{kind or 'value'}>"
+
+
+def json_instructions(model: Type[BaseModel]) -> str:
+    """Prompt suffix asking for a JSON object shaped like the model"""
+    schema = model.model_json_schema()
+    return (
+        "\n\nRespond with ONLY a JSON object (no markdown, no commentary) with this structure:\n"
+        + _skeleton(schema, schema.get('$defs', {}))
+    )
+
+
+def response_format(model: Type[BaseModel], mode: str) -> Optional[Dict]:
+    """OpenAI-style response_format for JSON mode ("json_object" / "json_schema"), None to disable"""
+    if mode == "json_object":
+        return {"type": "json_object"}
+    if mode == "json_schema":
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": model.__name__, "schema": model.model_json_schema()}
+        }
+    return None
+
+
+def extract_json(text: str) -> str:
+    """
+    The first balanced {...} object in the text (skipping prose and code fences).
+    Braces inside strings are ignored; an unterminated object is returned as-is for repair.
+    """
+    start = text.find('{')
+    if start < 0:
+        return text.strip()
+
+    depth = 0
+    in_string = escaped = False
+    for position in range(start, len(text)):
+        char = text[position]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:position + 1]
+    return text[start:]
+
+
+_STRING = re.compile(r'("(?:[^"\\\n]|\\.)*")')
+
+
+def _outside_strings(text: str, fix) -> str:
+    """Apply fix() to the parts of the text that are not double-quoted JSON strings"""
+    parts = _STRING.split(text)
+    return ''.join(fix(part) if index % 2 == 0 else part for index, part in enumerate(parts))
+
+
+def _fix_tokens(part: str) -> str:
+    part = re.sub(r'\bTrue\b', 'true', part)
+    part = re.sub(r'\bFalse\b', 'false', part)
+    part = re.sub(r'\bNone\b', 'null', part)
+    part = re.sub(r'^\s*//.*$', '', part, flags=re.MULTILINE)
+    part = re.sub(r"'((?:[^'\\\n]|\\.)*)'", lambda m: '"' + m.group(1).replace("\\'", "'").replace('"', '\\"') + '"', part)
+    part = re.sub(r'([{,]\s*)([A-Za-z_][A-Za-z0-9_]*)\s*:', r'\1"\2":', part)
+    return re.sub(r',(\s*[}\]])', r'\1', part)
+
+
+def repair_json(text: str) -> str:
+    """
+    One pass over common LLM JSON mistakes outside string values: smart or single quotes,
+    comments, Python literals, unquoted keys, trailing commas and output truncated mid-object
+    """
+    text = _outside_strings(text, lambda part: re.sub('[“”]', '"', part))
+    text = _outside_strings(text, _fix_tokens)
+
+    # Close whatever a truncated response left open
+    closers = []
+    in_string = escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            closers.append('}' if char == '{' else ']')
+        elif char in '}]' and closers:
+            closers.pop()
+    if in_string:
+        text += '"'
+    text = re.sub(r'[,:]\s*$', '', text.rstrip())
+    return text + ''.join(reversed(closers))
+
+
+def parse_structured(text: str, model: Type[Model]) -> Model:
+    """
+    Validate LLM output against the model: parse the JSON object as-is, then once more
+    after repair_json. Raises StructuredOutputError describing the last failure.
+    """
+    candidate = extract_json(text or "")
+    try:
+        return model.model_validate(loads(candidate))
+    except ValueError as e:
+        error = e
+
+    repaired = repair_json(candidate)
+    if repaired != candidate:
+        try:
+            return model.model_validate(loads(repaired))
+        except ValueError as e:
+            error = e
+    raise StructuredOutputError(f"{model.__name__}: {error}")
@@ -10,38 +10,126 @@ try:
 except ImportError:
     NUMPY_AVAILABLE = False
     np = None
-from typing import List, Optional
-import io
+from contextlib import contextmanager
+from itertools import islice
+from typing import Iterator, Optional
+import os
+import tempfile
+from app.config import settings
 
-def extract_frames(video_bytes: bytes, frame_rate: int = 1) -> List[np.ndarray]:
+
+@contextmanager
+def _video_path(video_bytes: bytes) -> Iterator[str]:
+    """
+    Expose the bytes as a path cv2.VideoCapture can open.
+    Uses an anonymous in-memory file on Linux (nothing touches disk), a temp file elsewhere.
+    """
+    if hasattr(os, 'memfd_create'):
+        fd = os.memfd_create("prepwise-video")
+        try:
+            os.write(fd, video_bytes)
+            yield f"/proc/self/fd/{fd}"
+        finally:
+            os.close(fd)
+        return
+
+    handle = tempfile.NamedTemporaryFile(suffix=".video", delete=False)
+    try:
+        with handle:
+            handle.write(video_bytes)
+        yield handle.name
+    finally:
+        os.unlink(handle.name)
+
+
+def _downscale(frame: np.ndarray, max_width: Optional[int]) -> np.ndarray:
+    """Resize to the analysis width right after decoding so full-size frames are dropped"""
+    if not max_width or frame.shape[1] <= max_width:
+        return frame
+    height = max(1, round(frame.shape[0] * max_width / frame.shape[1]))
+    return cv2.resize(frame, (max_width, height), interpolation=cv2.INTER_AREA)
+
+
+def _sample_by_seek(capture, interval: float, duration: float) -> Iterator[np.ndarray]:
+    """Seek straight to each sample timestamp; only frames near sample points are decoded"""
+    timestamp = 0.0
+    while timestamp < duration:
+        capture.set(cv2.CAP_PROP_POS_MSEC, timestamp * 1000)
+        ok, frame = capture.read()
+        if not ok:
+            return
+        yield frame
+        timestamp += interval
+
+
+def _sample_by_grab(capture, interval: float) -> Iterator[np.ndarray]:
     """
-    Extract frames from video for analysis
+    Fallback for streams without a known duration (e.g. browser WebM):
+    grab() every frame but only retrieve() (colour-convert) the sampled ones
+    """
+    next_sample = 0.0
+    while capture.grab():
+        timestamp = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000
+        if timestamp + 1e-3 < next_sample:
+            continue
+        ok, frame = capture.retrieve()
+        if not ok:
+            return
+        yield frame
+        next_sample = max(next_sample + interval, timestamp + 1e-3)
+
+
+def extract_frames(
+    video_bytes: bytes,
+    frame_rate: int = 1,
+    max_width: Optional[int] = None,
+    max_frames: Optional[int] = None
+) -> Iterator[np.ndarray]:
+    """
+    Lazily extract frames from video for analysis
     frame_rate: Extract 1 frame every N seconds
+    max_width: downscale to this width (defaults to VIDEO_ANALYSIS_WIDTH)
+    Only one decoded frame is held at a time; close the generator to release the capture.
     """
-    frames = []
+    if not OPENCV_AVAILABLE or not video_bytes:
+        return
+
+    interval = max(frame_rate, 1e-3)
+    max_width = max_width if max_width is not None else settings.VIDEO_ANALYSIS_WIDTH
+    max_frames = max_frames if max_frames is not None else settings.VIDEO_MAX_FRAMES
+
     try:
-        # Convert bytes to numpy array for OpenCV
-        nparr = np.frombuffer(video_bytes, np.uint8)
-        
-        # Write to temporary file or use memory buffer
-        # For simplicity, we'll use a temporary approach
-        # In production, use proper video processing with ffmpeg
-        
-        # Placeholder - in production use cv2.VideoCapture or ffmpeg
-        return frames
+        with _video_path(video_bytes) as path:
+            capture = cv2.VideoCapture(path)
+            try:
+                if not capture.isOpened():
+                    print("Error extracting video frames: could not open video")
+                    return
+
+                fps = capture.get(cv2.CAP_PROP_FPS)
+                frame_count = capture.get(cv2.CAP_PROP_FRAME_COUNT)
+                if fps > 0 and frame_count > 0:
+                    frames = _sample_by_seek(capture, interval, frame_count / fps)
+                else:
+                    frames = _sample_by_grab(capture, interval)
+
+                for frame in islice(frames, max_frames or None):
+                    yield _downscale(frame, max_width)
+            finally:
+                capture.release()
     except Exception as e:
         print(f"Error extracting video frames: {e}")
-        return []
+
 
 def extract_frame_from_bytes(video_bytes: bytes, frame_number: int = 0) -> Optional[np.ndarray]:
     """
     Extract a specific frame from video bytes
     """
+    frames = extract_frames(video_bytes, frame_rate=1)
     try:
-        frames = extract_frames(video_bytes, frame_rate=1)
-        if frames and frame_number < len(frames):
-            return frames[frame_number]
-        return None
+        return next(islice(frames, frame_number, None), None)
     except Exception as e:
         print(f"Error extracting frame: {e}")
         return None
+    finally:
+        frames.close()
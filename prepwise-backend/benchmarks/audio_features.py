@@ -0,0 +1,84 @@
+"""
+Benchmark for app.utils.audio_processing.extract_audio_features.
+
+Usage (from prepwise-backend/):
+    python -m benchmarks.audio_features [--seconds 120] [--budget-ms 100]
+
+Before timing, a short clip at every supported sample rate is run through both
+the batch and the streaming extractor; their pitch must agree and fall inside the
+fixture's F0 range. Exits non-zero if that check fails or if the median time for
+one answer exceeds the budget.
+"""
+import argparse
+import json
+import os
+import sys
+
+# Single-core measurement: keep BLAS/FFT helpers from spreading across cores
+for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(var, "1")
+
+from app.utils.audio_processing import StreamingAudioFeatures, extract_audio_features
+from benchmarks.fixtures import synthetic_speech_wav
+from benchmarks.timing import measure
+
+SUPPORTED_SAMPLE_RATES = (8000, 16000, 22050, 44100, 48000)
+# synthetic_speech_wav draws F0 from 100-220 Hz with +/-10% vibrato
+PITCH_RANGE_HZ = (90.0, 245.0)
+STREAM_CHUNK_BYTES = 4096
+
+
+def check_sample_rates(seconds: float = 5.0) -> list:
+    """Batch and streaming features at each supported rate; returns failure messages"""
+    failures = []
+    for sample_rate in SUPPORTED_SAMPLE_RATES:
+        audio = synthetic_speech_wav(seconds, sample_rate=sample_rate)
+        try:
+            batch = extract_audio_features(audio)
+            stream = StreamingAudioFeatures()
+            for start in range(0, len(audio), STREAM_CHUNK_BYTES):
+                stream.feed(audio[start:start + STREAM_CHUNK_BYTES])
+            streamed = stream.result()
+        except Exception as e:
+            failures.append(f"{sample_rate} Hz: {type(e).__name__}: {e}")
+            continue
+
+        pitch = batch.get('pitch_mean', 0.0)
+        if not PITCH_RANGE_HZ[0] <= pitch <= PITCH_RANGE_HZ[1]:
+            failures.append(f"{sample_rate} Hz: batch pitch {pitch:.1f} Hz outside {PITCH_RANGE_HZ}")
+        if abs(streamed.get('pitch_mean', 0.0) - pitch) > 0.02 * pitch:
+            failures.append(
+                f"{sample_rate} Hz: streaming pitch {streamed.get('pitch_mean', 0.0):.1f} Hz "
+                f"differs from batch {pitch:.1f} Hz"
+            )
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=120.0, help="Length of the synthetic answer")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Median time budget per answer")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    failures = check_sample_rates()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        return 1
+
+    audio = synthetic_speech_wav(args.seconds)
+    features = extract_audio_features(audio)
+    stats = measure(lambda: extract_audio_features(audio), warmup=3, repeat=args.repeat)
+
+    print(json.dumps({'seconds': args.seconds, 'timing': stats, 'features': features}, indent=2))
+
+    if stats['median_ms'] > args.budget_ms:
+        print(f"FAIL: median {stats['median_ms']:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        return 1
+    print(f"OK: median {stats['median_ms']:.1f} ms within budget {args.budget_ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
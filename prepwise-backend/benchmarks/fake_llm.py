@@ -0,0 +1,318 @@
+"""
+Local stand-in for the OpenRouter /chat/completions API, for offline load and latency work.
+
+Usage (from prepwise-backend/):
+    python -m benchmarks.fake_llm [--port 8100] [--latency-ms 400] [--latency-dist lognormal]
+                                  [--tokens-per-second 60] [--error-rate 0.01] [--rate-limit-rate 0.02]
+
+then start the backend with
+    LLM_BASE_URL=http://127.0.0.1:8100/v1/chat/completions uvicorn app.main:app
+
+Replies are canned but shaped like the real ones for each call site (questions, persona lines,
+answer analysis / final feedback / GD evaluation JSON, topic batches, summaries), so every
+parser on the backend runs. Latency is time-to-first-token drawn from the chosen distribution
+plus completion tokens at --tokens-per-second; "stream": true is served as SSE chunks at the
+same rate. GET /stats reports what was served.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+
+class FakeLLMConfig(BaseModel):
+    # Time to first token: "fixed", "uniform" (0.5x-1.5x) or "lognormal" (median latency_ms, spread latency_sigma)
+    latency_ms: float = 400.0
+    latency_dist: str = "lognormal"
+    latency_sigma: float = 0.5
+    # Completion speed; 0 returns the whole reply right after the first-token delay
+    tokens_per_second: float = 60.0
+    # Fraction of requests answered with HTTP 500 / HTTP 429 (with Retry-After)
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    # Fraction of JSON replies sent as legacy "SCORE: / FEEDBACK:" text or as broken JSON,
+    # to exercise the free-text fallback and the JSON repair / re-ask paths
+    text_reply_rate: float = 0.0
+    malformed_json_rate: float = 0.0
+    # Answer requests that carry response_format with HTTP 400, like providers without JSON mode
+    reject_json_mode: bool = False
+    seed: Optional[int] = None
+
+
+# ============================================================
+# CANNED REPLIES
+# ============================================================
+
+QUESTIONS = [
+    "Tell me about a project where you had to learn a new technology quickly.",
+    "Describe a time you disagreed with a teammate and how you resolved it.",
+    "How would you design a URL shortener that handles millions of requests a day?",
+    "What is the difference between a process and a thread?",
+    "Where do you see yourself in five years, and how does this role fit in?"
+]
+
+PERSONA_LINES = [
+    "I see the point, but we are ignoring the cost side of this entirely.",
+    "Let me add some data here: most studies show the effect is smaller than we assume.",
+    "I agree with the student, and I would go further and say regulation has to come first.",
+    "To summarize where we are, we have two camps: speed of adoption versus safeguards.",
+    "Honestly, I think both sides are overstating it."
+]
+
+STRENGTHS = ["Clear structure", "Relevant example", "Confident delivery", "Good use of specifics", "Stayed on topic"]
+IMPROVEMENTS = ["Quantify the impact", "Be more concise", "Explain the trade-offs", "Add a concrete example", "Slow down"]
+# The roles the GD evaluation prompt allows
+ROLES = ["Analyst", "Leader", "Consultant", "Team Player", "Observer"]
+
+TOPICS = [
+    ("technology", "Should open-source AI models be restricted?"),
+    ("technology", "Is privacy dead in the age of smartphones?"),
+    ("social", "Should social media have a minimum age of 16?"),
+    ("social", "Is a four-day work week good for society?"),
+    ("business", "Should startups chase growth over profitability?"),
+    ("business", "Are unicorn valuations a bubble?"),
+    ("abstract", "Is ambition overrated?"),
+    ("abstract", "Can tradition and progress coexist?")
+]
+
+
+def classify(prompt: str) -> str:
+    """Which backend call a prompt comes from (the request carries no call-site label)"""
+    if '"topics": [' in prompt:
+        return "gd_topics"
+    if '"role_suitability"' in prompt:
+        return "gd_evaluation"
+    if '"overall_score"' in prompt:
+        return "final_feedback"
+    if '"score"' in prompt:
+        return "answer_analysis"
+    if "running summary of a Group Discussion" in prompt:
+        return "gd_summary"
+    if "Write the final summary" in prompt:
+        return "final_summary"
+    if "participant in a Group Discussion" in prompt:
+        return "gd_persona"
+    if "interview question" in prompt:
+        return "question"
+    return "other"
+
+
+def _score(rng: random.Random, low: int = 55, high: int = 92) -> int:
+    return rng.randint(low, high)
+
+
+def canned_reply(kind: str, prompt: str, rng: random.Random, config: FakeLLMConfig) -> str:
+    if kind in ("answer_analysis", "final_feedback", "gd_evaluation"):
+        if rng.random() < config.text_reply_rate:
+            return _legacy_text(kind, rng)
+        reply = json.dumps(_json_reply(kind, rng))
+        if rng.random() < config.malformed_json_rate:
+            # Trailing comma and a cut-off tail: what repair_json is for
+            reply = reply[:-1].rstrip() + ',\n'
+        return reply
+    if kind == "gd_topics":
+        count = int(re.search(r"Generate (\d+)", prompt).group(1)) if re.search(r"Generate (\d+)", prompt) else 5
+        nonce = uuid.uuid4().hex[:6]
+        topics = [
+            {"category": category, "topic": f"{topic[:-1]} (case {nonce}-{index})?"}
+            for index, (category, topic) in enumerate(rng.sample(TOPICS, min(count, len(TOPICS))))
+        ]
+        return json.dumps({"topics": topics})
+    if kind == "gd_summary":
+        return "The group is split between regulation and innovation; the student argued for a middle path with examples."
+    if kind == "final_summary":
+        return ("The candidate answered consistently and structured most responses well. "
+                "Examples were relevant but rarely quantified. Delivery was confident with a few hesitations. "
+                "Next steps: practise concise answers and lead with measurable impact.")
+    if kind == "gd_persona":
+        return rng.choice(PERSONA_LINES)
+    if kind == "question":
+        return rng.choice(QUESTIONS)
+    return "OK."
+
+
+def _json_reply(kind: str, rng: random.Random) -> Dict:
+    if kind == "answer_analysis":
+        return {
+            "score": _score(rng),
+            "feedback": "Solid answer with a relevant example. Tighten the structure and quantify the outcome.",
+            "strengths": rng.sample(STRENGTHS, 2),
+            "improvements": rng.sample(IMPROVEMENTS, 2),
+            "content": _score(rng),
+            "communication": _score(rng),
+            "confidence": _score(rng)
+        }
+    if kind == "final_feedback":
+        return {
+            "overall_score": _score(rng),
+            "scores": {"content": _score(rng), "communication": _score(rng), "confidence": _score(rng)},
+            "strengths": rng.sample(STRENGTHS, 3),
+            "weaknesses": rng.sample(IMPROVEMENTS, 3),
+            "detailed_feedback": "Consistent answers with relevant examples; work on concision and measurable impact."
+        }
+    scores = {
+        name: round(rng.uniform(5, 9), 1)
+        for name in ("communication", "content", "participation", "team_behavior", "leadership")
+    }
+    return {
+        "overall_score": round(sum(scores.values()) / len(scores), 1),
+        "scores": scores,
+        "strengths": rng.sample(STRENGTHS, 2),
+        "weaknesses": rng.sample(IMPROVEMENTS, 2),
+        "role_suitability": rng.choice(ROLES),
+        "improvement_suggestions": rng.sample(IMPROVEMENTS, 2),
+        "detailed_feedback": "Contributed regularly and engaged with other views; could open the discussion more often."
+    }
+
+
+def _legacy_text(kind: str, rng: random.Random) -> str:
+    """The pre-JSON SCORE / FEEDBACK reply format"""
+    return (
+        f"SCORE: {_score(rng)}\n"
+        "FEEDBACK: Good answer overall, with room to add detail.\n"
+        "STRENGTHS:\n- " + "\n- ".join(rng.sample(STRENGTHS, 2)) + "\n"
+        "IMPROVEMENTS:\n- " + "\n- ".join(rng.sample(IMPROVEMENTS, 2))
+    )
+
+
+# ============================================================
+# SERVER
+# ============================================================
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def first_token_delay(config: FakeLLMConfig, rng: random.Random) -> float:
+    base = config.latency_ms / 1000
+    if config.latency_dist == "fixed":
+        return base
+    if config.latency_dist == "uniform":
+        return rng.uniform(0.5 * base, 1.5 * base)
+    return rng.lognormvariate(math.log(max(base, 1e-6)), config.latency_sigma)
+
+
+def create_app(config: Optional[FakeLLMConfig] = None) -> FastAPI:
+    """The fake API; the config (and /stats) live on app.state"""
+    config = config or FakeLLMConfig()
+    rng = random.Random(config.seed)
+    app = FastAPI(title="Fake LLM")
+    app.state.config = config
+    app.state.stats = {'requests': 0, 'streamed': 0, 'errors': 0, 'rate_limited': 0, 'json_mode_rejected': 0, 'by_kind': {}}
+
+    def error(status: int, message: str, headers: Optional[Dict] = None) -> JSONResponse:
+        return JSONResponse({"error": {"message": message, "code": status}}, status_code=status, headers=headers)
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats = app.state.stats
+        stats['requests'] += 1
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        kind = classify(prompt)
+        stats['by_kind'][kind] = stats['by_kind'].get(kind, 0) + 1
+
+        roll = rng.random()
+        if roll < config.rate_limit_rate:
+            stats['rate_limited'] += 1
+            return error(429, "Rate limit exceeded (fake)", {"Retry-After": "1"})
+        if roll < config.rate_limit_rate + config.error_rate:
+            stats['errors'] += 1
+            await asyncio.sleep(first_token_delay(config, rng))
+            return error(500, "Upstream error (fake)")
+        if config.reject_json_mode and body.get("response_format"):
+            stats['json_mode_rejected'] += 1
+            return error(400, "response_format is not supported by this model (fake)")
+
+        reply = canned_reply(kind, prompt, rng, config)
+        model = body.get("model", "fake/model")
+        usage = {
+            "prompt_tokens": estimate_tokens(prompt),
+            "completion_tokens": estimate_tokens(reply),
+            "total_tokens": estimate_tokens(prompt) + estimate_tokens(reply)
+        }
+        delay = first_token_delay(config, rng)
+
+        if body.get("stream"):
+            stats['streamed'] += 1
+            return StreamingResponse(_stream(reply, model, delay, config.tokens_per_second), media_type="text/event-stream")
+
+        generation = usage["completion_tokens"] / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+        await asyncio.sleep(delay + generation)
+        return {
+            "id": f"gen-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+            "usage": usage
+        }
+
+    # Same contract under both the bare and the OpenRouter-style path
+    app.post("/chat/completions")(chat_completions)
+    app.post("/v1/chat/completions")(chat_completions)
+    app.post("/api/v1/chat/completions")(chat_completions)
+
+    @app.get("/stats")
+    async def get_stats():
+        return {**app.state.stats, 'config': config.model_dump()}
+
+    return app
+
+
+async def _stream(reply: str, model: str, delay: float, tokens_per_second: float):
+    """SSE chunks of roughly one token each (words split to ~4 characters), then [DONE]"""
+    await asyncio.sleep(delay)
+    chunk_id = f"gen-{uuid.uuid4().hex[:12]}"
+    pieces: List[str] = re.findall(r"\s*\S{1,4}", reply) or [reply]
+    interval = 1 / tokens_per_second if tokens_per_second > 0 else 0.0
+    for piece in pieces:
+        data = {
+            "id": chunk_id,
+            "object": "chat.completion.chunk",
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]
+        }
+        yield f"data: {json.dumps(data)}\n\n"
+        if interval:
+            await asyncio.sleep(interval)
+    done = {"id": chunk_id, "object": "chat.completion.chunk", "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+    yield f"data: {json.dumps(done)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    defaults = FakeLLMConfig()
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="Median time to first token")
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"], default=defaults.latency_dist)
+    parser.add_argument("--latency-sigma", type=float, default=defaults.latency_sigma, help="Lognormal spread")
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction answered with HTTP 429")
+    parser.add_argument("--text-reply-rate", type=float, default=0.0, help="Fraction of JSON replies sent as legacy text")
+    parser.add_argument("--malformed-json-rate", type=float, default=0.0, help="Fraction of JSON replies sent broken")
+    parser.add_argument("--reject-json-mode", action="store_true", help="HTTP 400 for requests with response_format")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+    config = FakeLLMConfig(**{
+        name: value for name, value in vars(args).items() if name in FakeLLMConfig.model_fields
+    })
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
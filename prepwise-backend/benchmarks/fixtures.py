@@ -0,0 +1,184 @@
+import io
+import os
+import tempfile
+import wave
+import zipfile
+from typing import List
+
+import numpy as np
+
+
+def synthetic_speech_wav(seconds: float = 120.0, sample_rate: int = 16000, seed: int = 0) -> bytes:
+    """
+    Speech-like 16-bit mono WAV: harmonic "syllables" with drifting pitch,
+    separated by pauses, over low-level background noise
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sample_rate)
+    signal = rng.normal(0, 0.003, n).astype(np.float32)
+
+    position = int(0.5 * sample_rate)
+    while position < n:
+        # A phrase of 1-4 seconds followed by a 0.2-1.5 second pause
+        phrase = int(rng.uniform(1.0, 4.0) * sample_rate)
+        end = min(n, position + phrase)
+        t = np.arange(end - position) / sample_rate
+        f0 = rng.uniform(100, 220) * (1 + 0.1 * np.sin(2 * np.pi * 0.5 * t))
+        phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+        syllables = 0.5 * (1 + np.sin(2 * np.pi * 4.0 * t)) ** 2
+        signal[position:end] += (0.2 * voiced * syllables).astype(np.float32)
+        position = end + int(rng.uniform(0.2, 1.5) * sample_rate)
+
+    pcm = (np.clip(signal, -1, 1) * 32767).astype('<i2')
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+RESUME_SECTIONS = [
+    ("EDUCATION", ["B.Tech in Computer Science, National Institute of Technology, 2021-2025, CGPA 8.7"]),
+    ("SKILLS", ["Python, Java, C++, JavaScript, React, Node.js, SQL, MongoDB, Docker, AWS, Git, Machine Learning"]),
+    ("EXPERIENCE", [
+        "Software Engineering Intern, Acme Corp (May 2024 - Jul 2024)",
+        "- Built a REST API in FastAPI serving 2k requests per minute",
+        "- Cut report generation time by 40 percent with query caching"
+    ]),
+    ("PROJECTS", [
+        "Campus Placement Portal - React, Node.js, MongoDB",
+        "- Used by 1,200 students across three departments",
+        "Sentiment Analysis of Product Reviews - Python, scikit-learn"
+    ]),
+    ("CERTIFICATIONS", ["AWS Certified Cloud Practitioner", "Google Data Analytics Certificate"])
+]
+
+
+def resume_lines(seed: int = 0, filler_lines: int = 0) -> List[str]:
+    """Plain-text resume with contact details and the sections ResumeParser looks for"""
+    rng = np.random.default_rng(seed)
+    first = ["Aarav", "Diya", "Kabir", "Meera", "Rohan", "Sara"][seed % 6]
+    lines = [
+        f"{first} Sharma",
+        f"{first.lower()}.sharma{seed}@example.com | +91 98{rng.integers(10000000, 99999999)}",
+        f"linkedin.com/in/{first.lower()}-sharma-{seed} | github.com/{first.lower()}{seed}"
+    ]
+    for title, body in RESUME_SECTIONS:
+        lines += ["", title, *body]
+    lines += [f"- Additional project detail line {index}" for index in range(filler_lines)]
+    return lines
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """Minimal valid PDF (Helvetica text, one content stream per page) without a PDF library"""
+    objects = []
+    count = len(pages)
+    kids = " ".join(f"{3 + 2 * index} 0 R" for index in range(count))
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {count} >>".encode())
+    font_id = 3 + 2 * count
+    for index, lines in enumerate(pages):
+        objects.append((
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * index} 0 R >>"
+        ).encode())
+        escaped = (line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines)
+        body = "BT /F1 11 Tf 50 750 Td 14 TL " + " ".join(f"({line}) '" for line in escaped) + " ET"
+        objects.append(f"<< /Length {len(body)} >>\nstream\n{body}\nendstream".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def resume_pdf(pages: int = 2, seed: int = 0) -> bytes:
+    """Resume on the first page, filler project lines on the rest (50 lines per page)"""
+    lines = resume_lines(seed, filler_lines=50 * (pages - 1))
+    return make_pdf([lines[start:start + 50] for start in range(0, len(lines), 50)][:pages])
+
+
+def resume_docx(seed: int = 0, filler_lines: int = 0) -> bytes:
+    from docx import Document
+
+    document = Document()
+    for line in resume_lines(seed, filler_lines):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def resume_zip(count: int = 20) -> bytes:
+    """ZIP of alternating PDF and DOCX resumes, for /resume/bulk"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for index in range(count):
+            if index % 2:
+                archive.writestr(f"resume_{index}.docx", resume_docx(index))
+            else:
+                archive.writestr(f"resume_{index}.pdf", resume_pdf(2, index))
+    return buffer.getvalue()
+
+
+def synthetic_video(seconds: float = 10.0, fps: int = 10, width: int = 320, height: int = 240, seed: int = 0) -> bytes:
+    """MJPEG AVI of a face-like blob drifting over a noisy background (decodable by OpenCV)"""
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "answer.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+        for index in range(int(seconds * fps)):
+            frame = rng.integers(90, 110, (height, width, 3), dtype=np.uint8)
+            center = (width // 2 + int(10 * np.sin(index / fps)), height // 2)
+            cv2.ellipse(frame, center, (45, 60), 0, 0, 360, (150, 170, 210), -1)
+            cv2.circle(frame, (center[0] - 18, center[1] - 15), 6, (40, 40, 40), -1)
+            cv2.circle(frame, (center[0] + 18, center[1] - 15), 6, (40, 40, 40), -1)
+            writer.write(frame)
+        writer.release()
+        with open(path, 'rb') as file:
+            return file.read()
+
+
+# Replies as the model actually returns them (markdown, stray prose, the pre-JSON text format),
+# for timing the parsers without the API
+RECORDED_LLM_OUTPUTS = {
+    'analysis_text': [
+        "SCORE: 78\nFEEDBACK: The answer is relevant and well structured, but it lacks a measurable outcome.\n"
+        "STRENGTHS:\n- Clear situation and task\n- Good ownership of the problem\n"
+        "IMPROVEMENTS:\n- Quantify the result\n- Keep the action part shorter",
+        "**Score:** 64/100\n\n**Feedback:** You covered the basics of OOP but mixed up abstraction and "
+        "encapsulation. Examples would help.\n\n**Strengths:**\n1. Confident tone\n2. Correct definition of "
+        "inheritance\n\n**Improvements:**\n1. Distinguish abstraction from encapsulation\n2. Give a code example\n"
+        "3. Mention polymorphism",
+        "Overall this was a strong response (score: 88). The candidate described the debugging process "
+        "step by step.\nStrengths\n* Systematic approach\n* Mentions logging and reproducing the bug\n"
+        "Improvements\n* Could mention automated tests\n* Slightly long"
+    ],
+    'feedback_text': [
+        "Overall Score: 74/100\n\nScores:\n- Content: 76\n- Communication: 72\n- Confidence: 70\n\n"
+        "Top strengths:\n- Relevant examples from internships\n- Structured answers (STAR)\n- Calm delivery\n\n"
+        "Areas of improvement:\n- Quantify impact\n- Shorter answers\n- More eye contact\n\n"
+        "Summary: A solid interview. " + "The candidate gave consistent answers with good examples. " * 6
+    ],
+    'analysis_json': [
+        '{"score": 82, "feedback": "Clear and specific answer with a good example.", '
+        '"strengths": ["Specific example", "Clear structure"], "improvements": ["Quantify impact"], '
+        '"content": 84, "communication": 80, "confidence": 78}',
+        "```json\n{score: 71, 'feedback': 'Relevant but generic.', \"strengths\": [\"On topic\",], "
+        "\"improvements\": [\"Add detail\", \"Be concise\"], \"content\": 70, \"communication\": 74, "
+        "\"confidence\": None,}\n```",
+        '{"score": 90, "feedback": "Excellent, well reasoned answer.", "strengths": ["Depth", "Trade-offs"'
+    ]
+}
@@ -0,0 +1,381 @@
+"""
+End-to-end load benchmark for the API, run offline against the fake LLM (benchmarks.fake_llm,
+on a local socket) and the in-memory Firestore stand-in (PERSISTENCE_BACKEND=memory).
+
+Usage (from prepwise-backend/):
+    python -m benchmarks.load [--scenarios interview_text,gd] [--concurrency 8] [--iterations 16]
+                              [--transport asgi|socket] [--llm-latency-ms 300] [--db-latency-ms 5]
+                              [--output load.json]
+
+Scenarios:
+    interview_text   start, 5 typed answers, end, poll results
+    interview_voice  same with a synthetic WAV per answer
+    interview_video  same with a typed answer and a synthetic clip per answer
+    gd               start, --gd-turns student turns, end, poll results
+    resume_burst     one /resume/parse per iteration (PDF and DOCX alternating) plus a /resume/bulk ZIP
+    admin            dashboard reads: statistics, analytics, students, LLM usage
+
+For each scenario the report has throughput (scenarios and requests per second), p50/p95/p99
+of the whole scenario and of every request step, errors, and RSS memory before/after/peak.
+--transport asgi drives the app in-process through httpx; socket serves it with uvicorn on
+127.0.0.1. The JSON report (stdout, or --output) is meant to be diffed between commits.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.fixtures import resume_docx, resume_pdf, resume_zip, synthetic_speech_wav, synthetic_video
+
+SCENARIOS = ("interview_text", "interview_voice", "interview_video", "gd", "resume_burst", "admin")
+
+ANSWERS = [
+    "I led a team of four to build a placement portal; I owned the backend and cut page load time by half.",
+    "My biggest strength is breaking ambiguous problems down and communicating trade-offs early.",
+    "When a teammate disagreed with my design we benchmarked both options and went with the faster one.",
+    "I would cache the hot paths, batch the database writes and profile before optimising anything else.",
+    "In five years I want to be leading a product team and mentoring new engineers."
+]
+
+GD_LINES = [
+    "I think regulation is necessary, but it has to be narrow and evidence-based.",
+    "Building on that, the cost of compliance falls hardest on small companies.",
+    "Let me bring in a different angle: the public already expects some safeguards.",
+    "I disagree with the previous point; self-regulation has failed before.",
+    "To summarize, we agree on the goal and differ on who should enforce it."
+]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        'count': len(samples),
+        'p50_ms': round(percentile(samples, 50), 2),
+        'p95_ms': round(percentile(samples, 95), 2),
+        'p99_ms': round(percentile(samples, 99), 2),
+        'mean_ms': round(statistics.fmean(samples), 2) if samples else 0.0,
+        'max_ms': round(max(samples), 2) if samples else 0.0
+    }
+
+
+def rss_mb() -> float:
+    """Current resident set size (Linux /proc; falls back to the peak elsewhere)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+class Recorder:
+    """Wraps the HTTP client: times every request per step and counts failures"""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.steps: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    async def call(self, step: str, method: str, url: str, expect=(200,), **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        self.steps.setdefault(step, []).append((time.perf_counter() - started) * 1000)
+        if response.status_code not in expect:
+            self.errors[step] = self.errors.get(step, 0) + 1
+            raise RuntimeError(f"{step}: HTTP {response.status_code} {response.text[:200]}")
+        return response
+
+    async def poll_results(self, step: str, url: str, timeout: float = 60.0) -> Dict:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            response = await self.call(step, "GET", url, expect=(200, 202))
+            if response.status_code == 200:
+                return response.json()
+            await asyncio.sleep(0.05)
+        raise RuntimeError(f"{step}: results not ready after {timeout}s")
+
+
+# ============================================================
+# SCENARIOS
+# ============================================================
+
+class Fixtures:
+    """Uploads built once per run so fixture generation isn't timed"""
+
+    def __init__(self):
+        self.audio = synthetic_speech_wav(8.0)
+        self.video = synthetic_video(5.0)
+        self.pdf = resume_pdf(2)
+        self.docx = resume_docx()
+        self.zip = resume_zip(20)
+
+
+async def run_interview(recorder: Recorder, fixtures: Fixtures, mode: str, iteration: int) -> None:
+    response = await recorder.call(
+        "start", "POST", "/api/interview/start", json={"interview_type": "hr", "mode": mode}
+    )
+    interview_id = response.json()["interview_id"]
+    for answer in ANSWERS:
+        files = {}
+        if mode == "voice":
+            files["audio"] = ("answer.wav", fixtures.audio, "audio/wav")
+        elif mode == "video":
+            files["video"] = ("answer.avi", fixtures.video, "video/x-msvideo")
+        await recorder.call(
+            "answer", "POST", f"/api/interview/{interview_id}/answer",
+            data={"answer": answer}, files=files or None
+        )
+    await recorder.call("end", "POST", f"/api/interview/{interview_id}/end", expect=(202,))
+    await recorder.poll_results("results", f"/api/interview/{interview_id}/results")
+
+
+async def run_gd(recorder: Recorder, fixtures: Fixtures, turns: int, iteration: int) -> None:
+    response = await recorder.call("start", "POST", "/api/gd/start", params={"mode": "text"})
+    gd_id = response.json()["gd_id"]
+    since = 0
+    for turn in range(turns):
+        response = await recorder.call(
+            "speak", "POST", f"/api/gd/{gd_id}/speak",
+            params={"message": GD_LINES[turn % len(GD_LINES)], "since": since}
+        )
+        since = response.json().get("last_seq", since)
+    await recorder.call("status", "GET", f"/api/gd/{gd_id}/status", params={"since": since})
+    await recorder.call("end", "POST", f"/api/gd/{gd_id}/end", expect=(202,))
+    await recorder.poll_results("results", f"/api/gd/{gd_id}/results")
+
+
+async def run_resume(recorder: Recorder, fixtures: Fixtures, iteration: int) -> None:
+    if iteration % 2:
+        upload = ("resume.docx", fixtures.docx,
+                  "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+    else:
+        upload = ("resume.pdf", fixtures.pdf, "application/pdf")
+    await recorder.call("parse", "POST", "/api/resume/parse", files={"file": upload})
+    if iteration == 0:
+        response = await recorder.call(
+            "bulk", "POST", "/api/resume/bulk", files={"file": ("resumes.zip", fixtures.zip, "application/zip")}
+        )
+        if not response.text.strip():
+            raise RuntimeError("bulk: empty NDJSON response")
+
+
+async def run_admin(recorder: Recorder, fixtures: Fixtures, iteration: int) -> None:
+    await asyncio.gather(
+        recorder.call("statistics", "GET", "/api/admin/statistics"),
+        recorder.call("analytics", "GET", "/api/admin/interviews/analytics"),
+        recorder.call("students", "GET", "/api/admin/students"),
+        recorder.call("llm_usage", "GET", "/api/admin/llm/usage")
+    )
+
+
+def scenario_runner(name: str, args: argparse.Namespace) -> Callable[[Recorder, Fixtures, int], Awaitable[None]]:
+    if name.startswith("interview_"):
+        mode = name.split("_", 1)[1]
+        return lambda recorder, fixtures, iteration: run_interview(recorder, fixtures, mode, iteration)
+    if name == "gd":
+        return lambda recorder, fixtures, iteration: run_gd(recorder, fixtures, args.gd_turns, iteration)
+    if name == "resume_burst":
+        return run_resume
+    if name == "admin":
+        return run_admin
+    raise ValueError(f"Unknown scenario: {name}")
+
+
+async def run_scenario(name: str, client: httpx.AsyncClient, fixtures: Fixtures, args: argparse.Namespace) -> Dict:
+    runner = scenario_runner(name, args)
+    recorder = Recorder(client)
+
+    # Warmup iterations (first-call imports, pools, caches) are not measured
+    for iteration in range(args.warmup):
+        await runner(Recorder(client), fixtures, iteration)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    durations: List[float] = []
+    failures: List[str] = []
+
+    async def one(iteration: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await runner(recorder, fixtures, iteration)
+                durations.append((time.perf_counter() - started) * 1000)
+            except Exception as e:
+                failures.append(f"{type(e).__name__}: {e}")
+
+    rss_before = rss_mb()
+    started = time.perf_counter()
+    await asyncio.gather(*(one(iteration) for iteration in range(args.iterations)))
+    elapsed = time.perf_counter() - started
+
+    requests_made = sum(len(samples) for samples in recorder.steps.values())
+    return {
+        'iterations': args.iterations,
+        'completed': len(durations),
+        'failed': len(failures),
+        'failures': failures[:5],
+        'elapsed_s': round(elapsed, 3),
+        'scenarios_per_s': round(len(durations) / elapsed, 3),
+        'requests': requests_made,
+        'requests_per_s': round(requests_made / elapsed, 2),
+        'scenario_latency': latency_summary(durations),
+        'steps': {step: latency_summary(samples) for step, samples in recorder.steps.items()},
+        'step_errors': recorder.errors,
+        'memory': {
+            'rss_before_mb': round(rss_before, 1),
+            'rss_after_mb': round(rss_mb(), 1),
+            'peak_rss_mb': round(peak_rss_mb(), 1)
+        }
+    }
+
+
+# ============================================================
+# SERVERS AND ENVIRONMENT
+# ============================================================
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def serve_in_thread(app, port: int):
+    """Run an ASGI app with uvicorn on 127.0.0.1:port in a daemon thread; returns the server"""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Server on port {port} did not start")
+        time.sleep(0.02)
+    return server
+
+
+def configure_environment(args: argparse.Namespace, llm_port: int) -> None:
+    """Must run before app modules are imported: settings are read at import time"""
+    os.environ.update({
+        "PERSISTENCE_BACKEND": "memory",
+        "PERSISTENCE_LATENCY_MS": str(args.db_latency_ms),
+        "LLM_BASE_URL": f"http://127.0.0.1:{llm_port}/v1/chat/completions",
+        "LLM_MODELS": "",
+        "GEMINI_API_KEY": "fake-key",
+        "TRANSCRIPTION_BACKEND": "none"
+    })
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace, base_url: str, app=None) -> Dict[str, Dict]:
+    fixtures = Fixtures()
+    if app is not None:
+        transport = httpx.ASGITransport(app=app)
+    else:
+        transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.concurrency * 4))
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=120) as client:
+        for name in args.scenarios:
+            print(f"[load] {name}: {args.iterations} iterations, concurrency {args.concurrency}", file=sys.stderr)
+            results[name] = await run_scenario(name, client, fixtures, args)
+    return results
+
+
+def start_and_run(args: argparse.Namespace) -> Dict[str, Dict]:
+    """Fake LLM on a socket, environment for the fakes, then the app and the scenarios"""
+    from benchmarks.fake_llm import FakeLLMConfig, create_app as create_fake_llm
+
+    llm_port = free_port()
+    serve_in_thread(create_fake_llm(FakeLLMConfig(
+        latency_ms=args.llm_latency_ms,
+        tokens_per_second=args.llm_tokens_per_second,
+        error_rate=args.llm_error_rate,
+        seed=args.seed
+    )), llm_port)
+    configure_environment(args, llm_port)
+
+    from app.main import app
+
+    if args.transport == "socket":
+        app_port = free_port()
+        serve_in_thread(app, app_port)
+        return asyncio.run(run(args, f"http://127.0.0.1:{app_port}"))
+    return asyncio.run(run(args, "http://testserver", app))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset of the scenarios")
+    parser.add_argument("--iterations", type=int, default=16, help="Measured runs per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Scenario runs in flight at once")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured runs per scenario first")
+    parser.add_argument("--gd-turns", type=int, default=6)
+    parser.add_argument("--transport", choices=["asgi", "socket"], default="asgi")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="Fake LLM median time to first token")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--db-latency-ms", type=float, default=5.0, help="Fake Firestore delay per round trip")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # The app logs with print(); keep stdout for the report
+    with contextlib.redirect_stdout(sys.stderr):
+        scenarios = start_and_run(args)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'config': {key: value for key, value in vars(args).items() if key != "output"}
+        },
+        'scenarios': scenarios
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+        print(f"[load] report written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    return 1 if any(result['failed'] for result in scenarios.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
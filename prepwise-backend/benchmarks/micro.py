@@ -0,0 +1,346 @@
+"""
+Microbenchmarks for the CPU-bound hot paths, with a regression check against a saved baseline.
+
+Usage (from prepwise-backend/):
+    python -m benchmarks.micro [--only resume,gemini] [--warmup 5] [--repeat 20] [--runs 3]
+                               [--baseline benchmarks/baseline.json] [--threshold 0.25] [--save-baseline]
+
+Cases (all inputs generated locally, see benchmarks.fixtures):
+    resume_pdf / resume_pdf_fast / resume_docx   ResumeParser over a corpus of synthetic resumes
+    gemini_extract_number / gemini_extract_list_items / gemini_parse_analysis / gemini_parse_feedback
+                                                 free-text parsers over recorded LLM replies
+    structured_parse                             parse_structured (with repair) over recorded JSON replies
+    build_context_prompt                         question prompt with resume data and answer history
+    audio_features                               extract_audio_features on a 30 s answer
+    video_analysis                               VideoAnalysisService.analyze_video on 20 decoded frames
+
+Every case runs in its own fresh interpreter, --runs times, and the run with the lowest median
+is kept: earlier cases (large allocations, regex and import caches) can't shift later ones, and
+one run hit by background load doesn't decide the result. Each sample times enough calls to
+take at least --min-sample-ms (so microsecond functions are measurable) after --warmup
+unmeasured samples, with GC off and BLAS on one thread. The median is compared with the
+baseline; a case more than --threshold slower fails the run (exit 1). A pure Python calibration
+loop is recorded too: --normalize divides it out so baselines from a different machine are
+comparable. On shared or virtualised hosts raise --runs (or the threshold) before trusting a FAIL.
+"""
+import os
+
+# Single-core measurement: keep BLAS/FFT helpers from spreading across cores
+for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(var, "1")
+
+import argparse
+import contextlib
+import json
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, Optional
+
+from benchmarks.fixtures import (
+    RECORDED_LLM_OUTPUTS, resume_docx, resume_pdf, synthetic_speech_wav, synthetic_video
+)
+from benchmarks.timing import measure
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+# ============================================================
+# CASES
+# ============================================================
+# Each setup builds its inputs (untimed) and returns the function to time
+
+def _resume_corpus():
+    pdfs = [(f"resume_{index}.pdf", resume_pdf(pages=1 + index % 4, seed=index)) for index in range(8)]
+    docxs = [(f"resume_{index}.docx", resume_docx(seed=index, filler_lines=20 * index)) for index in range(4)]
+    return pdfs, docxs
+
+
+def setup_resume_pdf(fast: bool = False) -> Callable[[], object]:
+    from app.services.resume_parser import ResumeParser
+
+    parser = ResumeParser()
+    pdfs, _ = _resume_corpus()
+    return lambda: [parser.parse_resume(data, name, fast=fast) for name, data in pdfs]
+
+
+def setup_resume_docx() -> Callable[[], object]:
+    from app.services.resume_parser import ResumeParser
+
+    parser = ResumeParser()
+    _, docxs = _resume_corpus()
+    return lambda: [parser.parse_resume(data, name) for name, data in docxs]
+
+
+def _gemini():
+    from app.services.gemini_service import GeminiService
+
+    return GeminiService()
+
+
+def setup_extract_number() -> Callable[[], object]:
+    service = _gemini()
+    texts = RECORDED_LLM_OUTPUTS['analysis_text'] + RECORDED_LLM_OUTPUTS['feedback_text']
+    return lambda: [service._extract_number(text) for text in texts]
+
+
+def setup_extract_list_items() -> Callable[[], object]:
+    service = _gemini()
+    texts = RECORDED_LLM_OUTPUTS['analysis_text'] + RECORDED_LLM_OUTPUTS['feedback_text']
+    return lambda: [
+        (service._extract_list_items(text, "STRENGTHS", "strengths"),
+         service._extract_list_items(text, "IMPROVEMENTS", "improvements"))
+        for text in texts
+    ]
+
+
+def setup_parse_analysis() -> Callable[[], object]:
+    service = _gemini()
+    texts = RECORDED_LLM_OUTPUTS['analysis_text']
+    return lambda: [service._parse_analysis_response(text) for text in texts]
+
+
+def setup_parse_feedback() -> Callable[[], object]:
+    service = _gemini()
+    texts = RECORDED_LLM_OUTPUTS['feedback_text']
+    qa_pairs = [{"question": "Tell me about yourself.", "answer": "I am a final-year student."}] * 5
+    return lambda: [service._parse_feedback_response(text, qa_pairs) for text in texts]
+
+
+def setup_structured_parse() -> Callable[[], object]:
+    from app.models.llm_output import AnswerAnalysis
+    from app.utils.structured_output import StructuredOutputError, parse_structured
+
+    texts = RECORDED_LLM_OUTPUTS['analysis_json']
+
+    def run():
+        results = []
+        for text in texts:
+            try:
+                results.append(parse_structured(text, AnswerAnalysis))
+            except StructuredOutputError:
+                results.append(None)
+        return results
+    return run
+
+
+def setup_build_context_prompt() -> Callable[[], object]:
+    service = _gemini()
+    resume_data = {"skills": ["Python", "Java", "React", "SQL", "Docker", "AWS", "Git", "Machine Learning"]}
+    answers = [answer * 3 for answer in (
+        "I built a placement portal used by 1,200 students. ",
+        "I handle pressure by planning and breaking work down. ",
+        "My strongest skill is backend development in Python. "
+    )]
+    return lambda: service._build_context_prompt("technical", 4, answers, resume_data)
+
+
+def setup_audio_features() -> Callable[[], object]:
+    from app.utils.audio_processing import extract_audio_features
+
+    audio = synthetic_speech_wav(30.0)
+    return lambda: extract_audio_features(audio)
+
+
+def setup_video_analysis() -> Callable[[], object]:
+    from app.services.video_analysis import VideoAnalysisService
+    from app.utils.video_processing import extract_frames
+
+    service = VideoAnalysisService()
+    frames = list(extract_frames(synthetic_video(20.0)))
+    return lambda: service.analyze_video(iter(frames), parallel=False)
+
+
+CASES: Dict[str, Callable[[], Callable[[], object]]] = {
+    'resume_pdf': setup_resume_pdf,
+    'resume_pdf_fast': lambda: setup_resume_pdf(fast=True),
+    'resume_docx': setup_resume_docx,
+    'gemini_extract_number': setup_extract_number,
+    'gemini_extract_list_items': setup_extract_list_items,
+    'gemini_parse_analysis': setup_parse_analysis,
+    'gemini_parse_feedback': setup_parse_feedback,
+    'structured_parse': setup_structured_parse,
+    'build_context_prompt': setup_build_context_prompt,
+    'audio_features': setup_audio_features,
+    'video_analysis': setup_video_analysis
+}
+
+
+# ============================================================
+# TIMING AND COMPARISON
+# ============================================================
+
+def calls_per_sample(fn: Callable[[], object], min_sample_ms: float) -> int:
+    """Smallest power-of-two batch of calls that takes at least min_sample_ms"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if (time.perf_counter() - started) * 1000 >= min_sample_ms or number >= 2 ** 16:
+            return number
+        number *= 2
+
+
+def batched(fn: Callable[[], object], number: int) -> Callable[[], None]:
+    def run():
+        for _ in range(number):
+            fn()
+    return run
+
+
+def per_call(stats: Dict[str, float], number: int) -> Dict[str, float]:
+    scaled = {key: value / number for key, value in stats.items() if key.endswith('_ms')}
+    return {**{key: round(value, 4) for key, value in scaled.items()}, 'calls_per_sample': number,
+            'repeat': stats['repeat']}
+
+
+def calibration_ms() -> float:
+    """Median time of a fixed pure-Python loop: a rough speed unit for this machine"""
+    def loop():
+        total = 0
+        for index in range(200000):
+            total += index % 7
+        return total
+    return measure(loop, warmup=2, repeat=11)['median_ms']
+
+
+def compare(results: Dict, baseline: Dict, threshold: float, normalize: bool) -> Dict[str, Dict]:
+    """Median ratio per case against the baseline (machine speed divided out with normalize)"""
+    scale = 1.0
+    if normalize and baseline.get('meta', {}).get('calibration_ms'):
+        scale = baseline['meta']['calibration_ms'] / results['meta']['calibration_ms']
+
+    verdicts = {}
+    for name, case in results['cases'].items():
+        previous = baseline.get('cases', {}).get(name)
+        if not previous:
+            verdicts[name] = {'status': 'new'}
+            continue
+        ratio = case['median_ms'] * scale / previous['median_ms']
+        verdicts[name] = {
+            'status': 'regression' if ratio > 1 + threshold else 'ok',
+            'ratio': round(ratio, 3),
+            'baseline_median_ms': previous['median_ms']
+        }
+    return verdicts
+
+
+def run_case(name: str, warmup: int, repeat: int, min_sample_ms: float) -> Dict[str, float]:
+    fn = CASES[name]()
+    number = calls_per_sample(fn, min_sample_ms)
+    return per_call(measure(batched(fn, number), warmup=warmup, repeat=repeat), number)
+
+
+def run_child(name: str, args: argparse.Namespace) -> Dict[str, float]:
+    """One case in a fresh interpreter (python -m benchmarks.micro --case NAME)"""
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.micro", "--case", name, "--warmup", str(args.warmup),
+         "--repeat", str(args.repeat), "--min-sample-ms", str(args.min_sample_ms)],
+        capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{name} failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_cases(names, args: argparse.Namespace) -> Dict[str, Dict]:
+    """Best of args.runs child runs per case, with every run's median kept for reference"""
+    results = {}
+    for name in names:
+        runs = [run_child(name, args) for _ in range(max(1, args.runs))]
+        results[name] = {
+            **min(runs, key=lambda run: run['median_ms']),
+            'run_medians_ms': [run['median_ms'] for run in runs]
+        }
+        print(f"[micro] {name}: median {results[name]['median_ms']:.4f} ms "
+              f"(p95 {results[name]['p95_ms']:.4f}, x{results[name]['calls_per_sample']} per sample)",
+              file=sys.stderr)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", help="Comma-separated case name prefixes, e.g. resume,gemini")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured samples per case")
+    parser.add_argument("--repeat", type=int, default=20, help="Measured samples per run")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh-interpreter runs per case (best median kept)")
+    parser.add_argument("--min-sample-ms", type=float, default=20.0, help="Batch calls until a sample takes this long")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown of the median (0.25 = 25%%)")
+    parser.add_argument("--normalize", action="store_true", help="Scale by the calibration loop before comparing")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run to --baseline")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--case", choices=list(CASES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        # Child process: one case, its statistics as the last stdout line
+        with contextlib.redirect_stdout(sys.stderr):
+            stats = run_case(args.case, args.warmup, args.repeat, args.min_sample_ms)
+        print(json.dumps(stats))
+        return 0
+
+    prefixes = [prefix.strip() for prefix in (args.only or "").split(",") if prefix.strip()]
+    names = [name for name in CASES if not prefixes or any(name.startswith(prefix) for prefix in prefixes)]
+    if not names:
+        parser.error(f"no cases match --only {args.only}")
+
+    # Services log with print(); keep stdout for the report
+    with contextlib.redirect_stdout(sys.stderr):
+        results = {
+            'meta': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'calibration_ms': round(calibration_ms(), 3),
+                'warmup': args.warmup,
+                'repeat': args.repeat,
+                'runs': args.runs,
+                'min_sample_ms': args.min_sample_ms
+            },
+            'cases': run_cases(names, args)
+        }
+
+    failed = False
+    if args.save_baseline:
+        baseline = _load(args.baseline) or {'cases': {}}
+        baseline['meta'] = results['meta']
+        baseline['cases'].update(results['cases'])
+        with open(args.baseline, "w") as file:
+            json.dump(baseline, file, indent=2)
+            file.write("\n")
+        print(f"[micro] baseline written to {args.baseline}", file=sys.stderr)
+    else:
+        baseline = _load(args.baseline)
+        if baseline:
+            results['comparison'] = compare(results, baseline, args.threshold, args.normalize)
+            for name, verdict in results['comparison'].items():
+                if verdict['status'] == 'regression':
+                    failed = True
+                    print(f"FAIL: {name} is {verdict['ratio']:.2f}x the baseline median "
+                          f"({verdict['baseline_median_ms']} ms)", file=sys.stderr)
+            if not failed:
+                print(f"OK: no case slower than the baseline by more than {args.threshold:.0%}", file=sys.stderr)
+        else:
+            print(f"[micro] no baseline at {args.baseline}; run with --save-baseline to create one", file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    return 1 if failed else 0
+
+
+def _load(path: str) -> Optional[Dict]:
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+import gc
+import statistics
+import time
+from typing import Callable, Dict
+
+
+def measure(fn: Callable[[], object], warmup: int = 3, repeat: int = 20) -> Dict[str, float]:
+    """
+    Time fn() and return summary statistics in milliseconds.
+    Warmup runs are discarded and GC is disabled while timing.
+    """
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    samples.sort()
+    return {
+        'min_ms': samples[0],
+        'median_ms': statistics.median(samples),
+        'mean_ms': statistics.fmean(samples),
+        'p95_ms': samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        'stdev_ms': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'repeat': repeat
+    }